@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark Suite
+========================
+
+Times every step of `HospitalDataCleaner` and `MLExpertMissingValueHandler`
+and the full `run_full_cleaning` / `run_ml_imputation_pipeline` runs on
+synthetic inputs of several sizes (see synthetic_data.py):
+- Throughput (input rows per second) from the best of `repeat` runs
+  without memory tracing
+- Peak memory from a separate run under `tracemalloc`
+- A scaling table: seconds per size and the log-log slope, where a slope
+  well above 1 marks a step that grows faster than the input
+- Results saved as JSON; against an earlier results file, steps slower or
+  hungrier than the tolerance allows are reported as regressions
+
+The imputation pipeline runs on the cleaning output of the same size, as
+in the two-stage workflow.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import os
+import io
+import sys
+import json
+import math
+import time
+import platform
+import argparse
+import contextlib
+import tracemalloc
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from clean_hospital_data import HospitalDataCleaner
+from ml_missing_value_imputation import MLExpertMissingValueHandler
+from step_metrics import StepMetrics
+from synthetic_data import write_synthetic_dataset
+from diagnostics import configure_logging, VERBOSITY_LEVELS
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_TOLERANCE = 0.2
+# Steps faster (or smaller) than this are too noisy to flag or fit
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 1.0
+SUPERLINEAR_SLOPE = 1.2
+
+PIPELINES = {
+    'cleaning': (HospitalDataCleaner, 'run_full_cleaning'),
+    'imputation': (MLExpertMissingValueHandler, 'run_ml_imputation_pipeline'),
+}
+
+
+def synthetic_input(workdir, rows, seed):
+    """Path of the synthetic input with `rows` rows, generated on first use."""
+    path = os.path.join(workdir, f'synthetic_{rows}_seed{seed}.csv')
+    if not os.path.exists(path):
+        print(f"Generating {rows:,} synthetic rows...")
+        write_synthetic_dataset(path, rows, seed, verbose=False)
+    return path
+
+
+def run_pipeline(pipeline, input_file, output_file, recorder):
+    """Run one full pipeline quietly; returns its wall time."""
+    cls, method = PIPELINES[pipeline]
+    runner = cls(input_file)
+    runner.step_metrics = recorder
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        getattr(runner, method)(output_file)
+    return time.perf_counter() - started
+
+
+def benchmark_pipeline(pipeline, rows, input_file, output_file, repeat=1):
+    """Result records ({pipeline, step, rows, seconds, rows_per_second, peak_memory_mb}) for one size."""
+    method = PIPELINES[pipeline][1]
+    seconds = {}
+    for _ in range(repeat):
+        recorder = StepMetrics(trace_memory=False, count_changes=False)
+        total = run_pipeline(pipeline, input_file, output_file, recorder)
+        for step, record in [(method, {'wall_seconds': total})] + list(recorder.records.items()):
+            seconds[step] = min(seconds.get(step, math.inf), record['wall_seconds'])
+
+    # Trace the whole run so the pipeline peak counts the data held between steps
+    recorder = StepMetrics(count_changes=False)
+    tracemalloc.start()
+    try:
+        run_pipeline(pipeline, input_file, output_file, recorder)
+    finally:
+        tracemalloc.stop()
+    peaks = {step: record['peak_memory_mb'] for step, record in recorder.records.items()}
+    peaks[method] = recorder.max_traced_mb
+
+    return [{
+        'pipeline': pipeline,
+        'step': step,
+        'rows': rows,
+        'seconds': round(step_seconds, 4),
+        'rows_per_second': round(rows / step_seconds) if step_seconds > 0 else None,
+        'peak_memory_mb': round(peaks.get(step, 0.0), 2),
+    } for step, step_seconds in seconds.items()]
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seed=0, repeat=1, workdir='benchmark_data'):
+    """Benchmark both pipelines at every size; returns the result records."""
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    for rows in sizes:
+        raw = synthetic_input(workdir, rows, seed)
+        cleaned = os.path.join(workdir, f'cleaned_{rows}.csv')
+        ml_ready = os.path.join(workdir, f'ml_ready_{rows}.csv')
+        for pipeline, input_file, output_file in [('cleaning', raw, cleaned), ('imputation', cleaned, ml_ready)]:
+            print(f"Benchmarking {pipeline} on {rows:,} rows...")
+            records = benchmark_pipeline(pipeline, rows, input_file, output_file, repeat)
+            total = records[0]
+            print(f"  {total['step']}: {total['seconds']:.2f}s, {total['rows_per_second']:,} rows/s, "
+                  f"peak {total['peak_memory_mb']:.1f} MB")
+            results.extend(records)
+    return results
+
+
+def scaling_slope(rows, seconds):
+    """Least-squares slope of log(seconds) over log(rows) (1.0 = linear), or None."""
+    points = [(n, s) for n, s in zip(rows, seconds) if s >= MIN_SECONDS]
+    if len(points) < 2:
+        return None
+    x, y = np.log([n for n, _ in points]), np.log([s for _, s in points])
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def print_scaling_table(results):
+    """Seconds per step and size, throughput at the largest size and the scaling slope."""
+    table = pd.DataFrame(results)
+    sizes = sorted(table['rows'].unique())
+    print("\n" + "="*50)
+    print("SCALING TABLE (seconds)")
+    print("="*50)
+    header = f"{'Step':<38}" + ''.join(f"{f'{n:,}':>12}" for n in sizes) + f"{'rows/s':>12}{'slope':>8}"
+    for pipeline, steps in table.groupby('pipeline', sort=False):
+        print(f"\n{pipeline}")
+        print(header)
+        for step, records in steps.groupby('step', sort=False):
+            records = records.set_index('rows')
+            seconds = [records['seconds'].get(n) for n in sizes]
+            slope = scaling_slope([n for n, s in zip(sizes, seconds) if s is not None],
+                                  [s for s in seconds if s is not None])
+            cells = ''.join(f"{'-' if s is None else f'{s:.3f}':>12}" for s in seconds)
+            throughput = records['rows_per_second'].get(sizes[-1])
+            throughput = '-' if throughput is None or pd.isna(throughput) else f"{int(throughput):,}"
+            slope_text = '-' if slope is None else f"{slope:.2f}"
+            flag = '  superlinear' if slope is not None and slope > SUPERLINEAR_SLOPE else ''
+            print(f"{step:<38}{cells}{throughput:>12}{slope_text:>8}{flag}")
+
+
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Steps slower or using more memory than `baseline` results by more than `tolerance`."""
+    previous = {(r['pipeline'], r['step'], r['rows']): r for r in baseline}
+    regressions = []
+    for record in results:
+        before = previous.get((record['pipeline'], record['step'], record['rows']))
+        if before is None:
+            continue
+        for metric, floor in [('seconds', MIN_SECONDS), ('peak_memory_mb', MIN_PEAK_MB)]:
+            now, then = record[metric], before[metric]
+            if now >= floor and then and now > then * (1 + tolerance):
+                regressions.append({'pipeline': record['pipeline'], 'step': record['step'],
+                                    'rows': record['rows'], 'metric': metric,
+                                    'baseline': then, 'current': now, 'change': now / then - 1})
+    return regressions
+
+
+def print_regressions(regressions, tolerance):
+    print("\n" + "="*50)
+    print(f"REGRESSIONS (tolerance {tolerance:.0%})")
+    print("="*50)
+    if not regressions:
+        print("None")
+        return
+    for r in regressions:
+        print(f"  {r['pipeline']}.{r['step']} @ {r['rows']:,} rows: {r['metric']} "
+              f"{r['baseline']} -> {r['current']} (+{r['change']:.0%})")
+
+
+def save_results(path, results, regressions, details):
+    with open(path, 'w') as f:
+        json.dump(dict(details, results=results, regressions=regressions), f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cleaning and imputation pipelines.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Input sizes in rows")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic inputs")
+    parser.add_argument('--repeat', type=int, default=1, help="Timed runs per size (the fastest counts)")
+    parser.add_argument('--workdir', default='benchmark_data', help="Where inputs and outputs are kept")
+    parser.add_argument('--output', default='benchmark_results.json', help="Results JSON")
+    parser.add_argument('--baseline', default=None, help="Earlier results JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown / memory growth against the baseline (0.2 = 20%%)")
+    parser.add_argument('--verbosity', choices=list(VERBOSITY_LEVELS), default='full',
+                        help="Verbosity the pipelines run at (their output is discarded either way)")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    configure_logging(args.verbosity)
+
+    results = run_benchmarks(sorted(args.sizes), args.seed, args.repeat, args.workdir)
+    print_scaling_table(results)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = find_regressions(results, baseline, args.tolerance)
+        print_regressions(regressions, args.tolerance)
+
+    save_results(args.output, results, regressions, {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'verbosity': args.verbosity,
+        'baseline': args.baseline,
+        'tolerance': args.tolerance,
+    })
+    print(f"\nBenchmark results saved to {args.output}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Checkpointed, Resumable Pipeline Runs
+=====================================
+
+A run that fails in a late step (e.g. `detect_outliers` or the save) used
+to start over from the load. With a checkpoint directory, a pipeline runs
+step by step:
+- After each step, the frame is written as lz4 Feather next to the
+  pipeline's reports and fitted statistics; steps that leave the frame as
+  it is only record their state
+- A resumed run restores the last checkpoint and continues with the step
+  after it
+- A step selection runs some steps on the checkpoint of the step before
+  the first selected one. Skipped steps between selected ones are taken
+  from their checkpoints while those still hold, and run otherwise, so
+  every checkpoint stays the result of the steps before it
+- A set of checkpoints belongs to one input content and configuration;
+  another input or other rules start a new set. A changed pipeline code is
+  only warned about, so a run can be resumed once a failing step is fixed
+
+Each checkpoint records a digest of its frame and state. When a step runs
+again and gives the same result, its checkpoint and the ones after it are
+kept; once a step changes the result, the checkpoints after it are
+dropped, since they came from the old frame, and `--resume` continues
+from the last step that ran.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import pandas as pd
+from incremental_state import jsonable
+from step_cache import StepCache, write_frame, read_frame, file_digest, file_stamp
+from diagnostics import get_logger
+
+log = get_logger('checkpoints')
+
+CHECKPOINT_VERSION = 1
+
+
+def frame_digest(df):
+    """SHA-256 of a frame's columns, dtypes, index and values."""
+    digest = hashlib.sha256(json.dumps([[str(col) for col in df.columns],
+                                        [str(dtype) for dtype in df.dtypes]]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def result_digest(frame, state):
+    """Digest of a step's result: the frame digest and the state."""
+    state = json.dumps(jsonable(state), sort_keys=True, default=str)
+    return hashlib.sha256((frame + state).encode()).hexdigest()
+
+
+class CheckpointStore:
+    """Per-step checkpoints of one pipeline, kept in a directory."""
+
+    def __init__(self, directory, pipeline, input_file, config, code):
+        self.directory = directory
+        self.pipeline = pipeline
+        os.makedirs(directory, exist_ok=True)
+        manifest = self._load_manifest()
+
+        # The input is only hashed again when its size or mtime changed
+        stamp = file_stamp(os.path.abspath(input_file))
+        known = manifest.get('input', {})
+        digest = known['digest'] if known.get('stamp') == stamp else file_digest(input_file)
+        run_key = StepCache.key(pipeline, digest, config)
+
+        if manifest.get('run_key') == run_key:
+            if manifest['code'] != code and manifest['steps']:
+                log.warning("The pipeline code changed since these checkpoints were written")
+        else:
+            if manifest.get('steps'):
+                log.info("The checkpoints are of another input or configuration; starting a new set")
+            manifest = {'version': CHECKPOINT_VERSION, 'run_key': run_key, 'steps': []}
+        manifest['code'] = code
+        manifest['input'] = {'path': os.path.abspath(input_file), 'stamp': stamp, 'digest': digest}
+        self.manifest = manifest
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f'{self.pipeline}_checkpoints.json')
+
+    def _load_manifest(self):
+        try:
+            with open(self.path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if manifest.get('version') == CHECKPOINT_VERSION else {}
+
+    def _save_manifest(self):
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def completed(self):
+        """Names of the checkpointed steps, in pipeline order."""
+        return [entry['step'] for entry in self.manifest['steps']]
+    
+    def digests(self, count):
+        """Frame and result digests after the first `count` steps (None for checkpoints without them)."""
+        if count == 0:
+            return None, None
+        entry = self.manifest['steps'][count - 1]
+        return entry.get('frame_digest'), entry.get('digest')
+
+    def restore(self, count):
+        """Frame and state after the first `count` steps."""
+        entry = self.manifest['steps'][count - 1]
+        df = read_frame(os.path.join(self.directory, entry['frame']), entry['index'])
+        # Steps change the restored reports in place; the manifest keeps its own copy
+        return df, copy.deepcopy(entry['state'])
+
+    def truncate(self, count):
+        """Keep the checkpoints of the first `count` steps and delete the frames of the others."""
+        self.manifest['steps'] = self.manifest['steps'][:count]
+        kept = {entry['frame'] for entry in self.manifest['steps']}
+        prefix = f'{self.pipeline}_step'
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith('.feather') and name not in kept:
+                os.remove(os.path.join(self.directory, name))
+        self._save_manifest()
+
+    def save(self, step, df, state, changes_frame=True, frame_digest=None, digest=None):
+        """Checkpoint the frame and state after `step`, with the digests of the result."""
+        steps = self.manifest['steps']
+        if changes_frame or not steps:
+            frame = f'{self.pipeline}_step{len(steps):02d}_{step}.feather'
+            index = write_frame(os.path.join(self.directory, frame), df)
+        else:
+            frame, index = steps[-1]['frame'], steps[-1]['index']
+        steps.append({'step': step, 'frame': frame, 'index': index, 'state': jsonable(state),
+                      'frame_digest': frame_digest, 'digest': digest,
+                      'saved': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        self._save_manifest()
+
+
+def run_checkpointed(pipeline, steps, store, resume=False, only=None, outputs=()):
+    """Run a pipeline's `steps` ([(name, function, changes_frame)]) with a checkpoint after each one.
+    
+    `pipeline` provides `df`, `checkpoint_state()` and `restore_checkpoint(df, state)`.
+    With `resume`, the steps up to the last checkpoint are skipped; `only`
+    is a list of step names to run on the checkpoint before the first of
+    them. Skipped steps between selected ones are reused from their
+    checkpoints while those hold, and run otherwise. The `outputs` steps
+    (e.g. the save) after a selection run on the reused checkpoints if
+    those still hold.
+    Returns the names of the steps that ran.
+    """
+    names = [name for name, _, _ in steps]
+    completed = store.completed()
+    done = 0
+    while done < min(len(names), len(completed)) and names[done] == completed[done]:
+        done += 1
+    
+    if only:
+        unknown = [name for name in only if name not in names]
+        if unknown:
+            raise ValueError(f"Unknown steps {unknown}; the steps are: {', '.join(names)}")
+        selected = [name for name in names if name in only]
+        start = names.index(selected[0])
+        if start > done:
+            raise ValueError(f"There is no checkpoint after {names[start - 1]} in {store.directory}; "
+                             "run the steps before it with checkpoints first")
+    else:
+        start = done if resume else 0
+        selected = names[start:]
+    
+    if start > 0:
+        df, state = store.restore(start)
+        pipeline.restore_checkpoint(df, state)
+        log.info(f"Restored the checkpoint after {names[start - 1]} ({len(df)} rows)")
+    if not selected:
+        log.info("All steps have completed; nothing to resume")
+    # Checkpoints of another step list cannot be reused
+    store.truncate(done)
+    
+    last = names.index(selected[-1]) if selected else start - 1
+    # True while the checkpoints from here on still come from the current frame
+    intact = True
+    frame, _ = store.digests(start)
+    restore_at = None
+    ran = []
+    for position, (name, function, changes_frame) in enumerate(steps[start:last + 1], start):
+        if name not in selected:
+            if intact and position < len(store.completed()):
+                restore_at = position + 1
+                continue
+            log.info(f"Running {name} again: the steps before it changed the frame")
+        if restore_at is not None:
+            df, state = store.restore(restore_at)
+            pipeline.restore_checkpoint(df, state)
+            frame, _ = store.digests(restore_at)
+            restore_at = None
+        function()
+        ran.append(name)
+        
+        if changes_frame or frame is None:
+            frame = frame_digest(pipeline.df)
+        state = pipeline.checkpoint_state()
+        digest = result_digest(frame, state)
+        if intact and position < len(store.completed()) and store.digests(position + 1)[1] == digest:
+            continue
+        if intact and position < len(store.completed()):
+            log.info(f"{name} changed its result; dropping the checkpoints after it")
+        intact = False
+        store.truncate(position)
+        store.save(name, pipeline.df, state, changes_frame, frame, digest)
+    
+    if last + 1 < len(names):
+        if intact and last + 1 < len(store.completed()):
+            log.info(f"The steps gave their checkpointed results; the checkpoints after {names[last]} still hold")
+            for position in range(last + 1, min(len(names), len(store.completed()))):
+                name, function, _ = steps[position]
+                if name in outputs:
+                    df, state = store.restore(position)
+                    pipeline.restore_checkpoint(df, state)
+                    function()
+                    ran.append(name)
+        else:
+            log.info(f"Checkpointed up to {names[last]}; --resume continues with {names[last + 1]}")
+    return ran
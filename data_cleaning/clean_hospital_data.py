@@ -4,7 +4,7 @@ Hospital Dataset Cleaning Script
 ================================
 
 This script performs comprehensive data cleaning on the hospital dataset including:
-- Name formatting standardization
+- Name formatting standardization (patients and doctors)
 - Gender consistency checks
 - Date validation and formatting
 - Missing value handling
@@ -19,464 +19,1575 @@ Date: October 2025
 import pandas as pd
 import numpy as np
 import re
+import os
+import io
+import argparse
+import tempfile
+import contextlib
+import sys
+import time
+import logging
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
+from functools import partial
+from name_normalization import normalize_names, DOCTOR_SUFFIXES
+from value_memoization import map_distinct, LRUValueCache
+from columnar_io import (write_columnar, read_columnar, is_columnar_path, infer_format,
+                          path_for_format, PARTITION_SCHEMES)
+from date_parsing import parse_dates, merge_format_stats, UNPARSED
+from validation_rules import ValidationRuleEngine
+from dtype_schema import read_csv_chunks_with_schema, print_memory_report
+from parallel_steps import (StepColumns, run_in_waves, read_frame, write_frame, share_frame, allocate_outputs,
+                            release, partition_bounds)
+from quantile_sketch import QuantileSketch, DEFAULT_ERROR, EXACT_LIMIT
+from row_hash_index import row_hashes, RowHashIndex, open_hash_index
+from incremental_state import (state_path_for, load_state, save_state, input_watermark, refit_reason,
+                               read_new_rows, max_admission_date, fitted_value, output_dtype_kinds,
+                               align_to_output)
+from execution_backends import (operation, make_backend, choose_backend, available_backends, compare_frames,
+                                print_equivalence_table, BACKEND_CHOICES)
+from step_metrics import StepMetrics, instrumented_step, metrics_path_for
+from memory_bounded import (copy_on_write, duplicated_rows, take_rows, rss_mb, peak_summary, describe_peak,
+                            DISTINCT_BATCH_SIZE)
+from null_index import NullIndex, describe_patterns
+from step_cache import StepCache, read_csv_cached, code_version, DEFAULT_CACHE_MB
+from checkpoints import CheckpointStore, run_checkpointed
+from lazy_plan import LazyPlan, Statistic
+from diagnostics import get_logger, lazy, configure_logging, current_verbosity, VERBOSITY_LEVELS
+
+log = get_logger('cleaning')
+
+def clean_hospital_name(name):
+    """Remove trailing punctuation and standardize company abbreviations."""
+    if pd.isna(name):
+        return name
+    
+    # Remove trailing commas and extra spaces
+    name = str(name).strip().rstrip(',').strip()
+    
+    # Standardize common abbreviations
+    name = re.sub(r'\bLLC\b', 'LLC', name, flags=re.IGNORECASE)
+    name = re.sub(r'\bPLC\b', 'PLC', name, flags=re.IGNORECASE)
+    name = re.sub(r'\bInc\b', 'Inc', name, flags=re.IGNORECASE)
+    name = re.sub(r'\bLtd\b', 'Ltd', name, flags=re.IGNORECASE)
+    
+    return name
+
+def clean_insurance_name(name):
+    """Standardize Insurance Provider names."""
+    if pd.isna(name):
+        return name
+    return str(name).strip().title()
+
+def clean_medication_name(name):
+    """Standardize medication names."""
+    if pd.isna(name):
+        return name
+    return str(name).strip().title()
+
+def missing_values_summary(missing_counts):
+    """Missing values per column (only columns with any), as printed in the quality reports."""
+    missing = missing_counts[missing_counts > 0] if missing_counts is not None else []
+    return missing if len(missing) > 0 else "No missing values"
+
+# Block size for comparing output files byte for byte
+COMPARE_BLOCK_BYTES = 1 << 20
+
+def first_difference_line(path_a, path_b, block_size=COMPARE_BLOCK_BYTES):
+    """Line number of the first byte where two files differ, or None if they are identical.
+    
+    Reads both files in fixed-size blocks, so neither has to fit in memory.
+    """
+    line = 1
+    with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+        while True:
+            block_a, block_b = a.read(block_size), b.read(block_size)
+            if block_a != block_b:
+                first = next((i for i, (x, y) in enumerate(zip(block_a, block_b)) if x != y),
+                             min(len(block_a), len(block_b)))
+                return line + block_a.count(b'\n', 0, first)
+            if not block_a:
+                return None
+            line += block_a.count(b'\n')
+
+class StreamingColumnStats:
+    """Mergeable accumulator for a numerical column, backed by a `QuantileSketch`.
+    
+    Up to `exact_limit` values the sketch keeps them as they are, so the
+    median, quantiles and outlier counts equal the in-memory ones, which is the
+    same rule `detect_outliers` applies. Past that limit it switches to KLL
+    compaction. Memory then stays at a few thousand items, but the median and
+    the IQR bounds are approximate within a rank error of about `error`. The
+    median Age fill, and with it a streaming run's output, can then differ
+    from `run_full_cleaning`. Min, max and the missing count are always exact.
+    """
+    
+    def __init__(self, error=DEFAULT_ERROR, exact_limit=EXACT_LIMIT):
+        self.sketch = QuantileSketch(error, exact_limit)
+        self.missing = 0
+        self._min = np.nan
+        self._max = np.nan
+    
+    def update(self, series):
+        """Add the values of one chunk."""
+        values = series.astype('float64')
+        self.missing += int(values.isna().sum())
+        values = values.dropna().to_numpy()
+        if len(values) == 0:
+            return
+        self.sketch.update(values)
+        self._min = np.fmin(self._min, values.min())
+        self._max = np.fmax(self._max, values.max())
+    
+    def add(self, value, count):
+        """Add `count` occurrences of a single value."""
+        self.update(pd.Series(np.full(int(count), value, dtype='float64')))
+    
+    def merge(self, other):
+        """Merge another accumulator (e.g. from another partition) into this one."""
+        self.sketch.merge(other.sketch)
+        self.missing += other.missing
+        self._min = np.fmin(self._min, other._min)
+        self._max = np.fmax(self._max, other._max)
+    
+    @property
+    def count(self):
+        return self.sketch.count
+    
+    @property
+    def exact(self):
+        return self.sketch.exact
+    
+    def quantiles(self, qs):
+        return self.sketch.quantiles(qs)
+    
+    def median(self):
+        """Median, averaging the two middle values like `Series.median` while exact."""
+        if self.count == 0:
+            return np.nan
+        if not self.sketch.exact:
+            return self.sketch.quantile(0.5)
+        values, _ = self.sketch.weighted_items()
+        return np.median(values)
+    
+    def min(self):
+        return self._min
+    
+    def max(self):
+        return self._max
+    
+    def count_outside(self, lower_bound, upper_bound):
+        """Number of values strictly outside [lower_bound, upper_bound] (estimated once compacted)."""
+        items, weights = self.sketch.weighted_items()
+        outside = (items < lower_bound) | (items > upper_bound)
+        return int(weights[outside].sum())
+
+# Worker counts timed by the row-partitioned scaling benchmark
+SCALING_WORKER_COUNTS = [1, 2, 4, 8, 16]
+# Most frequent sets of columns missing together shown in the full output
+MISSING_PATTERNS_SHOWN = 10
+# Modules whose code decides the cleaning result (part of its step cache key)
+CLEANING_CODE = ['clean_hospital_data', 'name_normalization', 'value_memoization', 'columnar_io', 'date_parsing',
+                 'validation_rules', 'dtype_schema', 'quantile_sketch', 'memory_bounded', 'null_index']
+
 class HospitalDataCleaner:
-    def __init__(self, input_file):
-        """Initialize the data cleaner with input file path."""
+    # Steps that only look at one row at a time and can run chunk by chunk
+    ROW_LOCAL_STEPS = [
+        'clean_names',
+        'clean_gender_data',
+        'clean_blood_types',
+        'clean_dates',
+        'clean_hospital_names',
+        'clean_numerical_data',
+        'clean_categorical_data',
+    ]
+    NUMERICAL_COLUMNS = ['Age', 'Billing Amount', 'Room Number']
+    # Columns each row-local step reads and writes, used to run steps in parallel
+    STEP_COLUMNS = {
+        'clean_names': StepColumns(reads=['Name', 'Doctor'], writes=['Name', 'Doctor']),
+        'clean_gender_data': StepColumns(reads=['Gender'], writes=['Gender']),
+        'clean_blood_types': StepColumns(reads=['Blood Type'], writes=['Blood Type']),
+        'clean_dates': StepColumns(reads=['Date of Admission', 'Discharge Date'],
+                                   writes=['Date of Admission', 'Discharge Date']),
+        'clean_hospital_names': StepColumns(reads=['Hospital'], writes=['Hospital']),
+        'clean_numerical_data': StepColumns(reads=NUMERICAL_COLUMNS, writes=NUMERICAL_COLUMNS),
+        'clean_categorical_data': StepColumns(
+            reads=['Medical Condition', 'Admission Type', 'Test Results', 'Insurance Provider', 'Medication'],
+            writes=['Insurance Provider', 'Medication']),
+    }
+    # Attributes a checkpoint keeps next to the frame
+    CHECKPOINT_STATE = ['cleaning_report', 'fitted_stats', 'load_info']
+
+    def __init__(self, input_file, cache_size=100_000, rules=None, dedupe_index=None,
+                 bloom_capacity=None, bloom_error_rate=0.001, quantile_error=DEFAULT_ERROR,
+                 exact_quantile_limit=EXACT_LIMIT, workers=1, step_metrics=False, memory_bounded=False,
+                 cache=None):
+        """Initialize the data cleaner with input file path.
+        
+        `rules` configures the validation rules: a JSON path, a list of rules
+        or a dict of per-rule overrides (see validation_rules.py).
+        `dedupe_index` is a .npz file of row hashes from earlier runs; rows
+        already in it are dropped as cross-run duplicates. With
+        `bloom_capacity`, a new index is a Bloom filter of bounded size.
+        Outlier bounds come from quantile sketches with rank error
+        `quantile_error`; columns up to `exact_quantile_limit` values are exact.
+        With `workers` > 1, row-local steps on different columns run in a
+        process pool (see parallel_steps.py).
+        With `step_metrics`, each step's time, memory and row counts are
+        recorded (see step_metrics.py).
+        With `memory_bounded`, the run uses Copy-on-Write, avoids full-frame
+        temporaries and records each step's peak RSS (see memory_bounded.py).
+        `cache` is a StepCache; the CSV parse and the cleaning result are
+        reused from it for the same input bytes, rules and code (see step_cache.py).
+        """
         self.input_file = input_file
+        self.cache = cache
         self.df = None
+        self.rule_engine = ValidationRuleEngine(rules)
+        self.quantile_error = quantile_error
+        self.exact_quantile_limit = exact_quantile_limit
+        self.workers = workers
+        self.memory_bounded = memory_bounded
+        self.step_metrics = None
+        if step_metrics or memory_bounded:
+            # Hashing cells for the change counts would cost more memory than the steps save
+            self.step_metrics = (StepMetrics(trace_rss=memory_bounded) if step_metrics
+                                 else StepMetrics(trace_memory=False, count_changes=False, trace_rss=True))
+        # Per-column LRU caches of cleaned values, only used by streaming runs
+        self.cache_size = cache_size
+        self.value_caches = None
+        # Details from the schema-aware loader, e.g. dates that failed to parse
+        self.load_info = {}
+        # Null bitmaps of self.df, kept current as steps write (see null_index.py)
+        self.null_index = None
+        # Row hashes seen by earlier runs (see row_hash_index.py)
+        self.hash_index = None
+        if dedupe_index:
+            self.hash_index = open_hash_index(dedupe_index, bloom_capacity, bloom_error_rate)
+        # Statistics saved by the last full run (incremental mode) and fitted by this one
+        self.saved_stats = None
+        self.fitted_stats = {}
         self.cleaning_report = {
             'original_rows': 0,
             'final_rows': 0,
-            'issues_fixed': []
+            'issues_fixed': [],
+            'date_formats': {},
+            'rule_violations': {},
+            'duplicates': {'within_file': 0, 'cross_run': 0}
         }
     
+    @instrumented_step
     def load_data(self):
         """Load the dataset and perform initial inspection."""
-        print("Loading hospital dataset...")
-        self.df = pd.read_csv(self.input_file, index_col=0)
+        log.info("Loading hospital dataset...")
+        if is_columnar_path(self.input_file):
+            self.df, self.load_info = read_columnar(self.input_file)
+        else:
+            self.df, self.load_info = read_csv_cached(self.cache, self.input_file, index_col=0)
         self.cleaning_report['original_rows'] = len(self.df)
+        self.cleaning_report['memory_mb'] = self.load_info['memory_mb']
+        self.null_index = NullIndex(self.df)
         
-        print(f"Dataset loaded: {len(self.df)} rows, {len(self.df.columns)} columns")
-        print("\nColumns:", list(self.df.columns))
-        print("\nFirst few rows:")
-        print(self.df.head())
+        log.info(f"Dataset loaded: {len(self.df)} rows, {len(self.df.columns)} columns")
+        print_memory_report(self.load_info)
+        log.debug("\nColumns: %s", list(self.df.columns))
+        log.debug("\nFirst few rows:\n%s", lazy(self.df.head))
         
         return self.df
     
+    def nulls(self):
+        """Null index of the current frame, rescanning only the columns written since it was last read."""
+        if self.null_index is None:
+            self.null_index = NullIndex(self.df)
+        return self.null_index.refresh(self.df)
+    
+    def _wrote(self, *columns):
+        """Record that a step wrote these columns of self.df."""
+        if self.null_index is not None:
+            self.null_index.mark_written(*columns)
+    
+    def _map_distinct(self, column, func, vectorized=False):
+        """Clean each distinct value of a column once and map the results back."""
+        if self.value_caches is None:
+            batch_size = DISTINCT_BATCH_SIZE if self.memory_bounded else None
+            return map_distinct(self.df[column], func, vectorized, batch_size)
+        
+        # Streaming vocabularies are unbounded, so keep a bounded cache per column
+        if column not in self.value_caches:
+            self.value_caches[column] = LRUValueCache(func, self.cache_size, vectorized)
+        return self.value_caches[column].map(self.df[column])
+    
+    @instrumented_step
     def clean_names(self):
         """Clean and standardize name formatting."""
-        print("\n=== Cleaning Names ===")
+        log.info("\n=== Cleaning Names ===")
         
         # Count names with formatting issues
         irregular_names = self.df['Name'].str.contains(r'[a-z][A-Z]|[A-Z][a-z][A-Z]', na=False).sum()
-        print(f"Found {irregular_names} names with irregular capitalization")
-        
-        # Standardize name formatting
-        def fix_name_formatting(name):
-            if pd.isna(name):
-                return name
-            
-            # Remove extra spaces and normalize
-            name = re.sub(r'\s+', ' ', str(name).strip())
-            
-            # Handle titles (Mr., Mrs., Dr., Ms.)
-            title_pattern = r'^(mr\.|mrs\.|dr\.|ms\.)\s*'
-            title_match = re.match(title_pattern, name.lower())
-            title = ""
-            if title_match:
-                title = title_match.group(1).title() + " "
-                name = re.sub(title_pattern, '', name, flags=re.IGNORECASE)
-            
-            # Split name into parts and capitalize properly
-            name_parts = name.split()
-            cleaned_parts = []
-            
-            for part in name_parts:
-                # Handle hyphenated names
-                if '-' in part:
-                    hyphen_parts = [p.capitalize() for p in part.split('-')]
-                    cleaned_parts.append('-'.join(hyphen_parts))
-                else:
-                    cleaned_parts.append(part.capitalize())
-            
-            return title + ' '.join(cleaned_parts)
+        log.info(f"Found {irregular_names} names with irregular capitalization")
         
-        self.df['Name'] = self.df['Name'].apply(fix_name_formatting)
+        # Standardize name formatting, one column at a time
+        self.df['Name'] = self._map_distinct('Name', normalize_names, vectorized=True)
         self.cleaning_report['issues_fixed'].append(f"Fixed {irregular_names} irregularly formatted names")
-        print("Name formatting standardized")
+        log.info("Name formatting standardized")
+        
+        # Doctor names follow the same rules, keeping professional suffixes upper case
+        if 'Doctor' in self.df.columns:
+            original_doctors = self.df['Doctor']
+            self.df['Doctor'] = self._map_distinct('Doctor', partial(normalize_names, keep_case=DOCTOR_SUFFIXES),
+                                                   vectorized=True)
+            changed_doctors = ((self.df['Doctor'] != original_doctors) & original_doctors.notna()).sum()
+            log.info(f"Standardized {changed_doctors} doctor names")
+            self.cleaning_report['issues_fixed'].append(f"Fixed {changed_doctors} irregularly formatted doctor names")
+    
+    def apply_validation_rules(self, columns=None):
+        """Apply the declarative validation rules (see validation_rules.py) to some columns."""
+        counts = self.rule_engine.apply(self.df, columns)
+        
+        violations = self.cleaning_report['rule_violations']
+        for name, count in counts.items():
+            violations[name] = violations.get(name, 0) + count
+            if count > 0:
+                rule = self.rule_engine.rule(name)
+                log.info(f"Found {count} {rule.get('label', name)} ({name}: {rule['action']})")
+        
+        self.cleaning_report['issues_fixed'].extend(self.rule_engine.messages(counts))
+        return counts
     
+    @instrumented_step
     def clean_gender_data(self):
         """Clean and validate gender data."""
-        print("\n=== Cleaning Gender Data ===")
-        
-        # First, check if there are actual literal "Nan" strings (not pandas NaN)
-        # We need to be more careful here - pandas NaN will show up as 'nan' when converted to string
-        if self.df['Gender'].dtype == 'object':
-            # Check for literal string "Nan", "NaN", "nan" etc. (but not pandas NaN)
-            literal_nan_mask = (self.df['Gender'].astype(str).str.match(r'^[Nn]a[Nn]$', na=False) & 
-                              self.df['Gender'].notna())
-            nan_strings = literal_nan_mask.sum()
-            
-            if nan_strings > 0:
-                print(f"Found {nan_strings} rows with literal 'Nan' strings in Gender")
-                self.df.loc[literal_nan_mask, 'Gender'] = np.nan
-                self.cleaning_report['issues_fixed'].append(f"Fixed {nan_strings} literal 'Nan' strings to proper null values")
-            else:
-                print("No literal 'Nan' strings found in Gender column")
-        
-        # Check for invalid gender values (excluding proper nulls)
-        valid_genders = ['Male', 'Female']
-        invalid_mask = (~self.df['Gender'].isin(valid_genders) & self.df['Gender'].notna())
-        invalid_genders = self.df[invalid_mask]
+        log.info("\n=== Cleaning Gender Data ===")
         
-        if len(invalid_genders) > 0:
-            print(f"Found {len(invalid_genders)} rows with invalid gender values:")
-            print(invalid_genders['Gender'].unique())
-            # Convert invalid values to proper nulls
-            self.df.loc[invalid_mask, 'Gender'] = np.nan
-            self.cleaning_report['issues_fixed'].append(f"Converted {len(invalid_genders)} invalid gender entries to null values")
+        # Literal "Nan" strings (not pandas NaN) and other invalid values become proper nulls
+        self.apply_validation_rules(['Gender'])
         
-        print(f"Gender distribution:\n{self.df['Gender'].value_counts(dropna=False)}")
+        log.debug("Gender distribution:\n%s", lazy(self.df['Gender'].value_counts, dropna=False))
     
+    @instrumented_step
     def clean_blood_types(self):
         """Validate and clean blood type data."""
-        print("\n=== Cleaning Blood Types ===")
+        log.info("\n=== Cleaning Blood Types ===")
         
-        valid_blood_types = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
-        invalid_blood = self.df[~self.df['Blood Type'].isin(valid_blood_types)]
+        # Invalid blood types are marked 'Unknown' for review
+        self.apply_validation_rules(['Blood Type'])
         
-        if len(invalid_blood) > 0:
-            print(f"Found {len(invalid_blood)} rows with invalid blood types")
-            # Mark invalid blood types for review
-            self.df.loc[~self.df['Blood Type'].isin(valid_blood_types), 'Blood Type'] = 'Unknown'
-            self.cleaning_report['issues_fixed'].append(f"Marked {len(invalid_blood)} invalid blood type entries")
-        
-        print(f"Blood type distribution:\n{self.df['Blood Type'].value_counts()}")
+        log.debug("Blood type distribution:\n%s", lazy(self.df['Blood Type'].value_counts))
     
+    @instrumented_step
     def clean_dates(self):
         """Clean and validate date columns."""
-        print("\n=== Cleaning Dates ===")
+        log.info("\n=== Cleaning Dates ===")
         
         date_columns = ['Date of Admission', 'Discharge Date']
         
         for col in date_columns:
-            print(f"Processing {col}...")
+            log.info(f"Processing {col}...")
+            
+            # Parse each distinct date string once (the schema loader has usually done this already)
+            stats = self.load_info.get('date_formats', {}).get(col)
+            if not pd.api.types.is_datetime64_any_dtype(self.df[col]):
+                self.df[col], stats = parse_dates(self.df[col])
             
-            # Convert to datetime
-            original_invalid = self.df[col].isna().sum()
-            self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
-            new_invalid = self.df[col].isna().sum()
+            invalid_dates = 0
+            if stats:
+                merge_format_stats(self.cleaning_report['date_formats'].setdefault(col, {}), stats)
+                invalid_dates = stats['format_counts'].get(UNPARSED, 0)
+                log.info(f"  Rows per format: {stats['format_counts']}")
             
-            if new_invalid > original_invalid:
-                invalid_dates = new_invalid - original_invalid
-                print(f"Found {invalid_dates} invalid date formats in {col}")
+            if invalid_dates > 0:
+                log.info(f"Found {invalid_dates} invalid date formats in {col}")
                 self.cleaning_report['issues_fixed'].append(f"Converted {invalid_dates} invalid dates to NaT in {col}")
         
         # Check for logical date inconsistencies
         if 'Date of Admission' in self.df.columns and 'Discharge Date' in self.df.columns:
             invalid_date_logic = (self.df['Discharge Date'] < self.df['Date of Admission']).sum()
             if invalid_date_logic > 0:
-                print(f"Found {invalid_date_logic} records where discharge date is before admission date")
+                log.info(f"Found {invalid_date_logic} records where discharge date is before admission date")
                 # Mark these for manual review
                 mask = self.df['Discharge Date'] < self.df['Date of Admission']
                 self.df.loc[mask, 'Discharge Date'] = pd.NaT
                 self.cleaning_report['issues_fixed'].append(f"Fixed {invalid_date_logic} illogical date sequences")
     
+    @instrumented_step
     def clean_hospital_names(self):
         """Clean hospital names by removing trailing punctuation and standardizing format."""
-        print("\n=== Cleaning Hospital Names ===")
+        log.info("\n=== Cleaning Hospital Names ===")
         
         # Count hospitals with trailing commas
         trailing_comma = self.df['Hospital'].str.endswith(',', na=False).sum()
-        print(f"Found {trailing_comma} hospital names with trailing commas")
+        log.info(f"Found {trailing_comma} hospital names with trailing commas")
         
-        def clean_hospital_name(name):
-            if pd.isna(name):
-                return name
-            
-            # Remove trailing commas and extra spaces
-            name = str(name).strip().rstrip(',').strip()
-            
-            # Standardize common abbreviations
-            name = re.sub(r'\bLLC\b', 'LLC', name, flags=re.IGNORECASE)
-            name = re.sub(r'\bPLC\b', 'PLC', name, flags=re.IGNORECASE)
-            name = re.sub(r'\bInc\b', 'Inc', name, flags=re.IGNORECASE)
-            name = re.sub(r'\bLtd\b', 'Ltd', name, flags=re.IGNORECASE)
-            
-            return name
-        
-        self.df['Hospital'] = self.df['Hospital'].apply(clean_hospital_name)
+        self.df['Hospital'] = self._map_distinct('Hospital', clean_hospital_name)
         self.cleaning_report['issues_fixed'].append(f"Cleaned {trailing_comma} hospital names with formatting issues")
     
+    @instrumented_step
     def clean_numerical_data(self):
         """Clean and validate numerical columns."""
-        print("\n=== Cleaning Numerical Data ===")
-        
-        # Clean Age column
-        print("Processing Age column...")
-        age_issues = 0
-        
-        # Check for unrealistic ages
-        unrealistic_age = ((self.df['Age'] < 0) | (self.df['Age'] > 120)).sum()
-        if unrealistic_age > 0:
-            print(f"Found {unrealistic_age} unrealistic age values")
-            self.df.loc[(self.df['Age'] < 0) | (self.df['Age'] > 120), 'Age'] = np.nan
-            age_issues += unrealistic_age
-        
-        # Clean Billing Amount
-        print("Processing Billing Amount...")
-        billing_issues = 0
-        
-        # Check for negative billing amounts
-        negative_billing = (self.df['Billing Amount'] < 0).sum()
-        if negative_billing > 0:
-            print(f"Found {negative_billing} negative billing amounts")
-            self.df.loc[self.df['Billing Amount'] < 0, 'Billing Amount'] = np.abs(self.df.loc[self.df['Billing Amount'] < 0, 'Billing Amount'])
-            billing_issues += negative_billing
-        
-        # Check for unrealistic billing amounts (e.g., less than $1 or more than $1M)
-        unrealistic_billing = ((self.df['Billing Amount'] < 1) | (self.df['Billing Amount'] > 1000000)).sum()
-        if unrealistic_billing > 0:
-            print(f"Found {unrealistic_billing} potentially unrealistic billing amounts")
-            # Cap extreme values
-            self.df.loc[self.df['Billing Amount'] > 1000000, 'Billing Amount'] = 1000000
-            self.df.loc[self.df['Billing Amount'] < 1, 'Billing Amount'] = np.nan
-            billing_issues += unrealistic_billing
-        
-        # Clean Room Number
-        print("Processing Room Number...")
-        room_issues = 0
-        
-        # Check for unrealistic room numbers
-        unrealistic_rooms = ((self.df['Room Number'] < 1) | (self.df['Room Number'] > 9999)).sum()
-        if unrealistic_rooms > 0:
-            print(f"Found {unrealistic_rooms} unrealistic room numbers")
-            self.df.loc[(self.df['Room Number'] < 1) | (self.df['Room Number'] > 9999), 'Room Number'] = np.nan
-            room_issues += unrealistic_rooms
-        
-        if age_issues > 0:
-            self.cleaning_report['issues_fixed'].append(f"Fixed {age_issues} age-related issues")
-        if billing_issues > 0:
-            self.cleaning_report['issues_fixed'].append(f"Fixed {billing_issues} billing amount issues")
-        if room_issues > 0:
-            self.cleaning_report['issues_fixed'].append(f"Fixed {room_issues} room number issues")
+        log.info("\n=== Cleaning Numerical Data ===")
+        
+        self.apply_validation_rules(['Age', 'Billing Amount', 'Room Number'])
     
+    @instrumented_step
     def clean_categorical_data(self):
         """Clean and standardize categorical columns."""
-        print("\n=== Cleaning Categorical Data ===")
-        
-        # Clean Medical Condition
-        medical_conditions = self.df['Medical Condition'].value_counts()
-        print(f"Medical conditions found: {list(medical_conditions.index)}")
-        
-        # Clean Admission Type
-        admission_types = self.df['Admission Type'].value_counts()
-        print(f"Admission types: {list(admission_types.index)}")
+        log.info("\n=== Cleaning Categorical Data ===")
         
-        # Clean Test Results
-        test_results = self.df['Test Results'].value_counts()
-        print(f"Test results: {list(test_results.index)}")
+        # Values found in the categorical columns, most frequent first
+        values = lambda col: list(self.df[col].value_counts().index)
+        log.debug("Medical conditions found: %s", lazy(values, 'Medical Condition'))
+        log.debug("Admission types: %s", lazy(values, 'Admission Type'))
+        log.debug("Test results: %s", lazy(values, 'Test Results'))
         
-        # Standardize Insurance Provider names
-        def clean_insurance_name(name):
-            if pd.isna(name):
-                return name
-            return str(name).strip().title()
-        
-        self.df['Insurance Provider'] = self.df['Insurance Provider'].apply(clean_insurance_name)
-        
-        # Standardize medication names
-        def clean_medication_name(name):
-            if pd.isna(name):
-                return name
-            return str(name).strip().title()
-        
-        self.df['Medication'] = self.df['Medication'].apply(clean_medication_name)
+        # Standardize Insurance Provider and medication names, once per distinct value
+        self.df['Insurance Provider'] = self._map_distinct('Insurance Provider', clean_insurance_name)
+        self.df['Medication'] = self._map_distinct('Medication', clean_medication_name)
         
         self.cleaning_report['issues_fixed'].append("Standardized categorical data formatting")
     
+    @instrumented_step
     def remove_duplicates(self):
         """Remove duplicate rows from the dataset."""
-        print("\n=== Removing Duplicate Rows ===")
+        log.info("\n=== Removing Duplicate Rows ===")
         
         initial_count = len(self.df)
         
         # Check for exact duplicates
-        duplicates = self.df.duplicated()
-        duplicate_count = duplicates.sum()
-        
-        if duplicate_count > 0:
-            print(f"Found {duplicate_count} exact duplicate rows")
-            self.df = self.df.drop_duplicates()
-            self.cleaning_report['issues_fixed'].append(f"Removed {duplicate_count} duplicate rows")
-        else:
-            print("No duplicate rows found")
+        duplicates = duplicated_rows(self.df) if self.memory_bounded else self.df.duplicated().to_numpy()
+        hashes = row_hashes(self.df).to_numpy() if self.hash_index is not None else None
+        keep = self._record_duplicates(duplicates, hashes)
+        if not keep.all():
+            # Memory-bounded runs build the filtered frame while emptying the old one
+            before = self.df
+            self.df = take_rows(self.df, keep) if self.memory_bounded else self.df[keep]
+            if self.null_index is not None:
+                self.null_index.take(before, keep, self.df)
         
         final_count = len(self.df)
         rows_removed = initial_count - final_count
-        print(f"Rows removed: {rows_removed}")
+        log.info(f"Rows removed: {rows_removed}")
         
         return self.df
     
+    def _record_duplicates(self, duplicates, hashes=None):
+        """Check the remaining rows against the hashes of earlier runs and report
+        the duplicate counts; returns a mask of the rows to keep."""
+        cross_run = np.zeros(len(duplicates), dtype=bool)
+        if self.hash_index is not None:
+            cross_run = ~duplicates & self.hash_index.contains(hashes)
+            self.hash_index.add(hashes[~duplicates & ~cross_run])
+        duplicate_count, cross_run_count = int(duplicates.sum()), int(cross_run.sum())
+        
+        self.cleaning_report['duplicates'] = {'within_file': duplicate_count, 'cross_run': cross_run_count}
+        self.report_duplicates(duplicate_count, cross_run_count, self.cleaning_report['issues_fixed'])
+        return ~duplicates & ~cross_run
+    
+    def report_duplicates(self, duplicate_count, cross_run_count, issues):
+        """Print the duplicate counts and add them to a list of fixed issues."""
+        if duplicate_count > 0:
+            log.info(f"Found {duplicate_count} exact duplicate rows")
+            issues.append(f"Removed {duplicate_count} duplicate rows")
+        if cross_run_count > 0:
+            log.info(f"Found {cross_run_count} rows already seen in earlier runs")
+            issues.append(f"Removed {cross_run_count} rows already seen in earlier runs")
+        if duplicate_count == 0 and cross_run_count == 0:
+            log.info("No duplicate rows found")
+    
+    def save_hash_index(self):
+        """Write the row-hash index; only called once a run has succeeded."""
+        if self.hash_index is None:
+            return
+        self.hash_index.save()
+        log.info(f"Row-hash index updated: {self.hash_index.path} ({len(self.hash_index)} rows, {self.hash_index.kind})")
+    
+    @instrumented_step
     def handle_missing_values(self):
         """Handle missing values in the dataset with ML-appropriate policies."""
-        print("\n=== Handling Missing Values ===")
+        log.info("\n=== Handling Missing Values ===")
         
-        missing_summary = self.df.isnull().sum()
+        missing_summary = self.nulls().counts()
         missing_summary = missing_summary[missing_summary > 0]
         
         if len(missing_summary) > 0:
-            print("Missing values per column:")
-            print(missing_summary)
+            log.info("Missing values per column:")
+            log.info(missing_summary)
+            log.debug("Columns missing together:\n%s",
+                      lazy(lambda: describe_patterns(self.nulls().patterns(MISSING_PATTERNS_SHOWN))))
             
             # ML-appropriate missing value policies:
             
             # 1. Name: Drop for ML (PII/leakage concerns)
             if 'Name' in missing_summary.index:
-                print(f"Name column has {missing_summary['Name']} missing values")
-                print("Recommendation: Consider dropping Name column for ML (PII/leakage risk)")
+                log.info(f"Name column has {missing_summary['Name']} missing values")
+                log.info("Recommendation: Consider dropping Name column for ML (PII/leakage risk)")
                 # Keep nulls as-is for now, let user decide
             
             # 2. Age: fill with median (common practice)
             if 'Age' in missing_summary.index:
-                median_age = self.df['Age'].median()
-                self.df['Age'].fillna(median_age, inplace=True)
-                print(f"Filled missing ages with median value: {median_age}")
+                median_age = fitted_value(self.saved_stats, self.fitted_stats, 'medians', 'Age',
+                                          lambda: self.df['Age'].median())
+                self.df['Age'] = self.df['Age'].fillna(median_age)
+                self._wrote('Age')
+                log.info(f"Filled missing ages with median value: {median_age}")
                 self.cleaning_report['issues_fixed'].append(f"Filled {missing_summary['Age']} missing ages with median")
             
             # 3. Insurance Provider: Keep as null or encode as "Unknown" - both valid for ML
             if 'Insurance Provider' in missing_summary.index:
-                print(f"Insurance Provider has {missing_summary['Insurance Provider']} missing values")
-                print("Recommendation: Keep as null or encode as 'Unknown' category")
+                log.info(f"Insurance Provider has {missing_summary['Insurance Provider']} missing values")
+                log.info("Recommendation: Keep as null or encode as 'Unknown' category")
                 # Option to encode as "Unknown" for categorical encoding
-                # self.df['Insurance Provider'].fillna('Unknown', inplace=True)
+                # self.df['Insurance Provider'] = self.df['Insurance Provider'].fillna('Unknown')
             
             # 4. Medication: Keep as null - missing medication is meaningful information
             if 'Medication' in missing_summary.index:
-                print(f"Medication has {missing_summary['Medication']} missing values")
-                print("Recommendation: Keep as null (missing medication is meaningful)")
+                log.info(f"Medication has {missing_summary['Medication']} missing values")
+                log.info("Recommendation: Keep as null (missing medication is meaningful)")
             
             # 5. Other fields: keep as missing for manual review
             remaining_missing = [col for col in missing_summary.index 
                                if col not in ['Age', 'Name', 'Insurance Provider', 'Medication']]
             if remaining_missing:
-                print(f"Other columns with missing values: {remaining_missing}")
-                print("Keeping as null for manual review")
+                log.info(f"Other columns with missing values: {remaining_missing}")
+                log.info("Keeping as null for manual review")
             
             self.cleaning_report['issues_fixed'].append("Applied ML-appropriate missing value policies")
         else:
-            print("No missing values found")
+            log.info("No missing values found")
     
+    @instrumented_step
     def detect_outliers(self):
         """Detect and report potential outliers."""
-        print("\n=== Outlier Detection ===")
+        log.info("\n=== Outlier Detection ===")
         
         numerical_columns = ['Age', 'Billing Amount', 'Room Number']
         
         for col in numerical_columns:
             if col in self.df.columns:
-                Q1 = self.df[col].quantile(0.25)
-                Q3 = self.df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
+                def iqr_bounds():
+                    sketch = QuantileSketch.from_values(self.df[col], self.quantile_error,
+                                                        self.exact_quantile_limit)
+                    return self._iqr_bounds(sketch)
                 
-                outliers = self.df[(self.df[col] < lower_bound) | (self.df[col] > upper_bound)]
+                # Incremental runs judge new rows against the bounds of the last full run
+                lower_bound, upper_bound = fitted_value(self.saved_stats, self.fitted_stats,
+                                                        'outlier_bounds', col, iqr_bounds)
                 
-                if len(outliers) > 0:
-                    print(f"Found {len(outliers)} potential outliers in {col}")
-                    print(f"  Range: {self.df[col].min():.2f} - {self.df[col].max():.2f}")
-                    print(f"  Normal range (IQR): {lower_bound:.2f} - {upper_bound:.2f}")
+                # The outliers are only reported, so they are only counted when shown
+                if not log.isEnabledFor(logging.INFO):
+                    continue
+                outliers = int(((self.df[col] < lower_bound) | (self.df[col] > upper_bound)).sum())
+                if outliers > 0:
+                    log.info(f"Found {outliers} potential outliers in {col}")
+                    log.debug("  Range: %s", lazy(lambda: f"{self.df[col].min():.2f} - {self.df[col].max():.2f}"))
+                    log.debug(f"  Normal range (IQR): {lower_bound:.2f} - {upper_bound:.2f}")
     
+    @instrumented_step
     def generate_data_quality_report(self):
         """Generate a comprehensive data quality report."""
-        print("\n" + "="*50)
-        print("DATA QUALITY REPORT")
-        print("="*50)
+        log.info("\n" + "="*50)
+        log.info("DATA QUALITY REPORT")
+        log.info("="*50)
         
-        print(f"Original dataset size: {self.cleaning_report['original_rows']} rows")
-        print(f"Final dataset size: {len(self.df)} rows")
-        print(f"Rows removed: {self.cleaning_report['original_rows'] - len(self.df)}")
+        log.info(f"Original dataset size: {self.cleaning_report['original_rows']} rows")
+        log.info(f"Final dataset size: {len(self.df)} rows")
+        log.info(f"Rows removed: {self.cleaning_report['original_rows'] - len(self.df)}")
         
-        print("\nIssues fixed:")
+        log.info("\nIssues fixed:")
         for issue in self.cleaning_report['issues_fixed']:
-            print(f"  • {issue}")
-        
-        print(f"\nFinal data types:")
-        print(self.df.dtypes)
+            log.info(f"  • {issue}")
         
-        print(f"\nFinal missing values:")
-        missing = self.df.isnull().sum()
-        missing = missing[missing > 0]
-        if len(missing) > 0:
-            print(missing)
-        else:
-            print("No missing values")
+        self.print_date_formats()
+        self.print_rule_violations()
         
-        print(f"\nDataset summary:")
-        print(self.df.describe(include='all'))
+        # Full-frame summaries are only computed at the 'full' verbosity
+        log.debug("\nFinal data types:\n%s", lazy(lambda: self.df.dtypes))
+        log.debug("\nFinal missing values:\n%s", lazy(lambda: missing_values_summary(self.nulls().counts())))
+        log.debug("\nDataset summary:\n%s", lazy(self.df.describe, include='all'))
+    
+    def print_date_formats(self):
+        """Print how many rows of each date column were parsed with each format."""
+        if not self.cleaning_report['date_formats']:
+            return
+        log.info("\nDate formats parsed:")
+        for col, stats in self.cleaning_report['date_formats'].items():
+            counts = ', '.join(f"{fmt}: {count}" for fmt, count in stats['format_counts'].items())
+            log.info(f"  {col}: {counts}")
+    
+    def print_rule_violations(self):
+        """Print the exact violation count of every validation rule."""
+        if not self.cleaning_report['rule_violations']:
+            return
+        log.info("\nValidation rule violations:")
+        for name, count in self.cleaning_report['rule_violations'].items():
+            log.info(f"  {name}: {count}")
     
-    def save_cleaned_data(self, output_file):
-        """Save the cleaned dataset with proper data types."""
-        print(f"\nSaving cleaned dataset to {output_file}...")
+    @instrumented_step
+    def save_cleaned_data(self, output_file, fmt=None, compression=None, partition_by=None):
+        """Save the cleaned dataset with proper data types.
+        
+        `fmt` is 'csv', 'parquet' or 'feather' (default: from the file
+        extension). Parquet can be partitioned by 'admission_month' or
+        'admission_type'; columnar formats keep the datetime and categorical dtypes.
+        """
+        fmt = fmt or infer_format(output_file)
+        log.info(f"\nSaving cleaned dataset to {output_file} ({fmt})...")
         
         # Ensure dates are properly formatted before saving
         date_columns = ['Date of Admission', 'Discharge Date']
         for col in date_columns:
             if col in self.df.columns and self.df[col].dtype == 'datetime64[ns]':
-                print(f"Maintaining {col} as datetime64[ns] (will be saved as text in CSV)")
+                stored_as = "text in CSV" if fmt == 'csv' else f"a timestamp column in {fmt}"
+                log.info(f"Maintaining {col} as datetime64[ns] (will be saved as {stored_as})")
         
         # Save with proper index handling
-        self.df.to_csv(output_file, index=False)
-        print("Dataset saved successfully!")
+        if fmt == 'csv':
+            self.df.to_csv(output_file, index=False)
+        else:
+            write_columnar(self.df, output_file, fmt, compression, partition_by)
+        log.info("Dataset saved successfully!")
         
         # Verify the save
-        print(f"Saved dataset shape: {self.df.shape}")
-        print(f"Data types maintained:")
+        log.info(f"Saved dataset shape: {self.df.shape}")
+        log.debug(f"Data types maintained:")
         for col in ['Date of Admission', 'Discharge Date']:
             if col in self.df.columns:
-                print(f"  {col}: {self.df[col].dtype}")
+                log.debug(f"  {col}: {self.df[col].dtype}")
+    
+    def save_step_metrics(self, output_file):
+        """Add the step metrics to the report and write them next to the output."""
+        if self.step_metrics is None:
+            return None
+        self.cleaning_report['step_metrics'] = self.step_metrics.as_list()
+        log.info("\n=== Step Metrics ===")
+        self.step_metrics.print_table()
+        path = metrics_path_for(output_file)
+        self.step_metrics.save(path, pipeline='cleaning', input_file=self.input_file, output_file=output_file,
+                               peak_memory=self.cleaning_report.get('peak_memory'))
+        log.info(f"Step metrics saved to {path}")
+        return path
     
-    def run_full_cleaning(self, output_file=None):
+    def run_full_cleaning(self, output_file=None, fmt=None, compression=None, partition_by=None):
         """Run the complete data cleaning pipeline."""
-        print("Starting Hospital Dataset Cleaning Pipeline")
-        print("="*50)
+        log.info("Starting Hospital Dataset Cleaning Pipeline")
+        log.info("="*50)
         
-        # Load data
-        self.load_data()
+        baseline_rss = rss_mb() if self.memory_bounded else None
+        with copy_on_write(self.memory_bounded):
+            if not self.restore_cached_cleaning():
+                # Load data
+                self.load_data()
+                self.run_cleaning_steps()
+                self.cache_cleaning_result()
+            
+            # Save cleaned data
+            if output_file:
+                self.save_cleaned_data(output_file, fmt, compression, partition_by)
+        self.save_hash_index()
+        if self.memory_bounded:
+            self.report_peak_memory(baseline_rss)
+        
+        return self.df
+    
+    def cleaning_cache_key(self):
+        """Step cache key of the cleaning result, or None when it cannot be cached."""
+        # Rows dropped as cross-run duplicates depend on the index, not just the input
+        if self.cache is None or self.hash_index is not None:
+            return None
+        return self.cache.key('cleaning', self.cache.digest(self.input_file), self.rule_engine.rules,
+                              self.quantile_error, self.exact_quantile_limit, code_version(CLEANING_CODE))
+    
+    def restore_cached_cleaning(self):
+        """Reuse a cached cleaning result of the same input, rules and code; True on a hit."""
+        key = self.cleaning_cache_key()
+        cached = self.cache.get(key) if key else None
+        if cached is None:
+            return False
+        self.df, details = cached
+        self.cleaning_report.update(details['report'])
+        self.fitted_stats = details['fitted_stats']
+        log.info("Reusing the cached cleaning result")
+        self.generate_data_quality_report()
+        return True
+    
+    def cache_cleaning_result(self):
+        key = self.cleaning_cache_key()
+        if key:
+            self.cache.put(key, 'cleaning', self.input_file, self.df,
+                           {'report': self.cleaning_report, 'fitted_stats': self.fitted_stats})
+    
+    def checkpoint_steps(self, output_file=None, fmt=None, compression=None, partition_by=None):
+        """The pipeline as (step, function, changes the frame) for checkpointed runs."""
+        row_local = self.ROW_LOCAL_STEPS if self.workers == 1 else ['run_row_local_steps_parallel']
+        steps = [('load_data', self.load_data, True), ('remove_duplicates', self.remove_duplicates, True)]
+        steps += [(step, partial(self.run_row_local_step, step), True) for step in row_local]
+        steps += [('handle_missing_values', self.handle_missing_values, True),
+                  ('detect_outliers', self.detect_outliers, False),
+                  ('generate_data_quality_report', self.generate_data_quality_report, False)]
+        if output_file:
+            steps.append(('save_cleaned_data',
+                          partial(self.save_cleaned_data, output_file, fmt, compression, partition_by), False))
+        return steps
+    
+    def run_row_local_step(self, step):
+        """Run a row-local step (or all of them in parallel) and mark the columns it wrote."""
+        getattr(self, step)()
+        steps = self.ROW_LOCAL_STEPS if step == 'run_row_local_steps_parallel' else [step]
+        self._wrote(*[col for name in steps for col in self.STEP_COLUMNS[name].writes])
+    
+    def checkpoint_state(self):
+        return {name: getattr(self, name) for name in self.CHECKPOINT_STATE}
+    
+    def restore_checkpoint(self, df, state):
+        self.df = df
+        self.null_index = None
+        for name, value in state.items():
+            setattr(self, name, value)
+    
+    def run_checkpointed_cleaning(self, checkpoint_dir, output_file=None, fmt=None, compression=None,
+                                  partition_by=None, resume=False, steps=None):
+        """Run the pipeline with a checkpoint after every step (see checkpoints.py).
+        
+        With `resume`, the run continues after the last checkpoint in
+        `checkpoint_dir`; `steps` runs only the named steps on the checkpoint
+        before the first of them. If they give their checkpointed results, the
+        later checkpoints are kept and the output is written from them;
+        otherwise `resume` continues after the last of them. Returns the
+        steps that ran.
+        """
+        log.info("Starting Hospital Dataset Cleaning Pipeline (checkpointed)")
+        log.info("="*50)
         
+        store = CheckpointStore(checkpoint_dir, 'cleaning', self.input_file,
+                                [self.rule_engine.rules, self.quantile_error, self.exact_quantile_limit],
+                                code_version(CLEANING_CODE))
+        baseline_rss = rss_mb() if self.memory_bounded else None
+        with copy_on_write(self.memory_bounded):
+            ran = run_checkpointed(self, self.checkpoint_steps(output_file, fmt, compression, partition_by),
+                                   store, resume, steps, outputs=['save_cleaned_data'])
+        if self.memory_bounded and self.step_metrics.max_rss_mb is not None:
+            self.report_peak_memory(baseline_rss)
+        
+        return ran
+    
+    def report_peak_memory(self, baseline_rss):
+        """Compare the highest per-step RSS with the RSS before loading and the loaded dataset."""
+        summary = peak_summary(baseline_rss, self.cleaning_report['memory_mb']['schema'],
+                               self.step_metrics.max_rss_mb)
+        self.cleaning_report['peak_memory'] = summary
+        log.info("\n" + describe_peak(summary))
+    
+    def run_cleaning_steps(self):
+        """Run all cleaning steps on the loaded rows and report on them."""
         # Run all cleaning steps in logical order
         self.remove_duplicates()  # Remove duplicates first
-        self.clean_names()
-        self.clean_gender_data()  # Now properly handles "Nan" strings
-        self.clean_blood_types()
-        self.clean_dates()
-        self.clean_hospital_names()
-        self.clean_numerical_data()
-        self.clean_categorical_data()
+        if self.workers > 1:
+            self.run_row_local_steps_parallel()
+        else:
+            self.clean_names()
+            self.clean_gender_data()  # Now properly handles "Nan" strings
+            self.clean_blood_types()
+            self.clean_dates()
+            self.clean_hospital_names()
+            self.clean_numerical_data()
+            self.clean_categorical_data()
+        self._wrote(*[col for step in self.ROW_LOCAL_STEPS for col in self.STEP_COLUMNS[step].writes])
         self.handle_missing_values()  # Updated with ML-appropriate policies
         self.detect_outliers()
         
         # Generate report
         self.generate_data_quality_report()
+    
+    @instrumented_step
+    def run_row_local_steps_parallel(self):
+        """Run the row-local steps in worker processes, steps on different columns at the same time.
+        
+        Output and report entries are merged in step order, so the result is
+        the same as running the steps one after another.
+        """
+        context = {'rules': self.rule_engine.rules, 'load_info': self.load_info, 'verbosity': current_verbosity()}
+        waves, payloads, wave_seconds = run_in_waves(self.df, self.ROW_LOCAL_STEPS, self.STEP_COLUMNS,
+                                                     _run_step_in_worker, context, self.workers)
+        
+        for step in self.ROW_LOCAL_STEPS:
+            payload = payloads[step]
+            # Already filtered by the verbosity in the worker
+            sys.stdout.write(payload['output'])
+            self.cleaning_report['issues_fixed'].extend(payload['issues_fixed'])
+            violations = self.cleaning_report['rule_violations']
+            for name, count in payload['rule_violations'].items():
+                violations[name] = violations.get(name, 0) + count
+            for col, stats in payload['date_formats'].items():
+                merge_format_stats(self.cleaning_report['date_formats'].setdefault(col, {}), stats)
+        
+        step_seconds = {step: payloads[step]['seconds'] for step in self.ROW_LOCAL_STEPS}
+        self.cleaning_report['parallel'] = {
+            'workers': self.workers,
+            'waves': waves,
+            'wave_seconds': wave_seconds,
+            'step_seconds': step_seconds,
+        }
+        log.info(f"\nRan {len(step_seconds)} steps in {len(waves)} wave(s) on {self.workers} workers: "
+                 f"{sum(wave_seconds):.2f}s wall, {sum(step_seconds.values()):.2f}s of step time, "
+                 f"slowest step {max(step_seconds, key=step_seconds.get)} ({max(step_seconds.values()):.2f}s)")
+    
+    def run_partitioned_cleaning(self, output_file=None, partitions=2, fmt=None, compression=None,
+                                 partition_by=None):
+        """Clean contiguous row ranges of the input on `partitions` worker processes.
+        
+        Workers hash their rows for duplicate detection, run the row-local
+        steps and return value counts of the numerical columns. Duplicates,
+        the median Age and the outlier bounds come from the merged partial
+        results, and the partitions are concatenated in their original order,
+        so the output is identical to `run_full_cleaning`.
+        """
+        log.info(f"Starting Hospital Dataset Cleaning Pipeline (row-partitioned, {partitions} workers)")
+        log.info("="*50)
+        
+        self.load_data()
+        bounds = partition_bounds(len(self.df), partitions)
+        started = time.perf_counter()
+        specs, blocks = share_frame(self.df)
+        try:
+            with ProcessPoolExecutor(max_workers=partitions) as pool:
+                # Duplicate detection: per-partition row hashes, merged in row order
+                futures = [pool.submit(_hash_partition, specs, start, stop) for start, stop in bounds]
+                hashes = np.concatenate([future.result() for future in futures])
+                log.info("\n=== Removing Duplicate Rows ===")
+                keep = self._record_duplicates(pd.Series(hashes).duplicated().to_numpy(), hashes)
+                log.info(f"Rows removed: {int((~keep).sum())}")
+                
+                futures = []
+                for number, (start, stop) in enumerate(bounds):
+                    outputs, output_blocks = allocate_outputs(list(self.df.columns), int(keep[start:stop].sum()))
+                    blocks.extend(output_blocks)
+                    # The load-time date statistics cover the whole file, so only one partition reports them
+                    context = {'rules': self.rule_engine.rules, 'load_info': self.load_info if number == 0 else {},
+                               'quantile_settings': (self.quantile_error, self.exact_quantile_limit)}
+                    futures.append(pool.submit(_clean_partition, specs, start, stop, keep[start:stop],
+                                               outputs, context))
+                results = [future.result() for future in futures]
+                parts = [read_frame(written) for written, _ in results]
+        finally:
+            release(blocks)
+        
+        index = self.df.index[keep]
+        self.df = pd.concat(parts, ignore_index=True)
+        self.df.index = index
+        
+        log.info("\n=== Merging Partitions ===")
+        chunk_messages = []
+        column_stats = {col: StreamingColumnStats(self.quantile_error, self.exact_quantile_limit)
+                        for col in self.NUMERICAL_COLUMNS}
+        for number, (_, payload) in enumerate(results, 1):
+            log.info(f"  Partition {number}: {payload['rows']} rows cleaned in {payload['seconds']:.2f}s")
+            chunk_messages.extend(payload['issues_fixed'])
+            violations = self.cleaning_report['rule_violations']
+            for name, count in payload['rule_violations'].items():
+                violations[name] = violations.get(name, 0) + count
+            for col, stats in payload['date_formats'].items():
+                merge_format_stats(self.cleaning_report['date_formats'].setdefault(col, {}), stats)
+            for col, stats in payload['column_stats'].items():
+                column_stats[col].merge(stats)
+        self.cleaning_report['issues_fixed'].extend(self._merge_issue_messages(chunk_messages))
+        self.cleaning_report['partitioned'] = {
+            'partitions': len(bounds),
+            'seconds': time.perf_counter() - started,
+            'partition_seconds': [payload['seconds'] for _, payload in results],
+        }
+        
+        # The merged statistics stand in for the ones a single pass would fit
+        self.saved_stats = {
+            'medians': {'Age': column_stats['Age'].median()},
+            'outlier_bounds': {col: self._iqr_bounds(stats) for col, stats in column_stats.items()
+                               if stats.count > 0},
+        }
+        self.handle_missing_values()
+        self.detect_outliers()
+        self.generate_data_quality_report()
         
-        # Save cleaned data
         if output_file:
-            self.save_cleaned_data(output_file)
+            self.save_cleaned_data(output_file, fmt, compression, partition_by)
+        self.save_hash_index()
         
         return self.df
+    
+    @staticmethod
+    def _iqr_bounds(stats):
+        """[lower, upper] outlier bounds from a quantile sketch or column statistics."""
+        Q1, Q3 = stats.quantiles([0.25, 0.75])
+        IQR = Q3 - Q1
+        return [Q1 - 1.5 * IQR, Q3 + 1.5 * IQR]
+    
+    def _fresh_cleaner(self):
+        """New cleaner for the same input and settings, without a dedupe index."""
+        return HospitalDataCleaner(self.input_file, self.cache_size, self.rule_engine.rules,
+                                   quantile_error=self.quantile_error,
+                                   exact_quantile_limit=self.exact_quantile_limit)
+    
+    def run_scaling_benchmark(self, worker_counts=SCALING_WORKER_COUNTS):
+        """Time the row-partitioned mode for each worker count against a single-process run.
+        
+        Every partitioned output is compared byte for byte with the
+        single-process output. Results go into cleaning_report['scaling_benchmark'].
+        """
+        log.info("\n" + "="*50)
+        log.info(f"SCALING BENCHMARK ({os.cpu_count()} CPUs available)")
+        log.info("="*50)
+        
+        fresh_cleaner = self._fresh_cleaner
+        
+        def timed(run, path):
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run(path)
+            return time.perf_counter() - started
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            reference = os.path.join(tmp_dir, 'single_process.csv')
+            single_seconds = timed(fresh_cleaner().run_full_cleaning, reference)
+            with open(reference, 'rb') as f:
+                expected = f.read()
+            
+            runs = []
+            for workers in worker_counts:
+                path = os.path.join(tmp_dir, f'partitioned_{workers}.csv')
+                seconds = timed(partial(fresh_cleaner().run_partitioned_cleaning, partitions=workers), path)
+                with open(path, 'rb') as f:
+                    identical = f.read() == expected
+                runs.append({'workers': workers, 'seconds': seconds, 'speedup': single_seconds / seconds,
+                             'identical': identical})
+        
+        log.info(f"Single process: {single_seconds:.2f}s")
+        log.info(f"{'Workers':>8} {'Seconds':>9} {'Speedup':>8}  Identical output")
+        for run in runs:
+            log.info(f"{run['workers']:>8} {run['seconds']:>9.2f} {run['speedup']:>7.2f}x  {run['identical']}")
+        
+        self.cleaning_report['scaling_benchmark'] = {'single_process_seconds': single_seconds, 'runs': runs}
+        return runs
+    
+    def backend_operations(self):
+        """The in-memory cleaning steps as backend-neutral operations (see execution_backends.py).
+        
+        The median fill of Age is left out: it needs a statistic of the
+        cleaned rows, which `lazy_plan` adds as a `Statistic`.
+        """
+        def rules(columns):
+            return [operation('rule', rule['column'], rule=rule) for rule in self.rule_engine.rules
+                    if rule['column'] in columns]
+        
+        return ([operation('dedupe'),
+                 operation('map_values', 'Name', func=normalize_names, vectorized=True),
+                 operation('map_values', 'Doctor', func=partial(normalize_names, keep_case=DOCTOR_SUFFIXES),
+                           vectorized=True)] +
+                rules(['Gender']) +
+                rules(['Blood Type']) +
+                [operation('null_if_before', 'Discharge Date', other='Date of Admission'),
+                 operation('map_values', 'Hospital', func=clean_hospital_name)] +
+                rules(self.NUMERICAL_COLUMNS) +
+                [operation('map_values', 'Insurance Provider', func=clean_insurance_name),
+                 operation('map_values', 'Medication', func=clean_medication_name)])
+    
+    def lazy_plan(self):
+        """The cleaning pipeline as a lazy plan of operations (see lazy_plan.py)."""
+        index_col = None if is_columnar_path(self.input_file) else 0
+        plan = LazyPlan(self.input_file, index_col=index_col)
+        plan.extend(op for op in self.backend_operations()
+                    if op.column is None or (op.column in plan.columns and
+                                             op.params.get('other', op.column) in plan.columns))
+        if 'Age' in plan.columns:
+            plan.add('fill', 'Age', value=Statistic('median'))
+        return plan
+    
+    def run_backend_cleaning(self, backend_name, output_file=None, fmt=None, compression=None):
+        """Run the cleaning pipeline as an optimized lazy plan on pandas, Polars or DuckDB.
+        
+        The input is scanned lazily and the result is only materialized when
+        it is written. Returns the backend and its (lazy) result.
+        """
+        log.info(f"Starting Hospital Dataset Cleaning Pipeline ({backend_name} backend)")
+        log.info("="*50)
+        started = time.perf_counter()
+        
+        backend = make_backend(backend_name)
+        plan = self.lazy_plan().optimize()
+        relation = plan.scan(backend)
+        columns = backend.column_kinds(relation)
+        self.cleaning_report['original_rows'] = backend.count(relation)
+        log.info(f"Dataset scanned: {self.cleaning_report['original_rows']} rows, {len(columns)} columns")
+        
+        relation = plan.collect(backend, relation)
+        if 'Age' in plan.statistics:
+            log.info(f"Filled missing ages with median value: {plan.statistics['Age']}")
+        self.cleaning_report['final_rows'] = backend.count(relation)
+        
+        if output_file:
+            fmt = fmt or infer_format(output_file)
+            log.info(f"\nSaving cleaned dataset to {output_file} ({fmt})...")
+            backend.write(relation, output_file, fmt, compression)
+            log.info("Dataset saved successfully!")
+        
+        seconds = time.perf_counter() - started
+        self.cleaning_report['backend'] = {'name': backend_name, 'seconds': seconds,
+                                           'optimizations': plan.notes}
+        log.info(f"Ran {len(plan.operations)} operations on {backend_name} in {seconds:.2f}s")
+        return backend, relation
+    
+    def check_backend_equivalence(self, backends=None):
+        """Run the pipeline on each installed backend and compare its result with pandas'.
+        
+        The lazy plan on pandas is listed as 'lazy'. Results go into
+        cleaning_report['backend_equivalence'].
+        """
+        log.info("\n" + "="*50)
+        log.info("BACKEND EQUIVALENCE CHECK")
+        log.info("="*50)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            expected = self._fresh_cleaner().run_full_cleaning()
+            results = {'pandas': {'rows': len(expected), 'seconds': time.perf_counter() - started,
+                                  'differences': {}}}
+            for name in backends or available_backends():
+                started = time.perf_counter()
+                backend, relation = self._fresh_cleaner().run_backend_cleaning(name)
+                actual = backend.to_pandas(relation)
+                results['lazy' if name == 'pandas' else name] = {'rows': len(actual), 'seconds': time.perf_counter() - started,
+                                 'differences': compare_frames(expected, actual)}
+        
+        print_equivalence_table(results)
+        self.cleaning_report['backend_equivalence'] = results
+        return results
+    
+    def run_incremental_cleaning(self, output_file, state_file=None, refit_every=0, full_refit=False):
+        """Clean only the rows added to the input since the last run and append them.
+        
+        New rows are cleaned with the median Age and outlier bounds saved by
+        the last full run, and deduplicated against every earlier row through
+        the row-hash index. A full refit rewrites the output and the state
+        (see incremental_state.py for when that happens).
+        """
+        log.info("Starting Hospital Dataset Cleaning Pipeline (incremental)")
+        log.info("="*50)
+        
+        state_file = state_file or state_path_for(output_file)
+        state = load_state(state_file)
+        if self.hash_index is None:
+            self.hash_index = open_hash_index(os.path.splitext(state_file)[0] + '_rows.npz')
+        
+        reason = refit_reason(state, self.input_file, output_file, refit_every, full_refit)
+        if reason:
+            log.info(f"Full refit: {reason}")
+            watermark = input_watermark(self.input_file)
+            # Every row is read again, so start from an empty index
+            self.hash_index = self.hash_index.cleared()
+            self.run_full_cleaning(output_file)
+            fitted_value(None, self.fitted_stats, 'medians', 'Age', lambda: self.df['Age'].median())
+            watermark['rows'] = self.cleaning_report['original_rows']
+            watermark['max_admission_date'] = max_admission_date(self.df)
+            state = {
+                'watermark': watermark,
+                'statistics': self.fitted_stats,
+                'output_columns': list(self.df.columns),
+                'output_dtype_kinds': output_dtype_kinds(self.df),
+                'runs_since_refit': 0,
+            }
+        else:
+            self.saved_stats = state['statistics']
+            self.df, self.load_info, watermark = read_new_rows(self.input_file, state['watermark'], index_col=0)
+            new_rows = 0 if self.df is None else len(self.df)
+            log.info(f"Rows since the watermark ({state['watermark']['rows']} rows processed): {new_rows}")
+            
+            if new_rows > 0:
+                self.cleaning_report['original_rows'] = new_rows
+                self.run_cleaning_steps()
+                appended = align_to_output(self.df, state['output_columns'], state['output_dtype_kinds'])
+                appended.to_csv(output_file, mode='a', index=False, header=False)
+                log.info(f"Appended {len(appended)} rows to {output_file}")
+                self.save_hash_index()
+            
+            state = dict(state, watermark=watermark, runs_since_refit=state.get('runs_since_refit', 0) + 1)
+        
+        save_state(state_file, state)
+        self.cleaning_report['final_rows'] = 0 if self.df is None else len(self.df)
+        log.info(f"Incremental state saved to {state_file}")
+        
+        return self.cleaning_report
+    
+    def estimate_chunksize(self, memory_budget_mb):
+        """Estimate how many rows fit in the memory budget from a small sample."""
+        sample = pd.read_csv(self.input_file, index_col=0, nrows=1000)
+        bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+        # The cleaning steps hold a few temporary copies of the chunk at once
+        working_set_factor = 4
+        chunksize = int(memory_budget_mb * 1024 * 1024 / (bytes_per_row * working_set_factor))
+        return max(chunksize, 1000)
+    
+    @staticmethod
+    def _merge_issue_messages(messages):
+        """Combine per-chunk messages such as 'Fixed 3 ...' into one total per message."""
+        merged = {}
+        for message in messages:
+            match = re.match(r'^(\S+) (\d+) (.*)$', message)
+            if match:
+                key = (match.group(1), match.group(3))
+                merged[key] = merged.get(key, 0) + int(match.group(2))
+            else:
+                merged.setdefault((message, None), None)
+        
+        return [f"{verb} {total} {rest}" if rest is not None else verb
+                for (verb, rest), total in merged.items()]
+    
+    def run_streaming_cleaning(self, output_file, chunksize=None, memory_budget_mb=256):
+        """Run the cleaning pipeline chunk by chunk within a fixed memory budget.
+        
+        Row-local steps run on each chunk. Duplicate detection, the median Age
+        fill and the outlier bounds use state carried across chunks, so the
+        output matches `run_full_cleaning` on the same input byte for byte.
+        The row hashes take 8 bytes per distinct row and are not bounded by
+        the budget. The column statistics are quantile sketches, exact up to
+        `exact_quantile_limit` values per column and approximate past it (see
+        `StreamingColumnStats`).
+        """
+        log.info("Starting Hospital Dataset Cleaning Pipeline (streaming)")
+        log.info("="*50)
+        
+        if chunksize is None:
+            chunksize = self.estimate_chunksize(memory_budget_mb)
+        log.info(f"Processing in chunks of {chunksize} rows")
+        
+        self.value_caches = {}
+        # Hashes of this run's rows; earlier runs are checked through self.hash_index
+        seen_hashes = RowHashIndex()
+        new_hashes = []
+        duplicate_count = 0
+        cross_run_count = 0
+        chunk_messages = []
+        float_columns = set()
+        numeric_columns = set()
+        column_stats = {col: StreamingColumnStats(self.quantile_error, self.exact_quantile_limit)
+                        for col in self.NUMERICAL_COLUMNS}
+        missing_counts = None
+        
+        output_dir = os.path.dirname(os.path.abspath(output_file))
+        spill_fd, spill_file = tempfile.mkstemp(suffix='.csv', dir=output_dir)
+        os.close(spill_fd)
+        
+        try:
+            # Pass 1: deduplicate against every earlier row and run the row-local steps
+            wrote_header = False
+            reader = read_csv_chunks_with_schema(self.input_file, chunksize, index_col=0)
+            for chunk_number, (chunk, self.load_info) in enumerate(reader, 1):
+                self.cleaning_report['original_rows'] += len(chunk)
+                
+                hashes = row_hashes(chunk)
+                duplicates = hashes.duplicated().to_numpy() | seen_hashes.contains(hashes)
+                duplicate_count += int(duplicates.sum())
+                seen_hashes.add(hashes[~duplicates])
+                
+                if self.hash_index is not None:
+                    cross_run = ~duplicates & self.hash_index.contains(hashes)
+                    cross_run_count += int(cross_run.sum())
+                    new_hashes.append(hashes.to_numpy()[~duplicates & ~cross_run])
+                    duplicates |= cross_run
+                
+                self.df = chunk[~duplicates]
+                if self.df.empty:
+                    continue
+                
+                self.cleaning_report['issues_fixed'] = []
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for step in self.ROW_LOCAL_STEPS:
+                        getattr(self, step)()
+                chunk_messages.extend(self.cleaning_report['issues_fixed'])
+                
+                numeric_columns.update(self.df.select_dtypes(include='number').columns)
+                float_columns.update(self.df.select_dtypes(include='float').columns)
+                for col, stats in column_stats.items():
+                    if col in self.df.columns:
+                        stats.update(self.df[col])
+                chunk_missing = self.df.isnull().sum()
+                missing_counts = chunk_missing if missing_counts is None else missing_counts.add(chunk_missing, fill_value=0)
+                
+                self.df.to_csv(spill_file, mode='a', index=False, header=not wrote_header)
+                wrote_header = True
+                log.info(f"  Chunk {chunk_number}: {len(self.df)} rows cleaned")
+            
+            self.df = None
+            issues = []
+            self.cleaning_report['duplicates'] = {'within_file': duplicate_count, 'cross_run': cross_run_count}
+            self.report_duplicates(duplicate_count, cross_run_count, issues)
+            issues.extend(self._merge_issue_messages(chunk_messages))
+            
+            # Global statistics from the carried-over state
+            median_age = None
+            if missing_counts is not None:
+                missing_summary = missing_counts[missing_counts > 0].astype(int)
+                if len(missing_summary) > 0:
+                    log.info("\nMissing values per column:")
+                    log.info(missing_summary)
+                    if 'Age' in missing_summary.index:
+                        median_age = column_stats['Age'].median()
+                        if not column_stats['Age'].exact:
+                            log.warning(f"Age has more than {self.exact_quantile_limit:,} values; its median is "
+                                        "approximate, so the output can differ from the in-memory run")
+                        log.info(f"Filled missing ages with median value: {median_age}")
+                        issues.append(f"Filled {missing_summary['Age']} missing ages with median")
+                        column_stats['Age'].add(median_age, missing_summary['Age'])
+                        missing_counts['Age'] = 0
+                    issues.append("Applied ML-appropriate missing value policies")
+            self.cleaning_report['issues_fixed'] = issues
+            self.report_streaming_outliers(column_stats)
+            
+            # Pass 2: apply the global fills and write the final output
+            final_rows = 0
+            if wrote_header:
+                spill_dtypes = {col: 'float64' if col in float_columns else None for col in numeric_columns}
+                header = pd.read_csv(spill_file, nrows=0).columns
+                read_dtypes = {col: spill_dtypes.get(col, str) for col in header if spill_dtypes.get(col, str) is not None}
+                na_values = {col: [''] for col in float_columns}
+                # The default fast float parser can change the last digit of the
+                # 17-digit values pass 1 wrote; round_trip reads them back exactly
+                reader = pd.read_csv(spill_file, chunksize=chunksize, dtype=read_dtypes,
+                                     keep_default_na=False, na_values=na_values, float_precision='round_trip')
+                for chunk_number, chunk in enumerate(reader):
+                    if median_age is not None:
+                        chunk['Age'] = chunk['Age'].fillna(median_age)
+                    chunk.to_csv(output_file, mode='w' if chunk_number == 0 else 'a',
+                                 index=False, header=chunk_number == 0)
+                    final_rows += len(chunk)
+            else:
+                pd.DataFrame().to_csv(output_file, index=False)
+        finally:
+            os.remove(spill_file)
+        
+        # New rows only join the persistent index once the output is written
+        if self.hash_index is not None:
+            for batch in new_hashes:
+                self.hash_index.add(batch)
+            self.save_hash_index()
+        
+        self.cleaning_report['final_rows'] = final_rows
+        self.cleaning_report['value_cache_stats'] = {col: cache.stats() for col, cache in self.value_caches.items()}
+        self.value_caches = None
+        self.generate_streaming_quality_report(missing_counts)
+        log.info(f"\nStreaming output saved to {output_file}")
+        
+        return self.cleaning_report
+    
+    def check_streaming_equivalence(self, output_file):
+        """Compare a streaming run's output with run_full_cleaning's, byte for byte.
+        
+        Returns True if they are identical; the result goes into
+        cleaning_report['streaming_equivalence'].
+        """
+        log.info("\n" + "="*50)
+        log.info("STREAMING EQUIVALENCE CHECK")
+        log.info("="*50)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            reference = os.path.join(tmp_dir, 'in_memory.csv')
+            with contextlib.redirect_stdout(io.StringIO()):
+                self._fresh_cleaner().run_full_cleaning(reference)
+            line = first_difference_line(output_file, reference)
+        
+        identical = line is None
+        if identical:
+            log.info(f"Streaming output is byte-identical to the in-memory run "
+                     f"({os.path.getsize(output_file):,} bytes)")
+        else:
+            log.error(f"Streaming output differs from the in-memory run from line {line} on")
+        self.cleaning_report['streaming_equivalence'] = {'identical': identical}
+        return identical
+    
+    def report_streaming_outliers(self, column_stats):
+        """Report IQR outliers from the accumulated column statistics."""
+        log.info("\n=== Outlier Detection ===")
+        
+        for col, stats in column_stats.items():
+            if stats.count == 0:
+                continue
+            lower_bound, upper_bound = self._iqr_bounds(stats)
+            
+            outlier_count = stats.count_outside(lower_bound, upper_bound)
+            if outlier_count > 0:
+                log.info(f"Found {outlier_count} potential outliers in {col}")
+                log.info(f"  Range: {stats.min():.2f} - {stats.max():.2f}")
+                log.info(f"  Normal range (IQR): {lower_bound:.2f} - {upper_bound:.2f}")
+    
+    def generate_streaming_quality_report(self, missing_counts):
+        """Generate the data quality report from streaming totals."""
+        log.info("\n" + "="*50)
+        log.info("DATA QUALITY REPORT")
+        log.info("="*50)
+        
+        original_rows = self.cleaning_report['original_rows']
+        final_rows = self.cleaning_report['final_rows']
+        log.info(f"Original dataset size: {original_rows} rows")
+        log.info(f"Final dataset size: {final_rows} rows")
+        log.info(f"Rows removed: {original_rows - final_rows}")
+        
+        log.info("\nIssues fixed:")
+        for issue in self.cleaning_report['issues_fixed']:
+            log.info(f"  • {issue}")
+        
+        self.print_date_formats()
+        self.print_rule_violations()
+        
+        log.info("\nValue cache usage:")
+        for col, stats in self.cleaning_report['value_cache_stats'].items():
+            log.info(f"  {col}: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+        
+        if missing_counts is not None:
+            missing_counts = missing_counts.astype(int)
+        log.debug("\nFinal missing values:\n%s", lazy(missing_values_summary, missing_counts))
+
+def _run_step_in_worker(step, inputs, outputs, context):
+    """Run one cleaning step in a worker process on columns passed through shared memory."""
+    started = time.perf_counter()
+    configure_logging(context['verbosity'])
+    cleaner = HospitalDataCleaner(None, rules=context['rules'])
+    cleaner.df = read_frame(inputs)
+    cleaner.load_info = context['load_info']
+    
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        getattr(cleaner, step)()
+    
+    written = write_frame(cleaner.df, outputs)
+    report = cleaner.cleaning_report
+    return written, {
+        'output': output.getvalue(),
+        'issues_fixed': report['issues_fixed'],
+        'rule_violations': report['rule_violations'],
+        'date_formats': report['date_formats'],
+        'seconds': time.perf_counter() - started,
+    }
+
+def _hash_partition(specs, start, stop):
+    """Row hashes of one partition; duplicates are found after merging them in row order."""
+    return row_hashes(read_frame(specs, start, stop)).to_numpy()
+
+def _clean_partition(specs, start, stop, keep, outputs, context):
+    """Run the row-local steps on one partition in a worker process."""
+    started = time.perf_counter()
+    cleaner = HospitalDataCleaner(None, rules=context['rules'])
+    cleaner.df = read_frame(specs, start, stop)[keep].reset_index(drop=True)
+    cleaner.load_info = context['load_info']
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        for step in HospitalDataCleaner.ROW_LOCAL_STEPS:
+            getattr(cleaner, step)()
+    
+    column_stats = {}
+    for col in HospitalDataCleaner.NUMERICAL_COLUMNS:
+        if col in cleaner.df.columns:
+            column_stats[col] = StreamingColumnStats(*context['quantile_settings'])
+            column_stats[col].update(cleaner.df[col])
+    
+    written = write_frame(cleaner.df, outputs)
+    report = cleaner.cleaning_report
+    return written, {
+        'rows': len(cleaner.df),
+        'issues_fixed': report['issues_fixed'],
+        'rule_violations': report['rule_violations'],
+        'date_formats': report['date_formats'],
+        'column_stats': column_stats,
+        'seconds': time.perf_counter() - started,
+    }
 
 def main():
     """Main function to run the data cleaning pipeline."""
-    input_file = "Hospital_dataset.csv"
-    output_file = "Hospital_dataset_final_cleaned.csv"
+    parser = argparse.ArgumentParser(description="Clean the hospital dataset.")
+    parser.add_argument('--input', default="Hospital_dataset.csv", help="Raw input CSV")
+    parser.add_argument('--output', default="Hospital_dataset_final_cleaned.csv", help="Cleaned output CSV")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Clean chunk by chunk instead of loading the whole file")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Rows per chunk in streaming mode (default: derived from --memory-budget-mb)")
+    parser.add_argument('--memory-budget-mb', type=int, default=256,
+                        help="Approximate memory budget per chunk in streaming mode")
+    parser.add_argument('--cache-size', type=int, default=100_000,
+                        help="Distinct values kept per column by the streaming LRU caches")
+    parser.add_argument('--rules', default=None,
+                        help="JSON file with validation rules or per-rule threshold overrides")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv',
+                        help="Output format; columnar formats keep dates and categories typed")
+    parser.add_argument('--compression', default=None,
+                        help="Parquet/Feather compression codec (e.g. snappy, zstd, lz4)")
+    parser.add_argument('--partition-by', choices=list(PARTITION_SCHEMES), default=None,
+                        help="Partition Parquet output by admission year/month or Admission Type")
+    parser.add_argument('--dedupe-index', default=None,
+                        help="Row-hash index (.npz) shared across runs; rows seen before are dropped")
+    parser.add_argument('--bloom-capacity', type=int, default=None,
+                        help="Create the dedupe index as a Bloom filter sized for this many rows")
+    parser.add_argument('--bloom-error-rate', type=float, default=0.001,
+                        help="False-positive rate of a new Bloom-filter dedupe index")
+    parser.add_argument('--quantile-error', type=float, default=DEFAULT_ERROR,
+                        help="Rank error of the quantile sketches used for the outlier bounds")
+    parser.add_argument('--exact-quantile-limit', type=int, default=EXACT_LIMIT,
+                        help="Columns with at most this many values get exact quantiles")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes for the row-local cleaning steps (1: run them in order)")
+    parser.add_argument('--row-partitions', type=int, default=None,
+                        help="Clean this many row ranges in parallel worker processes")
+    parser.add_argument('--scaling-benchmark', action='store_true',
+                        help="Also time the row-partitioned mode on 1, 2, 4, 8 and 16 workers")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only clean rows added since the last run and append them to the output")
+    parser.add_argument('--state', default=None,
+                        help="Incremental state file (default: <output>_state.json)")
+    parser.add_argument('--refit-every', type=int, default=0,
+                        help="In incremental mode, refit on the whole input every N runs (0: never)")
+    parser.add_argument('--full-refit', action='store_true',
+                        help="In incremental mode, reprocess the whole input and refit the statistics")
+    parser.add_argument('--backend', choices=BACKEND_CHOICES, default='pandas',
+                        help="Execution backend; 'auto' picks pandas, Polars or DuckDB from the input size")
+    parser.add_argument('--check-backends', action='store_true',
+                        help="Also run every installed backend and compare its result with pandas'")
+    parser.add_argument('--check-streaming', action='store_true',
+                        help="After a --streaming run, check that its output is byte-identical to the in-memory run's")
+    parser.add_argument('--lazy', action='store_true',
+                        help="Run pandas as an optimized lazy plan (pruned columns, fused steps)")
+    parser.add_argument('--explain', action='store_true',
+                        help="Print the optimized lazy plan with estimated costs and exit")
+    parser.add_argument('--step-metrics', action='store_true',
+                        help="Record time, memory and rows changed per step in <output>_metrics.json")
+    parser.add_argument('--memory-bounded', action='store_true',
+                        help="Copy-on-Write run without full-frame copies; records peak RSS per step")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Step cache directory: reuse the parsed input and the cleaning result across runs")
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MB,
+                        help="Size limit of the step cache; least recently used entries are evicted")
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help="Write a checkpoint after every step to this directory")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue after the last checkpoint in --checkpoint-dir")
+    parser.add_argument('--steps', default=None,
+                        help="Comma-separated steps to run on the checkpoint before the first of them, "
+                             "e.g. clean_dates,clean_numerical_data")
+    parser.add_argument('--verbosity', choices=list(VERBOSITY_LEVELS), default='full',
+                        help="production: warnings only; summary: steps and counts; full: every diagnostic")
+    args = parser.parse_args()
+    configure_logging(args.verbosity)
+    
+    input_file = args.input
+    output_file = path_for_format(args.output, args.format)
+    if args.streaming and args.format != 'csv':
+        parser.error("--streaming writes CSV; use --format csv")
+    # A dedupe index would make the in-memory run see every row as already cleaned
+    if args.check_streaming and (not args.streaming or args.dedupe_index):
+        parser.error("--check-streaming needs --streaming and cannot be combined with --dedupe-index")
+    if args.incremental and (args.streaming or args.format != 'csv'):
+        parser.error("--incremental appends to a CSV output; use --format csv without --streaming")
+    if args.row_partitions and (args.streaming or args.incremental):
+        parser.error("--row-partitions cannot be combined with --streaming or --incremental")
+    
+    # Streaming, incremental, parallel and dedupe-index runs only exist on pandas
+    pandas_only = (args.streaming or args.incremental or args.row_partitions or args.workers > 1
+                   or args.dedupe_index or args.partition_by)
+    if pandas_only and args.backend not in ('pandas', 'auto'):
+        parser.error(f"--backend {args.backend} cannot be combined with --streaming, --incremental, "
+                     "--row-partitions, --workers, --dedupe-index or --partition-by")
+    if pandas_only and (args.lazy or args.explain):
+        parser.error("--lazy and --explain run the in-memory pipeline; they cannot be combined with --streaming, "
+                     "--incremental, --row-partitions, --workers, --dedupe-index or --partition-by")
+    try:
+        backend = 'pandas' if pandas_only else choose_backend(args.backend, input_file)
+    except ValueError as error:
+        parser.error(str(error))
+    if backend == 'duckdb' and args.format == 'feather':
+        parser.error("The DuckDB backend writes CSV or Parquet; use --format csv or parquet")
+    if args.step_metrics and (backend != 'pandas' or args.lazy):
+        parser.error("--step-metrics measures the eager pandas steps; use --backend pandas without --lazy")
+    if args.memory_bounded and (backend != 'pandas' or args.lazy or args.streaming or args.incremental
+                                or args.row_partitions or args.workers > 1):
+        parser.error("--memory-bounded runs the in-memory pandas pipeline in one process; it cannot be combined "
+                     "with other backends, --lazy, --streaming, --incremental, --row-partitions or --workers")
+    if args.cache_dir and (backend != 'pandas' or args.lazy or args.streaming or args.incremental
+                           or args.row_partitions):
+        parser.error("--cache-dir caches the in-memory pandas pipeline; it cannot be combined with other "
+                     "backends, --lazy, --streaming, --incremental or --row-partitions")
+    if (args.resume or args.steps) and not args.checkpoint_dir:
+        parser.error("--resume and --steps need --checkpoint-dir")
+    # Row hashes added by a failed run are never saved, so dedupe-index runs cannot be resumed
+    if args.checkpoint_dir and (backend != 'pandas' or args.lazy or args.streaming or args.incremental
+                                or args.row_partitions or args.dedupe_index or args.cache_dir):
+        parser.error("--checkpoint-dir runs the in-memory pandas pipeline step by step; it cannot be combined "
+                     "with other backends, --lazy, --streaming, --incremental, --row-partitions, "
+                     "--dedupe-index or --cache-dir")
     
     # Initialize cleaner
-    cleaner = HospitalDataCleaner(input_file)
+    cleaner = HospitalDataCleaner(input_file, cache_size=args.cache_size, rules=args.rules,
+                                  dedupe_index=args.dedupe_index, bloom_capacity=args.bloom_capacity,
+                                  bloom_error_rate=args.bloom_error_rate, quantile_error=args.quantile_error,
+                                  exact_quantile_limit=args.exact_quantile_limit, workers=args.workers,
+                                  step_metrics=args.step_metrics, memory_bounded=args.memory_bounded,
+                                  cache=StepCache(args.cache_dir, args.cache_max_mb) if args.cache_dir else None)
+    
+    if args.explain:
+        log.info(cleaner.lazy_plan().optimize().explain())
+        return
     
     # Run cleaning pipeline
-    cleaned_data = cleaner.run_full_cleaning(output_file)
+    if backend != 'pandas' or args.lazy:
+        cleaner.run_backend_cleaning(backend, output_file, args.format, args.compression)
+        final_rows = cleaner.cleaning_report['final_rows']
+    elif args.streaming:
+        cleaner.run_streaming_cleaning(output_file, chunksize=args.chunksize,
+                                       memory_budget_mb=args.memory_budget_mb)
+        final_rows = cleaner.cleaning_report['final_rows']
+        if args.check_streaming and not cleaner.check_streaming_equivalence(output_file):
+            sys.exit(1)
+    elif args.incremental:
+        cleaner.run_incremental_cleaning(output_file, args.state, args.refit_every, args.full_refit)
+        final_rows = cleaner.cleaning_report['final_rows']
+    elif args.checkpoint_dir:
+        try:
+            ran = cleaner.run_checkpointed_cleaning(args.checkpoint_dir, output_file, args.format,
+                                                    args.compression, args.partition_by, args.resume,
+                                                    args.steps.split(',') if args.steps else None)
+        except ValueError as error:
+            parser.error(str(error))
+        if 'save_cleaned_data' not in ran:
+            log.info(f"\nRan {', '.join(ran) or 'no steps'}; {output_file} was not written")
+            cleaner.save_step_metrics(output_file)
+            return
+        final_rows = len(cleaner.df)
+    elif args.row_partitions:
+        cleaned_data = cleaner.run_partitioned_cleaning(output_file, args.row_partitions, args.format,
+                                                        args.compression, args.partition_by)
+        final_rows = len(cleaned_data)
+    else:
+        cleaned_data = cleaner.run_full_cleaning(output_file, args.format, args.compression,
+                                                 args.partition_by)
+        final_rows = len(cleaned_data)
+    cleaner.save_step_metrics(output_file)
+    
+    log.info("\n" + "="*50)
+    log.info("DATA CLEANING COMPLETED SUCCESSFULLY!")
+    log.info("="*50)
+    log.info(f"Cleaned dataset saved as: {output_file}")
+    log.info(f"Original size: {cleaner.cleaning_report['original_rows']} rows")
+    log.info(f"Final size: {final_rows} rows")
+    if cleaner.cache is not None:
+        log.info(f"Step cache: {cleaner.cache.stats()}")
     
-    print("\n" + "="*50)
-    print("DATA CLEANING COMPLETED SUCCESSFULLY!")
-    print("="*50)
-    print(f"Cleaned dataset saved as: {output_file}")
-    print(f"Original size: {cleaner.cleaning_report['original_rows']} rows")
-    print(f"Final size: {len(cleaned_data)} rows")
+    if args.scaling_benchmark:
+        cleaner.run_scaling_benchmark()
+    if args.check_backends:
+        cleaner.check_backend_equivalence()
     
     # Additional ML-ready recommendations
-    print("\n" + "="*50)
-    print("ML READINESS RECOMMENDATIONS")
-    print("="*50)
-    print("1. Consider dropping 'Name' column (PII/leakage risk)")
-    print("2. Handle remaining nulls in 'Insurance Provider' and 'Medication' as needed")
-    print("3. Encode categorical variables for ML algorithms")
-    print("4. Split dates into separate features if needed (year, month, day)")
-    print("5. Consider feature engineering (e.g., length of stay = discharge - admission)")
+    log.info("\n" + "="*50)
+    log.info("ML READINESS RECOMMENDATIONS")
+    log.info("="*50)
+    log.info("1. Consider dropping 'Name' column (PII/leakage risk)")
+    log.info("2. Handle remaining nulls in 'Insurance Provider' and 'Medication' as needed")
+    log.info("3. Encode categorical variables for ML algorithms")
+    log.info("4. Split dates into separate features if needed (year, month, day)")
+    log.info("5. Consider feature engineering (e.g., length of stay = discharge - admission)")
 
 if __name__ == "__main__":
     main()
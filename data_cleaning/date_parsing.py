@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Format-Aware Date Parsing
+=========================
+
+`pd.to_datetime(..., errors='coerce')` without a format re-parses every row,
+although the dataset only has ~1,800 distinct admission dates. This module:
+- Infers the dominant format from a sample of the distinct values
+- Parses each distinct string once and maps the result back by code
+- Retries values that do not match with other known formats, then with
+  pandas' mixed-format parser
+- Reports how many rows were parsed with each format
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import pandas as pd
+import numpy as np
+
+CANDIDATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%d-%m-%Y',
+    '%d.%m.%Y',
+    '%b %d, %Y',
+    '%d %b %Y',
+]
+MIXED_FORMAT = 'mixed'
+UNPARSED = 'unparsed'
+FORMAT_SAMPLE_SIZE = 200
+
+
+def infer_date_format(values, sample_size=FORMAT_SAMPLE_SIZE):
+    """Pick the candidate format that parses the most of a sample of values."""
+    sample = pd.Series(values[:sample_size], dtype=object)
+    if len(sample) == 0:
+        return None
+
+    best_format, best_parsed = None, 0
+    for date_format in CANDIDATE_FORMATS:
+        parsed = pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum()
+        if parsed > best_parsed:
+            best_format, best_parsed = date_format, parsed
+    return best_format
+
+
+def _distinct_values(series):
+    """Integer codes (-1 for missing) and distinct values as strings."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes, pd.Index(uniques).astype(str).to_numpy(dtype=object)
+
+
+def parse_dates(series, date_format=None):
+    """Parse a column of date strings, each distinct string only once.
+
+    Returns the datetime64 Series and a dict with the primary format, the
+    number of distinct strings parsed and the number of rows parsed with each
+    format ('unparsed' counts values that became NaT).
+    """
+    codes, uniques = _distinct_values(series)
+    if date_format is None:
+        date_format = infer_date_format(uniques)
+
+    parsed = pd.Series(pd.NaT, index=range(len(uniques)), dtype='datetime64[ns]')
+    labels = np.full(len(uniques), UNPARSED, dtype=object)
+    remaining = np.ones(len(uniques), dtype=bool)
+
+    # Primary format first, then the other candidates for whatever is left
+    formats = [date_format] if date_format else []
+    formats += [fmt for fmt in CANDIDATE_FORMATS if fmt != date_format]
+    for fmt in formats:
+        if not remaining.any():
+            break
+        attempt = pd.to_datetime(pd.Series(uniques[remaining], dtype=object), format=fmt, errors='coerce')
+        matched = attempt.notna().to_numpy()
+        positions = np.flatnonzero(remaining)[matched]
+        parsed.iloc[positions] = attempt[matched].to_numpy()
+        labels[positions] = fmt
+        remaining[positions] = False
+
+    if remaining.any():
+        attempt = pd.to_datetime(pd.Series(uniques[remaining], dtype=object), format=MIXED_FORMAT, errors='coerce')
+        matched = attempt.notna().to_numpy()
+        positions = np.flatnonzero(remaining)[matched]
+        parsed.iloc[positions] = attempt[matched].to_numpy()
+        labels[positions] = MIXED_FORMAT
+
+    # Map back to rows by code; code -1 (missing input) stays NaT
+    values = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))[codes]
+    result = pd.Series(values, index=series.index, dtype='datetime64[ns]')
+
+    present = codes >= 0
+    row_labels = pd.Series(labels[codes[present]])
+    format_counts = {fmt: int(count) for fmt, count in row_labels.value_counts().items()}
+
+    stats = {
+        'primary_format': date_format,
+        'distinct_values_parsed': int(len(uniques)),
+        'format_counts': format_counts,
+    }
+    return result, stats
+
+
+def merge_format_stats(total, stats):
+    """Add the per-format row counts of `stats` into `total` (in place).
+
+    `distinct_values_parsed` is summed too, so after merging chunks or
+    partitions it counts parse work: a string seen in several chunks is
+    counted once per chunk, not once overall.
+    """
+    total.setdefault('primary_format', stats['primary_format'])
+    total['distinct_values_parsed'] = total.get('distinct_values_parsed', 0) + stats['distinct_values_parsed']
+    counts = total.setdefault('format_counts', {})
+    for fmt, count in stats['format_counts'].items():
+        counts[fmt] = counts.get(fmt, 0) + count
+    return total
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Verbosity Levels and Lazy Diagnostics
+=====================================
+
+Both pipelines report through the `data_cleaning` loggers instead of
+`print`. A verbosity setting picks what gets reported:
+- 'production': warnings only; nothing is computed just to be shown
+- 'summary': step headers, counts of what was fixed and the final reports
+- 'full' (default): everything, including the expensive summaries
+  (`head()`, value counts, `describe(include='all')`, dtypes and
+  per-column missing values)
+
+Expensive summaries are passed as `lazy(...)` message arguments, so they
+are only computed if a record at that level is emitted. Records go to the
+current `sys.stdout`, which keeps `contextlib.redirect_stdout` working for
+the code that captures or silences pipeline output (worker processes,
+streaming chunks, benchmarks).
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import sys
+import logging
+
+LOGGER_NAME = 'data_cleaning'
+VERBOSITY_LEVELS = {
+    'production': logging.WARNING,
+    'summary': logging.INFO,
+    'full': logging.DEBUG,
+}
+DEFAULT_VERBOSITY = 'full'
+
+
+class lazy:
+    """Log message argument that is only computed when the record is emitted."""
+
+    def __init__(self, func, *args, **kwargs):
+        self.func, self.args, self.kwargs = func, args, kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever `sys.stdout` is when a record is emitted."""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def configure_logging(verbosity=DEFAULT_VERBOSITY):
+    """Set the verbosity of every `data_cleaning` logger; the handler is added once."""
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"Unknown verbosity '{verbosity}' (choose from {', '.join(VERBOSITY_LEVELS)})")
+    logger = logging.getLogger(LOGGER_NAME)
+    if not any(isinstance(handler, _StdoutHandler) for handler in logger.handlers):
+        handler = _StdoutHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(VERBOSITY_LEVELS[verbosity])
+
+
+def current_verbosity():
+    """The verbosity the `data_cleaning` loggers are set to."""
+    level = logging.getLogger(LOGGER_NAME).getEffectiveLevel()
+    return next((name for name, value in VERBOSITY_LEVELS.items() if value == level), DEFAULT_VERBOSITY)
+
+
+def get_logger(name):
+    """Logger `data_cleaning.<name>`; the default verbosity applies until configured."""
+    if not logging.getLogger(LOGGER_NAME).handlers:
+        configure_logging()
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Compact Dtype Schema for the Hospital Dataset
+=============================================
+
+Shared load-time schema for `HospitalDataCleaner` and
+`MLExpertMissingValueHandler`. Instead of letting pandas infer every column
+as object/float64/int64, columns are loaded as:
+- `category` for low-cardinality strings (Gender, Blood Type, ...)
+- `float32` for Age
+- `uint16`/`int16` for Room Number and Length_of_Stay when every value fits
+- `datetime64[ns]` for the admission and discharge dates, parsed on load
+  (read as categories, so each distinct date string is parsed once)
+
+Billing Amount stays float64: float32 keeps only ~7 significant digits and
+would change the saved amounts.
+
+Also provides small helpers for working with the categorical columns.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import pandas as pd
+import numpy as np
+
+from date_parsing import parse_dates, UNPARSED
+from diagnostics import get_logger
+
+log = get_logger('dtype_schema')
+
+CATEGORY_COLUMNS = [
+    'Gender',
+    'Blood Type',
+    'Medical Condition',
+    'Insurance Provider',
+    'Admission Type',
+    'Medication',
+    'Test Results',
+    'Age_Group',
+    'Billing_Category',
+]
+FLOAT32_COLUMNS = ['Age']
+# Integer columns are only downcast when every value is present and in range
+INTEGER_DOWNCASTS = {'Room Number': 'uint16', 'Length_of_Stay': 'int16'}
+DATE_COLUMNS = ['Date of Admission', 'Discharge Date']
+
+MEMORY_SAMPLE_ROWS = 10_000
+
+
+def frame_memory_mb(df):
+    """Deep memory usage of a frame in megabytes."""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def schema_dtypes(columns):
+    """`read_csv` dtype mapping for the columns present in a file."""
+    dtypes = {col: 'category' for col in CATEGORY_COLUMNS + DATE_COLUMNS if col in columns}
+    dtypes.update({col: 'float32' for col in FLOAT32_COLUMNS if col in columns})
+    return dtypes
+
+
+def apply_schema(df):
+    """Apply the conversions `read_csv` cannot do itself; returns load details.
+
+    Dates are parsed with errors coerced to NaT; the per-format row counts
+    and the number of values that failed to parse are reported per column.
+    """
+    info = {'invalid_dates': {}, 'date_formats': {}}
+
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col], stats = parse_dates(df[col])
+            info['date_formats'][col] = stats
+            info['invalid_dates'][col] = stats['format_counts'].get(UNPARSED, 0)
+
+    for col, dtype in INTEGER_DOWNCASTS.items():
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]) and len(df[col]) > 0:
+            limits = np.iinfo(dtype)
+            if df[col].min() >= limits.min and df[col].max() <= limits.max:
+                df[col] = df[col].astype(dtype)
+
+    return info
+
+
+def read_csv_with_schema(path, index_col=None, report_memory=True, **kwargs):
+    """Load a CSV with the compact schema.
+
+    Returns the frame and a dict of load details. With `report_memory`, the
+    memory the inferred dtypes would have used is estimated from a sample and
+    compared with the actual compact frame.
+    """
+    columns = pd.read_csv(path, index_col=index_col, nrows=0).columns
+    df = pd.read_csv(path, index_col=index_col, dtype=schema_dtypes(columns), **kwargs)
+    info = apply_schema(df)
+
+    if report_memory:
+        sample = pd.read_csv(path, index_col=index_col, nrows=MEMORY_SAMPLE_ROWS, **kwargs)
+        inferred_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+        info['memory_mb'] = {
+            'inferred_estimate': round(float(inferred_per_row * len(df) / (1024 * 1024)), 2),
+            'schema': round(float(frame_memory_mb(df)), 2),
+        }
+
+    return df, info
+
+
+def read_csv_chunks_with_schema(path, chunksize, index_col=None, **kwargs):
+    """Yield (chunk, load details) pairs loaded with the compact schema."""
+    columns = pd.read_csv(path, index_col=index_col, nrows=0).columns
+    reader = pd.read_csv(path, index_col=index_col, dtype=schema_dtypes(columns),
+                         chunksize=chunksize, **kwargs)
+    for chunk in reader:
+        yield chunk, apply_schema(chunk)
+
+
+def print_memory_report(info):
+    """Print the before/after memory comparison from the load details."""
+    memory = info.get('memory_mb')
+    if not memory:
+        return
+    after = memory['schema']
+    if 'inferred_estimate' in memory:
+        before = memory['inferred_estimate']
+        saved = (1 - after / before) * 100 if before else 0
+        log.info(f"Memory with inferred dtypes (estimated): {before:.2f} MB")
+        log.info(f"Memory with compact schema: {after:.2f} MB ({saved:.0f}% less)")
+    else:
+        log.info(f"Memory with stored dtypes: {after:.2f} MB")
+
+
+def with_category(series, value):
+    """Make sure a categorical column can hold `value` before it is assigned."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        return series.cat.add_categories([value])
+    return series
+
+
+def is_categorical_like(dtype):
+    """True for object strings and pandas categoricals."""
+    return dtype == 'object' or isinstance(dtype, pd.CategoricalDtype)
@@ -0,0 +1,844 @@
+#!/usr/bin/env python3
+"""
+Pluggable Execution Backends (pandas / Polars / DuckDB)
+=======================================================
+
+`HospitalDataCleaner` and `MLExpertMissingValueHandler` run on eager pandas,
+so the whole input has to fit in memory. Both pipelines can also describe
+their steps as backend-neutral operations (`Operation`), which this module
+runs on:
+- Polars: one lazy query on the multi-threaded engine; statistics use the
+  streaming engine and the output is written with `sink_csv`/`sink_parquet`
+- DuckDB: a chain of SQL views over `read_parquet`, or over a CSV parsed
+  once into a temporary table; the input is never loaded into Python and
+  DuckDB spills to disk when it runs short
+
+pandas (the classes themselves) stays the reference implementation:
+`compare_frames` checks another backend's result against it cell by cell.
+A lazy plan of operations (see lazy_plan.py) can also run on pandas
+itself, loaded with the compact schema and only the columns it needs.
+`choose_backend('auto', ...)` picks a backend from the input size: pandas
+for small inputs, Polars for medium ones and DuckDB above that.
+
+Python string cleaners (names, hospitals, ...) run once per distinct value,
+like `map_distinct`: only the distinct values are pulled into Python and the
+cleaned values are joined back. Dates are parsed with the same inferred
+format and fallback formats as `parse_dates`; values matching none of the
+candidate formats become null (pandas' last-resort mixed-format parser has
+no Polars/DuckDB equivalent).
+
+Polars and DuckDB are optional: only installed backends can be chosen.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import os
+import pandas as pd
+import numpy as np
+from collections import namedtuple
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from value_memoization import map_distinct
+from date_parsing import parse_dates, infer_date_format, CANDIDATE_FORMATS, FORMAT_SAMPLE_SIZE
+from dtype_schema import (CATEGORY_COLUMNS, FLOAT32_COLUMNS, DATE_COLUMNS, read_csv_with_schema, with_category,
+                          is_categorical_like)
+from columnar_io import (infer_format, is_columnar_path, read_columnar, write_columnar, ROW_ORDER_COLUMN,
+                         HELPER_COLUMNS, DEFAULT_COMPRESSION)
+from validation_rules import ValidationRuleEngine
+from diagnostics import get_logger
+
+log = get_logger('backends')
+
+BACKENDS = ['pandas', 'polars', 'duckdb']
+BACKEND_CHOICES = BACKENDS + ['auto']
+# `auto` keeps inputs up to this size on pandas, then Polars, then DuckDB (out of core)
+AUTO_PANDAS_MAX_BYTES = 512 * 1024 * 1024
+AUTO_POLARS_MAX_BYTES = 4 * 1024 * 1024 * 1024
+# Strings pandas' read_csv treats as missing by default
+PANDAS_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+                    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+INTEGER_PATTERN = r'^[+-]?[0-9]+$'
+# Relative tolerance for float cells (pandas keeps Age as float32)
+FLOAT_TOLERANCE = 1e-6
+# DuckDB's row-order column, carried through every view
+ROW_COLUMN = '__row'
+
+Operation = namedtuple('Operation', ['kind', 'column', 'params'])
+
+
+def operation(kind, column=None, **params):
+    """One backend-neutral pipeline step, e.g. operation('fill', 'Age', value=52.0).
+
+    Kinds: 'parse_dates', 'dedupe', 'map_values' (func, vectorized), 'rule'
+    (a validation rule), 'rules' (validation rules for one column, applied in
+    one pass), 'null_if_before' (other), 'fill' (value),
+    'fill_forward_backward', 'drop' (columns), 'swap_if_before' (end),
+    'days_between' (start, end) and 'bins' (source, edges, labels).
+    """
+    return Operation(kind, column, params)
+
+
+def available_backends():
+    """Backends whose packages are installed."""
+    installed = {'pandas': True, 'polars': pl is not None, 'duckdb': duckdb is not None}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def input_size(path):
+    """Bytes on disk of a file or a partitioned dataset directory."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path)
+
+
+def choose_backend(name, path):
+    """Resolve a backend name; 'auto' picks one from the size of the input at `path`."""
+    if name != 'auto':
+        if name not in available_backends():
+            raise ValueError(f"The {name} backend needs the '{name}' package (pip install {name})")
+        return name
+
+    size = input_size(path)
+    if size <= AUTO_PANDAS_MAX_BYTES:
+        preferred = ['pandas']
+    elif size <= AUTO_POLARS_MAX_BYTES:
+        preferred = ['polars', 'duckdb']
+    else:
+        preferred = ['duckdb', 'polars']
+    return next((backend for backend in preferred if backend in available_backends()), 'pandas')
+
+
+def make_backend(name):
+    """Backend instance that runs operations (the pipeline classes run pandas eagerly themselves)."""
+    if name == 'pandas':
+        return PandasBackend()
+    if name == 'polars':
+        return PolarsBackend()
+    if name == 'duckdb':
+        return DuckDBBackend()
+    raise ValueError(f"No operation backend named '{name}'")
+
+
+def csv_header(path):
+    """Column names of a CSV as pandas names them (an empty header becomes 'Unnamed: 0')."""
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _anchored(pattern):
+    """`str.match` semantics (anchored at the start) for engines that search anywhere."""
+    return pattern if pattern.startswith('^') else f'^(?:{pattern})'
+
+
+def column_kind(dtype):
+    """'datetime', 'string', 'numeric' or 'other', as the execution backends report columns."""
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    if is_categorical_like(dtype):
+        return 'string'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'numeric'
+    return 'other'
+
+
+def _date_formats(sample):
+    """The inferred primary format first, then the other candidates (as `parse_dates` tries them)."""
+    primary = infer_date_format(np.asarray(sample, dtype=object))
+    return ([primary] if primary else []) + [fmt for fmt in CANDIDATE_FORMATS if fmt != primary]
+
+
+class Backend:
+    """Shared logic; subclasses implement scanning, statistics and each operation kind."""
+
+    name = None
+
+    def scan(self, path, index_col=None, columns=None):
+        """Lazy relation over a CSV, Parquet/Feather file or partitioned Parquet directory.
+
+        Like the compact-schema loader, numbers are inferred from the text
+        and the date columns are parsed on load. With `columns`, only those
+        columns are read.
+        """
+        relation = self._scan(path, index_col, columns)
+        for col in DATE_COLUMNS:
+            if col in self.column_kinds(relation):
+                relation = self._parse_dates(relation, col)
+        return relation
+
+    def run(self, relation, operations):
+        """Apply operations in order; returns the new (lazy) relation."""
+        for op in operations:
+            relation = self.apply(relation, op)
+        return relation
+
+    def apply(self, relation, op):
+        return getattr(self, '_' + op.kind)(relation, op.column, **op.params)
+
+    def _rule(self, relation, column, rule):
+        return self._rules(relation, column, [rule])
+
+    def _map_values(self, relation, column, func, vectorized=False):
+        distinct = self.distinct_values(relation, column)
+        cleaned = map_distinct(pd.Series(distinct, dtype=object), func, vectorized)
+        cleaned = [None if pd.isna(value) else value for value in cleaned]
+        return self._replace_values(relation, column, distinct, cleaned)
+
+    def _parse_dates(self, relation, column):
+        if self.column_kinds(relation)[column] == 'datetime':
+            return relation
+        sample = self.distinct_values(relation, column, limit=FORMAT_SAMPLE_SIZE, sort=True)
+        return self._parse_with_formats(relation, column, _date_formats(sample))
+
+    def _numeric_types(self, counts, columns):
+        """'int' or 'float' per text column that is entirely numeric, like pandas' inference.
+
+        `counts[col]` holds (present, numeric, integer-looking, missing) value counts.
+        """
+        types = {}
+        for col in columns:
+            if col in CATEGORY_COLUMNS or col in DATE_COLUMNS:
+                continue
+            present, numeric, integers, missing = counts[col]
+            if col in FLOAT32_COLUMNS or (present > 0 and numeric == present):
+                integral = col not in FLOAT32_COLUMNS and integers == present and missing == 0
+                types[col] = 'int' if integral else 'float'
+        return types
+
+
+class PolarsBackend(Backend):
+    """Operations as one Polars LazyFrame."""
+
+    name = 'polars'
+
+    @staticmethod
+    def _collect(lazy):
+        return lazy.collect(engine='streaming')
+
+    def _scan(self, path, index_col=None, columns=None):
+        fmt = 'parquet' if os.path.isdir(path) else infer_format(path)
+        if fmt == 'parquet':
+            lazy = pl.scan_parquet(path, hive_partitioning=os.path.isdir(path))
+        elif fmt == 'feather':
+            lazy = pl.scan_ipc(path)
+        else:
+            # Everything as text first, so numbers are inferred the way pandas does
+            lazy = pl.scan_csv(path, infer_schema=False, null_values=PANDAS_NA_VALUES,
+                               new_columns=csv_header(path))
+
+        stored = lazy.collect_schema().names()
+        if ROW_ORDER_COLUMN in stored:
+            lazy = lazy.sort(ROW_ORDER_COLUMN, maintain_order=True)
+        drop = [col for col in stored if col in HELPER_COLUMNS]
+        if index_col is not None and fmt == 'csv':
+            drop.append(stored[index_col])
+        lazy = lazy.drop(drop)
+        if columns is not None:
+            lazy = lazy.select(columns)
+
+        schema = lazy.collect_schema()
+        lazy = lazy.with_columns(pl.col(col).cast(pl.String) for col, dtype in schema.items()
+                                 if isinstance(dtype, (pl.Categorical, pl.Enum)))
+        if fmt == 'csv':
+            lazy = self._infer_numbers(lazy)
+        return lazy
+
+    def _infer_numbers(self, lazy):
+        columns = lazy.collect_schema().names()
+        exprs = []
+        for i, col in enumerate(columns):
+            value = pl.col(col)
+            exprs += [value.count().alias(f'{i}_present'),
+                      value.cast(pl.Float64, strict=False).count().alias(f'{i}_numeric'),
+                      value.str.contains(INTEGER_PATTERN).sum().alias(f'{i}_integers'),
+                      value.null_count().alias(f'{i}_missing')]
+        row = self._collect(lazy.select(exprs)).row(0)
+        counts = {col: row[4 * i:4 * i + 4] for i, col in enumerate(columns)}
+        casts = {'int': pl.Int64, 'float': pl.Float64}
+        return lazy.with_columns(pl.col(col).cast(casts[kind], strict=False)
+                                 for col, kind in self._numeric_types(counts, columns).items())
+
+    def count(self, lazy):
+        return self._collect(lazy.select(pl.len())).item()
+
+    def null_counts(self, lazy):
+        return self._collect(lazy.null_count()).row(0, named=True)
+
+    def column_kinds(self, lazy):
+        kinds = {}
+        for col, dtype in lazy.collect_schema().items():
+            if dtype.is_temporal():
+                kinds[col] = 'datetime'
+            elif dtype.is_numeric():
+                kinds[col] = 'numeric'
+            else:
+                kinds[col] = 'string'
+        return kinds
+
+    def distinct_values(self, lazy, column, limit=None, sort=False):
+        values = lazy.select(pl.col(column).drop_nulls().unique())
+        if sort:
+            values = values.sort(column)
+        if limit is not None:
+            values = values.head(limit)
+        return self._collect(values).to_series().to_list()
+
+    def statistic(self, lazy, column, stat, qs=None):
+        """'median', 'mean', 'mode' (smallest of the most frequent, like `mode()[0]`) or 'quantiles'."""
+        if stat == 'mode':
+            counts = (lazy.select(pl.col(column)).drop_nulls().group_by(column).len()
+                      .sort(['len', column], descending=[True, False]).head(1))
+            result = self._collect(counts)
+            return result[column][0] if len(result) else None
+        if stat == 'quantiles':
+            exprs = [pl.col(column).quantile(q, interpolation='linear').alias(str(q)) for q in qs]
+            return list(self._collect(lazy.select(exprs)).row(0))
+        return self._collect(lazy.select(getattr(pl.col(column), stat)())).item()
+
+    def _dedupe(self, lazy, column):
+        return lazy.unique(keep='first', maintain_order=True)
+
+    def _replace_values(self, lazy, column, old, new):
+        return lazy.with_columns(pl.col(column).replace(old, new))
+
+    def _parse_with_formats(self, lazy, column, formats):
+        parsed = [pl.col(column).str.strptime(pl.Datetime('ns'), fmt, strict=False) for fmt in formats]
+        return lazy.with_columns(pl.coalesce(parsed).alias(column))
+
+    def _rules(self, lazy, column, rules):
+        # One expression for the column: each rule wraps the result of the previous one
+        value = pl.col(column)
+        for rule in rules:
+            value = self._rule_expr(value, rule)
+        return lazy.with_columns(value.alias(column))
+
+    @staticmethod
+    def _rule_expr(value, rule):
+        check = rule['check']
+        if check == 'range':
+            violating = pl.lit(False)
+            if rule.get('min') is not None:
+                violating = violating | (value < rule['min'])
+            if rule.get('max') is not None:
+                violating = violating | (value > rule['max'])
+        elif check == 'allowed':
+            violating = ~value.is_in(rule['values'])
+            if rule.get('allow_missing', True):
+                violating = violating & value.is_not_null()
+            else:
+                violating = violating | value.is_null()
+        else:
+            violating = value.str.contains(_anchored(rule['pattern']))
+
+        action = rule['action']
+        if action == 'null':
+            replacement = pl.lit(None)
+        elif action == 'abs':
+            replacement = value.abs()
+        elif action == 'cap':
+            replacement = value.clip(rule.get('min'), rule.get('max'))
+        else:
+            replacement = pl.lit(rule['value'])
+        return pl.when(violating.fill_null(False)).then(replacement).otherwise(value)
+
+    def _null_if_before(self, lazy, column, other):
+        value = pl.col(column)
+        return lazy.with_columns(pl.when(value < pl.col(other)).then(None).otherwise(value).alias(column))
+
+    def _fill(self, lazy, column, value):
+        return lazy.with_columns(pl.col(column).fill_null(pl.lit(value)))
+
+    def _fill_forward_backward(self, lazy, column):
+        return lazy.with_columns(pl.col(column).forward_fill().backward_fill())
+
+    def _drop(self, lazy, column, columns):
+        return lazy.drop(columns)
+
+    def _swap_if_before(self, lazy, column, end):
+        swap = pl.col(end) < pl.col(column)
+        return lazy.with_columns(pl.when(swap).then(pl.col(end)).otherwise(pl.col(column)).alias(column),
+                                 pl.when(swap).then(pl.col(column)).otherwise(pl.col(end)).alias(end))
+
+    def _days_between(self, lazy, column, start, end):
+        # Floor division, like Timedelta.days
+        micros = (pl.col(end) - pl.col(start)).dt.total_microseconds()
+        return lazy.with_columns((micros // 86_400_000_000).alias(column))
+
+    def _bins(self, lazy, column, source, edges, labels):
+        # Right-closed bins, lowest edge excluded, like pd.cut's defaults
+        value = pl.col(source)
+        expr = None
+        for lower, upper, label in zip(edges[:-1], edges[1:], labels):
+            condition = (value > lower) & (value <= upper)
+            expr = (pl.when(condition) if expr is None else expr.when(condition)).then(pl.lit(label))
+        return lazy.with_columns(expr.otherwise(pl.lit(None, dtype=pl.String)).alias(column))
+
+    def _for_output(self, lazy, fmt):
+        """Integer columns with gaps as floats and, in CSV, dates without a time of day
+        as dates (as pandas writes them)."""
+        schema = lazy.collect_schema()
+        dates = [col for col, dtype in schema.items() if dtype.is_temporal() and fmt == 'csv']
+        integers = [col for col, dtype in schema.items() if dtype.is_integer()]
+        checks = ([(pl.col(col) != pl.col(col).dt.truncate('1d')).any().alias(f'time_{col}') for col in dates] +
+                  [pl.col(col).null_count().alias(f'missing_{col}') for col in integers])
+        if not checks:
+            return lazy
+        row = self._collect(lazy.select(checks)).row(0, named=True)
+        return lazy.with_columns(
+            [pl.col(col).cast(pl.Date) for col in dates if not row[f'time_{col}']] +
+            [pl.col(col).cast(pl.Float64) for col in integers if row[f'missing_{col}']])
+
+    def write(self, lazy, path, fmt='csv', compression=None):
+        lazy = self._for_output(lazy, fmt)
+        if fmt == 'csv':
+            lazy.sink_csv(path, datetime_format='%Y-%m-%d %H:%M:%S')
+        elif fmt == 'parquet':
+            lazy.sink_parquet(path, compression=compression or DEFAULT_COMPRESSION[fmt])
+        else:
+            lazy.sink_ipc(path, compression=compression or DEFAULT_COMPRESSION[fmt])
+
+    def to_pandas(self, lazy):
+        return self._collect(lazy).to_pandas()
+
+
+class PandasBackend(Backend):
+    """Operations on an in-memory pandas frame, loaded with the compact schema.
+
+    The scan hands the projection to the reader (`usecols` for CSV), so
+    columns a plan never needs are not parsed at all. Steps reuse the
+    pipelines' own helpers (distinct-value mapping, the rule engine).
+    """
+
+    name = 'pandas'
+
+    def _scan(self, path, index_col=None, columns=None):
+        if is_columnar_path(path):
+            df, _ = read_columnar(path, columns)
+            return df
+        usecols = None
+        if columns is not None:
+            header = csv_header(path)
+            usecols = list(columns) + ([header[index_col]] if index_col is not None else [])
+        df, _ = read_csv_with_schema(path, index_col=index_col, report_memory=False, usecols=usecols)
+        return df
+
+    def count(self, df):
+        return len(df)
+
+    def null_counts(self, df):
+        return {col: int(count) for col, count in df.isnull().sum().items()}
+
+    def column_kinds(self, df):
+        return {col: column_kind(dtype) for col, dtype in df.dtypes.items()}
+
+    def distinct_values(self, df, column, limit=None, sort=False):
+        values = pd.Series(df[column].dropna().unique())
+        if sort:
+            values = values.sort_values()
+        if limit is not None:
+            values = values.head(limit)
+        return values.tolist()
+
+    def statistic(self, df, column, stat, qs=None):
+        """'median', 'mean', 'mode' (`mode()[0]`) or 'quantiles'."""
+        values = df[column]
+        if stat == 'mode':
+            mode = values.mode()
+            return mode[0] if len(mode) > 0 else None
+        # In float64, like the other backends (Age is stored as float32)
+        if pd.api.types.is_float_dtype(values):
+            values = values.astype('float64')
+        if stat == 'quantiles':
+            return values.quantile(qs).tolist()
+        return getattr(values, stat)()
+
+    def _parse_dates(self, df, column):
+        if not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column], _ = parse_dates(df[column])
+        return df
+
+    def _dedupe(self, df, column):
+        duplicates = df.duplicated().to_numpy()
+        return df[~duplicates] if duplicates.any() else df
+
+    def _map_values(self, df, column, func, vectorized=False):
+        df[column] = map_distinct(df[column], func, vectorized)
+        return df
+
+    def _rules(self, df, column, rules):
+        ValidationRuleEngine(rules).apply(df, [column])
+        return df
+
+    def _null_if_before(self, df, column, other):
+        df.loc[df[column] < df[other], column] = pd.NaT
+        return df
+
+    def _fill(self, df, column, value):
+        if value is None:
+            return df
+        values = df[column]
+        # A compact float column that cannot hold the fill exactly is filled as float64
+        if values.dtype == 'float32' and np.float32(value) != value:
+            values = values.astype('float64')
+        df[column] = with_category(values, value).fillna(value)
+        return df
+
+    def _fill_forward_backward(self, df, column):
+        df[column] = df[column].ffill().bfill()
+        return df
+
+    def _drop(self, df, column, columns):
+        return df.drop(columns=columns)
+
+    def _swap_if_before(self, df, column, end):
+        swap = df[end] < df[column]
+        start_values = df.loc[swap, column].copy()
+        df.loc[swap, column] = df.loc[swap, end]
+        df.loc[swap, end] = start_values
+        return df
+
+    def _days_between(self, df, column, start, end):
+        df[column] = (df[end] - df[start]).dt.days
+        return df
+
+    def _bins(self, df, column, source, edges, labels):
+        df[column] = pd.cut(df[source], bins=edges, labels=labels)
+        return df
+
+    def write(self, df, path, fmt='csv', compression=None):
+        if fmt == 'csv':
+            df.to_csv(path, index=False)
+        else:
+            write_columnar(df, path, fmt, compression)
+
+    def to_pandas(self, df):
+        return df
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value):
+    """SQL literal for a Python value."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return 'NULL'
+    if isinstance(value, (bool, np.bool_)):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (float, np.floating)):
+        return f"'{float(value)}'::DOUBLE" if np.isinf(value) else repr(float(value))
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, pd.Timestamp):
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBBackend(Backend):
+    """Operations as a chain of DuckDB views; row order is kept in a `__row` column."""
+
+    name = 'duckdb'
+
+    def __init__(self):
+        self.con = duckdb.connect()
+        self._views = 0
+
+    def _view(self, sql, table=False):
+        name = f'step_{self._views}'
+        self._views += 1
+        self.con.execute(f"CREATE TEMP {'TABLE' if table else 'VIEW'} {name} AS {sql}")
+        return name
+
+    def _columns(self, view):
+        """Data columns of a view (without the row-order column) and their DuckDB types."""
+        described = self.con.execute(f'DESCRIBE SELECT * FROM {view}').fetchall()
+        return {name: dtype for name, dtype, *_ in described if name != ROW_COLUMN}
+
+    def _scalar(self, sql):
+        return self.con.execute(sql).fetchone()[0]
+
+    def _scan(self, path, index_col=None, columns=None):
+        fmt = 'parquet' if os.path.isdir(path) else infer_format(path)
+        if fmt == 'parquet':
+            source = os.path.join(path, '**', '*.parquet') if os.path.isdir(path) else path
+            view = self._view(f"SELECT * FROM read_parquet({_literal(source)}, "
+                              f"hive_partitioning = {_literal(os.path.isdir(path))})")
+        elif fmt == 'feather':
+            raise ValueError("The DuckDB backend reads CSV or Parquet input, not Feather")
+        else:
+            header = csv_header(path)
+            names = '[' + ', '.join(_literal(name) for name in header) + ']'
+            nulls = '[' + ', '.join(_literal(value) for value in PANDAS_NA_VALUES) + ']'
+            view = self._view(f"SELECT * FROM read_csv({_literal(path)}, header = true, all_varchar = true, "
+                              f"names = {names}, nullstr = {nulls})")
+
+        stored = list(self._columns(view))
+        # Partitioned datasets come back grouped by partition, so restore the order
+        order = f'ORDER BY {_quote(ROW_ORDER_COLUMN)}' if ROW_ORDER_COLUMN in stored else ''
+        keep = [col for col in stored if col not in HELPER_COLUMNS]
+        if index_col is not None and fmt == 'csv':
+            keep.remove(stored[index_col])
+        if columns is not None:
+            keep = [col for col in columns if col in keep]
+        select = ', '.join(_quote(col) for col in keep)
+        view = self._view(f'SELECT row_number() OVER ({order}) AS {ROW_COLUMN}, {select} FROM {view}')
+
+        if fmt == 'csv':
+            # Parse the text once; every statistic would otherwise re-read the CSV
+            # (DuckDB spills the table to disk when it does not fit in memory)
+            view = self._view(f'SELECT * FROM {self._infer_numbers(view)}', table=True)
+        return view
+
+    def _infer_numbers(self, view):
+        columns = list(self._columns(view))
+        exprs = []
+        for col in columns:
+            value = _quote(col)
+            exprs += [f'count({value})', f'count(TRY_CAST({value} AS DOUBLE))',
+                      f"count_if(regexp_matches({value}, {_literal(INTEGER_PATTERN)}))",
+                      f'count(*) - count({value})']
+        row = self.con.execute(f"SELECT {', '.join(exprs)} FROM {view}").fetchone()
+        counts = {col: row[4 * i:4 * i + 4] for i, col in enumerate(columns)}
+        types = self._numeric_types(counts, columns)
+        if not types:
+            return view
+        casts = {'int': 'BIGINT', 'float': 'DOUBLE'}
+        replace = ', '.join(f'TRY_CAST({_quote(col)} AS {casts[kind]}) AS {_quote(col)}'
+                            for col, kind in types.items())
+        return self._view(f'SELECT * REPLACE ({replace}) FROM {view}')
+
+    def count(self, view):
+        return self._scalar(f'SELECT count(*) FROM {view}')
+
+    def null_counts(self, view):
+        columns = list(self._columns(view))
+        row = self.con.execute('SELECT ' + ', '.join(f'count(*) - count({_quote(col)})' for col in columns) +
+                               f' FROM {view}').fetchone()
+        return dict(zip(columns, row))
+
+    def column_kinds(self, view):
+        kinds = {}
+        for col, dtype in self._columns(view).items():
+            if dtype.startswith(('TIMESTAMP', 'DATE')):
+                kinds[col] = 'datetime'
+            elif dtype in ('VARCHAR', 'BOOLEAN') or dtype.startswith('ENUM'):
+                kinds[col] = 'string'
+            else:
+                kinds[col] = 'numeric'
+        return kinds
+
+    def distinct_values(self, view, column, limit=None, sort=False):
+        value = _quote(column)
+        sql = f'SELECT DISTINCT {value} FROM {view} WHERE {value} IS NOT NULL'
+        if sort:
+            sql += f' ORDER BY {value}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        return [row[0] for row in self.con.execute(sql).fetchall()]
+
+    def statistic(self, view, column, stat, qs=None):
+        """'median', 'mean', 'mode' (smallest of the most frequent, like `mode()[0]`) or 'quantiles'."""
+        value = _quote(column)
+        if stat == 'mode':
+            row = self.con.execute(f'SELECT {value} FROM {view} WHERE {value} IS NOT NULL GROUP BY {value} '
+                                   f'ORDER BY count(*) DESC, {value} LIMIT 1').fetchone()
+            return row[0] if row else None
+        if stat == 'quantiles':
+            return [self._scalar(f'SELECT quantile_cont({value}, {float(q)}) FROM {view}') for q in qs]
+        return self._scalar(f'SELECT {"avg" if stat == "mean" else stat}({value}) FROM {view}')
+
+    def _replace(self, view, replacements):
+        """View with some columns replaced by SQL expressions."""
+        replace = ', '.join(f'{expr} AS {_quote(col)}' for col, expr in replacements.items())
+        return self._view(f'SELECT * REPLACE ({replace}) FROM {view}')
+
+    def _dedupe(self, view, column):
+        partition = ', '.join(_quote(col) for col in self._columns(view))
+        return self._view(f'SELECT * FROM {view} QUALIFY row_number() OVER '
+                          f'(PARTITION BY {partition} ORDER BY {ROW_COLUMN}) = 1')
+
+    def _replace_values(self, view, column, old, new):
+        mapping = f'mapping_{self._views}'
+        self.con.register(mapping, pd.DataFrame({'old': pd.Series(old, dtype=object),
+                                                 'new': pd.Series(new, dtype=object)}))
+        value = _quote(column)
+        return self._view(f'SELECT t.* REPLACE (CASE WHEN m.old IS NULL THEN t.{value} ELSE m.new END AS {value}) '
+                          f'FROM {view} t LEFT JOIN {mapping} m ON t.{value} = m.old')
+
+    def _parse_with_formats(self, view, column, formats):
+        value = _quote(column)
+        parsed = ', '.join(f'try_strptime({value}, {_literal(fmt)})' for fmt in formats)
+        return self._replace(view, {column: f'COALESCE({parsed})'})
+
+    def _rules(self, view, column, rules):
+        # One view for the column: each rule's CASE wraps the result of the previous one
+        value = _quote(column)
+        for rule in rules:
+            value = self._rule_expr(value, rule)
+        return self._replace(view, {column: value})
+
+    @staticmethod
+    def _rule_expr(value, rule):
+        value = f'({value})'
+        check = rule['check']
+        if check == 'range':
+            bounds = []
+            if rule.get('min') is not None:
+                bounds.append(f"{value} < {_literal(rule['min'])}")
+            if rule.get('max') is not None:
+                bounds.append(f"{value} > {_literal(rule['max'])}")
+            violating = ' OR '.join(bounds) or 'FALSE'
+        elif check == 'allowed':
+            allowed = ', '.join(_literal(item) for item in rule['values'])
+            violating = f'{value} NOT IN ({allowed})'
+            if not rule.get('allow_missing', True):
+                violating = f'{value} IS NULL OR {violating}'
+        else:
+            violating = f"regexp_matches({value}, {_literal(_anchored(rule['pattern']))})"
+
+        action = rule['action']
+        if action == 'null':
+            replacement = 'NULL'
+        elif action == 'abs':
+            replacement = f'abs({value})'
+        elif action == 'cap':
+            replacement = value
+            if rule.get('min') is not None:
+                replacement = f"greatest({replacement}, {_literal(rule['min'])})"
+            if rule.get('max') is not None:
+                replacement = f"least({replacement}, {_literal(rule['max'])})"
+        else:
+            replacement = _literal(rule['value'])
+        return f'CASE WHEN {violating} THEN {replacement} ELSE {value} END'
+
+    def _null_if_before(self, view, column, other):
+        value = _quote(column)
+        return self._replace(view, {column: f'CASE WHEN {value} < {_quote(other)} THEN NULL ELSE {value} END'})
+
+    def _fill(self, view, column, value):
+        return self._replace(view, {column: f'COALESCE({_quote(column)}, {_literal(value)})'})
+
+    def _fill_forward_backward(self, view, column):
+        value = _quote(column)
+        return self._replace(view, {column: (
+            f'COALESCE({value}, '
+            f'last_value({value} IGNORE NULLS) OVER (ORDER BY {ROW_COLUMN} '
+            f'ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW), '
+            f'first_value({value} IGNORE NULLS) OVER (ORDER BY {ROW_COLUMN} '
+            f'ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING))')})
+
+    def _drop(self, view, column, columns):
+        return self._view(f"SELECT * EXCLUDE ({', '.join(_quote(col) for col in columns)}) FROM {view}")
+
+    def _swap_if_before(self, view, column, end):
+        swap = f'{_quote(end)} < {_quote(column)}'
+        return self._replace(view, {
+            column: f'CASE WHEN {swap} THEN {_quote(end)} ELSE {_quote(column)} END',
+            end: f'CASE WHEN {swap} THEN {_quote(column)} ELSE {_quote(end)} END',
+        })
+
+    def _days_between(self, view, column, start, end):
+        # Floor division, like Timedelta.days
+        micros = f'(epoch_us({_quote(end)}) - epoch_us({_quote(start)}))'
+        return self._view(f'SELECT *, CAST(floor({micros} / 86400000000) AS BIGINT) AS {_quote(column)} '
+                          f'FROM {view}')
+
+    def _bins(self, view, column, source, edges, labels):
+        # Right-closed bins, lowest edge excluded, like pd.cut's defaults
+        value = _quote(source)
+        cases = ' '.join(f'WHEN {value} > {_literal(lower)} AND {value} <= {_literal(upper)} THEN {_literal(label)}'
+                         for lower, upper, label in zip(edges[:-1], edges[1:], labels))
+        expr = f"CASE {cases} ELSE NULL END"
+        if column in self._columns(view):
+            return self._replace(view, {column: expr})
+        return self._view(f'SELECT *, {expr} AS {_quote(column)} FROM {view}')
+
+    def _output_select(self, view, fmt):
+        """Select list that writes integer columns with gaps as floats and, in CSV, dates
+        without a time of day as dates (as pandas writes them)."""
+        columns = self._columns(view)
+        dates = [col for col, dtype in columns.items() if dtype.startswith('TIMESTAMP') and fmt == 'csv']
+        integers = [col for col, dtype in columns.items() if dtype in ('BIGINT', 'INTEGER', 'SMALLINT')]
+        checks = ([f'bool_or({_quote(col)} <> date_trunc(\'day\', {_quote(col)}))' for col in dates] +
+                  [f'count(*) > count({_quote(col)})' for col in integers])
+        flags = dict(zip(dates + integers, self.con.execute(f"SELECT {', '.join(checks)} FROM {view}").fetchone()
+                         if checks else []))
+
+        select = []
+        for col in columns:
+            if col in dates and not flags[col]:
+                select.append(f'CAST({_quote(col)} AS DATE) AS {_quote(col)}')
+            elif col in integers and flags[col]:
+                select.append(f'CAST({_quote(col)} AS DOUBLE) AS {_quote(col)}')
+            else:
+                select.append(_quote(col))
+        return ', '.join(select)
+
+    def write(self, view, path, fmt='csv', compression=None):
+        query = f'SELECT {self._output_select(view, fmt)} FROM {view} ORDER BY {ROW_COLUMN}'
+        if fmt == 'csv':
+            options = "FORMAT csv, HEADER true, TIMESTAMPFORMAT '%Y-%m-%d %H:%M:%S'"
+        elif fmt == 'parquet':
+            options = f"FORMAT parquet, COMPRESSION {compression or DEFAULT_COMPRESSION[fmt]}"
+        else:
+            raise ValueError("The DuckDB backend writes CSV or Parquet, not Feather")
+        self.con.execute(f'COPY ({query}) TO {_literal(path)} ({options})')
+
+    def to_pandas(self, view):
+        columns = ', '.join(_quote(col) for col in self._columns(view))
+        return self.con.execute(f'SELECT {columns} FROM {view} ORDER BY {ROW_COLUMN}').df()
+
+
+def compare_frames(expected, actual):
+    """Number of differing cells per column between the pandas result and another backend's.
+
+    Numbers are compared with a relative tolerance, dates as timestamps and
+    everything else as text; missing matches missing. A different column
+    list or row count is reported under '__columns__' / '__rows__'.
+    """
+    if list(expected.columns) != list(actual.columns):
+        return {'__columns__': f"{list(expected.columns)} != {list(actual.columns)}"}
+    if len(expected) != len(actual):
+        return {'__rows__': f"{len(expected)} != {len(actual)}"}
+
+    differences = {}
+    for col in expected.columns:
+        left = expected[col].reset_index(drop=True)
+        right = actual[col].reset_index(drop=True)
+        left_missing, right_missing = left.isna().to_numpy(), right.isna().to_numpy()
+
+        if pd.api.types.is_numeric_dtype(left) and pd.api.types.is_numeric_dtype(right):
+            equal = np.isclose(left.to_numpy(dtype='float64', na_value=np.nan),
+                               right.to_numpy(dtype='float64', na_value=np.nan), rtol=FLOAT_TOLERANCE, atol=0)
+        elif pd.api.types.is_datetime64_any_dtype(left) or pd.api.types.is_datetime64_any_dtype(right):
+            equal = (pd.to_datetime(left) == pd.to_datetime(right)).to_numpy()
+        else:
+            equal = (left.astype(object).astype(str) == right.astype(object).astype(str)).to_numpy()
+
+        same = np.where(left_missing | right_missing, left_missing == right_missing, equal)
+        if not same.all():
+            differences[col] = int((~same).sum())
+    return differences
+
+
+def print_equivalence_table(results):
+    """Print one line per backend from {backend: {'rows', 'seconds', 'differences'}}."""
+    log.info(f"{'Backend':>8} {'Rows':>9} {'Seconds':>8}  Differences from pandas")
+    for name, result in results.items():
+        differences = result['differences']
+        if name == 'pandas':
+            summary = 'reference'
+        elif differences:
+            summary = ', '.join(f'{col}: {count}' for col, count in differences.items())
+        else:
+            summary = 'none'
+        log.info(f"{name:>8} {result['rows']:>9} {result['seconds']:>8.2f}  {summary}")
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Masked-Value Imputation Benchmark
+=================================
+
+Checks how close each fill of `MLExpertMissingValueHandler` comes to the
+real values, and what it costs:
+- A share of the known values of each column is hidden; the hidden values
+  are the ground truth
+- Each strategy for the column's kind fills the hidden values:
+  - numerical: mean, median
+  - categorical: mode, and the constant the pipeline fills the column with
+    ('Self-Pay', 'No Medication' or 'Unknown')
+  - dates: forward then backward fill, and backward then forward fill
+  - model-based imputers (`model_strategies`): KNN for each requested k
+    and distance (see knn_imputation.py), and chained equations for the
+    MICE columns (see chained_imputation.py)
+- Reported per column and strategy: RMSE and MAE against the hidden values
+  (in days for dates), accuracy and macro F1 for categorical columns,
+  seconds and filled values per second
+- Each column gets an accuracy bar (a maximum RMSE, or a minimum F1 for
+  categorical columns); by default, within 5% of the best strategy. The
+  fastest strategy that meets the bar is recommended
+- Results are saved as JSON
+
+The frame is prepared as the pipeline has it when the imputation starts
+(loaded, PII dropped). Each model-based imputer sees its predictors as in
+a pipeline run: chained equations run on that frame, like the step before
+the categorical fills, and KNN finds neighbours on a copy with the
+categorical fills applied, as impute_numerical_data does. Only the
+benchmarked column is masked at a time.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import copy
+import json
+import time
+import platform
+import argparse
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from ml_missing_value_imputation import (MLExpertMissingValueHandler, numeric_fill_statistic, DOMAIN_FILLS,
+                                         MICE_COLUMNS, MICE_PREDICTORS)
+from dtype_schema import with_category
+from knn_imputation import knn_impute, knn_available, DEFAULT_K, DISTANCES
+from chained_imputation import ChainedImputer, DEFAULT_MAX_ITERATIONS
+from diagnostics import configure_logging, get_logger, VERBOSITY_LEVELS
+
+log = get_logger('imputation_benchmark')
+
+DEFAULT_MASK_FRACTION = 0.1
+# Without an explicit bar, a strategy meets the bar within this share of the best score
+DEFAULT_RELATIVE_BAR = 0.05
+DATE_COLUMNS = ['Date of Admission', 'Discharge Date']
+DAY = np.timedelta64(1, 'D')
+
+
+def prepare_frame(input_file):
+    """Handler whose frame is as the pipeline has it just before the first imputation step."""
+    handler = MLExpertMissingValueHandler(input_file)
+    handler.load_data()
+    handler.analyze_missing_patterns()
+    handler.drop_pii_columns()
+    return handler
+
+
+def with_categorical_fills(handler):
+    """Copy of `handler` whose frame has the categorical gaps filled, as impute_numerical_data sees it."""
+    filled = copy.copy(handler)
+    filled.df = handler.df.copy()
+    filled.null_index = None
+    filled.imputation_report = {'strategies_applied': [], 'columns_processed': [], 'rows_affected': {}}
+    filled.fitted_stats = {}
+    filled.impute_categorical_low_missing()
+    filled.impute_categorical_high_missing()
+    return filled
+
+
+def default_columns(handler):
+    """The columns the pipeline imputes, and the date columns (whose fills are checked even without gaps)."""
+    columns = (handler.categorical_low_missing + handler.categorical_high_missing + handler.numerical_missing
+               + handler.date_missing)
+    return columns + [col for col in DATE_COLUMNS if col in handler.df.columns and col not in columns]
+
+
+def column_kind(series):
+    """'date', 'numeric' or 'categorical': which strategies and scores apply to a column."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'date'
+    if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+        return 'numeric'
+    return 'categorical'
+
+
+def mask_values(series, fraction, rng):
+    """Copy of `series` with `fraction` of its known values hidden, and the hidden positions."""
+    known = np.flatnonzero(series.notna().to_numpy())
+    hidden = np.sort(rng.choice(known, size=int(len(known) * fraction), replace=False))
+    masked = series.copy()
+    masked.iloc[hidden] = np.nan
+    return masked, hidden
+
+
+def pipeline_constant(handler, col):
+    """The constant impute_categorical_high_missing fills `col` with, or None if it uses the mode."""
+    if col not in handler.categorical_high_missing or col == 'Admission Type':
+        return None
+    return DOMAIN_FILLS.get(col, 'Unknown')
+
+
+def numeric_strategies():
+    return {
+        'mean': lambda masked: masked.astype('float64').fillna(masked.mean()),
+        'median': lambda masked: masked.astype('float64').fillna(masked.median()),
+    }
+
+
+def categorical_strategies(handler, col):
+    strategies = {'mode': lambda masked: masked.fillna(masked.mode()[0])}
+    constant = pipeline_constant(handler, col)
+    if constant is not None:
+        strategies[f"constant '{constant}'"] = lambda masked: with_category(masked, constant).fillna(constant)
+    return strategies
+
+
+def date_strategies():
+    return {
+        'ffill/bfill': lambda masked: masked.ffill().bfill(),
+        'bfill/ffill': lambda masked: masked.bfill().ffill(),
+    }
+
+
+def model_strategies(handler, col, kind, options):
+    """Model-based imputers that can fill `col`: {strategy name: fill(masked series) -> filled series}."""
+    strategies = {}
+    if kind == 'numeric' and knn_available():
+        features = options['knn_handler'].knn_features(col)
+        for k in options['ks']:
+            for distance in options['distances']:
+                strategies[f'knn(k={k}, {distance})'] = (
+                    lambda masked, k=k, distance=distance:
+                    knn_impute(features, masked, k, distance, options['workers'])[0])
+    if col in MICE_COLUMNS:
+        columns = [c for c in MICE_COLUMNS if c in handler.df.columns]
+        predictors = [c for c in MICE_PREDICTORS if c in handler.df.columns]
+
+        def mice(masked):
+            # All MICE columns are fitted together, as in the pipeline
+            frame = handler.df[columns + predictors].assign(**{col: masked})
+            imputer = ChainedImputer(columns, predictors, options['mice_iterations'], workers=options['workers'])
+            return imputer.fit_transform(frame)[col]
+        strategies['mice'] = mice
+    return strategies
+
+
+def column_strategies(handler, col, kind, options):
+    """All strategies for `col`, and the name of the one the pipeline uses by default."""
+    if kind == 'numeric':
+        strategies, default = numeric_strategies(), numeric_fill_statistic(col)
+    elif kind == 'date':
+        strategies, default = date_strategies(), 'ffill/bfill'
+    else:
+        strategies = categorical_strategies(handler, col)
+        constant = pipeline_constant(handler, col)
+        default = 'mode' if constant is None else f"constant '{constant}'"
+    strategies.update(model_strategies(handler, col, kind, options))
+    return strategies, default
+
+
+def macro_f1(truth, predicted):
+    """F1 averaged over the categories that occur in the truth or the predictions."""
+    codes, _ = pd.factorize(np.concatenate([truth, predicted]).astype(str))
+    true_codes, predicted_codes = codes[:len(truth)], codes[len(truth):]
+    n = codes.max() + 1
+    hits = np.bincount(true_codes[true_codes == predicted_codes], minlength=n)
+    denominator = np.bincount(true_codes, minlength=n) + np.bincount(predicted_codes, minlength=n)
+    return float(np.mean(2 * hits / denominator))
+
+
+def score(kind, truth, filled):
+    """Error or accuracy scores of the filled values at the hidden positions."""
+    if kind == 'categorical':
+        predicted = np.asarray(filled, dtype=object)
+        return {'accuracy': float(np.mean(predicted == truth)), 'f1': macro_f1(truth, predicted)}
+    if kind == 'date':
+        errors = (filled.to_numpy(dtype='datetime64[ns]') - truth) / DAY
+    else:
+        errors = filled.to_numpy(dtype='float64') - truth
+    # A hidden value left unfilled makes the errors NaN, which never meets a bar
+    return {'rmse': float(np.sqrt(np.mean(errors ** 2))), 'mae': float(np.mean(np.abs(errors)))}
+
+
+def run_benchmark(handler, columns, fraction=DEFAULT_MASK_FRACTION, ks=(DEFAULT_K,), distances=('euclidean',),
+                  workers=1, seed=0, mice_iterations=DEFAULT_MAX_ITERATIONS):
+    """Result records ({column, kind, strategy, hidden, rmse, mae, accuracy, f1, seconds,
+    values_per_second, pipeline_default})."""
+    rng = np.random.default_rng(seed)
+    options = {'ks': ks, 'distances': distances, 'workers': workers, 'mice_iterations': mice_iterations}
+    if knn_available() and any(column_kind(handler.df[col]) == 'numeric' for col in columns):
+        options['knn_handler'] = with_categorical_fills(handler)
+    results = []
+    for col in columns:
+        series = handler.df[col]
+        kind = column_kind(series)
+        masked, hidden = mask_values(series, fraction, rng)
+        if kind == 'categorical':
+            truth = np.asarray(series.iloc[hidden], dtype=object)
+        elif kind == 'date':
+            truth = series.iloc[hidden].to_numpy(dtype='datetime64[ns]')
+        else:
+            truth = series.iloc[hidden].to_numpy(dtype='float64')
+        strategies, default = column_strategies(handler, col, kind, options)
+        for name, fill in strategies.items():
+            started = time.perf_counter()
+            filled = fill(masked)
+            seconds = time.perf_counter() - started
+            record = {'column': col, 'kind': kind, 'strategy': name, 'hidden': len(hidden),
+                      'rmse': None, 'mae': None, 'accuracy': None, 'f1': None}
+            record.update(score(kind, truth, filled.iloc[hidden]))
+            record.update({
+                'seconds': round(seconds, 4),
+                'values_per_second': round(len(hidden) / seconds) if seconds > 0 else None,
+                'pipeline_default': name == default,
+            })
+            results.append(record)
+    return results
+
+
+def apply_bars(results, bars=None, relative=DEFAULT_RELATIVE_BAR):
+    """Mark the records that meet their column's bar; returns the fastest such strategy per column.
+
+    `bars` maps columns to a maximum RMSE (numeric and date columns) or a
+    minimum macro F1 (categorical columns). Other columns must come within
+    `relative` of their best strategy.
+    """
+    bars = bars or {}
+    recommended = {}
+    for col, records in pd.DataFrame(results).groupby('column', sort=False):
+        categorical = records['kind'].iloc[0] == 'categorical'
+        if col in bars:
+            bar = bars[col]
+        elif categorical:
+            bar = records['f1'].max() * (1 - relative)
+        else:
+            bar = records['rmse'].min() * (1 + relative)
+        for record in results:
+            if record['column'] == col:
+                record['bar'] = float(bar)
+                record['meets_bar'] = bool(record['f1'] >= bar if categorical else record['rmse'] <= bar)
+        passing = [record for record in results if record['column'] == col and record['meets_bar']]
+        if passing:
+            recommended[col] = min(passing, key=lambda record: record['seconds'])['strategy']
+    return recommended
+
+
+def print_results(results, recommended):
+    log.info("\n" + "="*50)
+    log.info("MASKED-VALUE IMPUTATION BENCHMARK")
+    log.info("="*50)
+    for col, records in pd.DataFrame(results).groupby('column', sort=False):
+        kind = records['kind'].iloc[0]
+        unit = ' (days)' if kind == 'date' else ''
+        log.info(f"\n{col}{unit}: {records['hidden'].iloc[0]:,} hidden values, "
+                 f"bar {'F1 >=' if kind == 'categorical' else 'RMSE <='} {records['bar'].iloc[0]:.3f}")
+        first, second = ('Accuracy', 'F1') if kind == 'categorical' else ('RMSE', 'MAE')
+        log.info(f"{'Strategy':<30}{first:>14}{second:>14}{'Seconds':>10}{'Values/s':>14}")
+        for record in records.to_dict('records'):
+            values = ((record['accuracy'], record['f1']) if kind == 'categorical'
+                      else (record['rmse'], record['mae']))
+            marker = '  (pipeline default)' if record['pipeline_default'] else ''
+            marker += '' if record['meets_bar'] else '  below bar'
+            rate = '-' if record['values_per_second'] is None else f"{record['values_per_second']:,}"
+            log.info(f"{record['strategy']:<30}{values[0]:>14.3f}{values[1]:>14.3f}"
+                     f"{record['seconds']:>10.3f}{rate:>14}{marker}")
+        if col in recommended:
+            log.info(f"Cheapest strategy meeting the bar: {recommended[col]}")
+        else:
+            log.info("No strategy meets the bar")
+
+
+def parse_bars(parser, entries):
+    """{column: bar} from COLUMN=VALUE entries."""
+    bars = {}
+    for entry in entries:
+        col, _, value = entry.rpartition('=')
+        try:
+            bars[col] = float(value)
+        except ValueError:
+            parser.error(f"--bar takes COLUMN=VALUE entries, not {entry!r}")
+        if not col:
+            parser.error(f"--bar takes COLUMN=VALUE entries, not {entry!r}")
+    return bars
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hide known values and compare how well the imputation "
+                                                 "strategies recover them.")
+    parser.add_argument('--input', default="Hospital_dataset.csv", help="Input dataset (as for the ML pipeline)")
+    parser.add_argument('--columns', nargs='+', default=None,
+                        help="Columns to benchmark (default: those the pipeline imputes, and the dates)")
+    parser.add_argument('--mask-fraction', type=float, default=DEFAULT_MASK_FRACTION,
+                        help="Share of the known values hidden in each column")
+    parser.add_argument('--k', type=int, nargs='+', default=[DEFAULT_K], help="Neighbour counts of KNN imputation")
+    parser.add_argument('--distance', choices=list(DISTANCES), nargs='+', default=['euclidean'],
+                        help="Distances of KNN imputation")
+    parser.add_argument('--mice-iterations', type=int, default=DEFAULT_MAX_ITERATIONS,
+                        help="Most rounds of chained-equation imputation")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes the KNN queries and the chained-equation models are spread over")
+    parser.add_argument('--bar', nargs='+', default=[], metavar='COLUMN=VALUE',
+                        help="Accuracy bar of a column: the highest RMSE, or the lowest F1 of a categorical column")
+    parser.add_argument('--relative-bar', type=float, default=DEFAULT_RELATIVE_BAR,
+                        help="Columns without a --bar must come within this share of the best strategy")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the hidden value choice")
+    parser.add_argument('--output', default='imputation_benchmark.json', help="Results JSON")
+    parser.add_argument('--verbosity', choices=list(VERBOSITY_LEVELS), default='summary',
+                        help="Verbosity of the results and of the pipeline steps that prepare the frame")
+    args = parser.parse_args()
+    if not 0 < args.mask_fraction < 1:
+        parser.error("--mask-fraction must be between 0 and 1")
+    bars = parse_bars(parser, args.bar)
+    configure_logging(args.verbosity)
+    if not knn_available():
+        log.warning("scipy is not installed: KNN imputation is not benchmarked")
+
+    handler = prepare_frame(args.input)
+    columns = args.columns or default_columns(handler)
+    unknown = [col for col in columns + list(bars) if col not in handler.df.columns]
+    if unknown:
+        parser.error(f"Unknown columns {unknown}")
+    results = run_benchmark(handler, columns, args.mask_fraction, args.k, args.distance, args.workers, args.seed,
+                            args.mice_iterations)
+    recommended = apply_bars(results, bars, args.relative_bar)
+    print_results(results, recommended)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'input': args.input,
+            'rows': len(handler.df),
+            'mask_fraction': args.mask_fraction,
+            'seed': args.seed,
+            'workers': args.workers,
+            'relative_bar': args.relative_bar,
+            'recommended': recommended,
+            'results': results,
+        }, f, indent=2)
+    log.info(f"\nBenchmark results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+KNN Imputation of Numerical Columns
+===================================
+
+Fills the gaps of a numerical column with the mean of that column over the
+k most similar rows that have a value:
+- Categorical features are one-hot encoded and scaled so that every
+  category that differs adds the same distance (1) under each metric;
+  missing categories are a category of their own
+- Numerical features are standardized; a missing value sits at the mean
+- Neighbours are found with a KD-tree (`scipy.spatial.cKDTree`) over the
+  rows that have a value, queried in batches
+- Distances: euclidean, manhattan or chebyshev
+- With `workers` > 1, the batches are spread over a process pool; the
+  encoded rows go to the workers through shared memory and each worker
+  builds its own tree once
+
+Only the rows with a gap are queried, so the cost grows with the number of
+gaps times log(rows).
+
+scipy is optional: without it, the statistical fills remain available.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import time
+import pandas as pd
+import numpy as np
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+DEFAULT_K = 5
+# Minkowski p of each distance, as cKDTree.query takes it
+DISTANCES = {'euclidean': 2, 'manhattan': 1, 'chebyshev': np.inf}
+QUERY_BATCH_SIZE = 20_000
+# Sliding-midpoint splits (balanced_tree=False) with this leaf size built and queried
+# fastest on the one-hot encoded rows
+LEAF_SIZE = 64
+
+# Tree of a pool worker, built once from the shared encoded rows
+_worker_tree = None
+_worker_block = None
+
+
+def knn_available():
+    """True if scipy (for the KD-tree) is installed."""
+    return cKDTree is not None
+
+
+def encode_features(features, p=2):
+    """float64 matrix of `features` for distance computations.
+
+    Categorical (non-numeric) columns become one-hot columns scaled by
+    0.5 ** (1 / p), so two rows in different categories are 1 apart under the
+    Minkowski distance of order `p`. Numerical columns are standardized and
+    their missing values set to 0 (the mean).
+    """
+    blocks = []
+    scale = 0.5 ** (1 / p)
+    for col in features.columns:
+        series = features[col]
+        if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.to_numpy(dtype='float64', na_value=np.nan)
+            std = np.nanstd(values)
+            values = (values - np.nanmean(values)) / (std if std > 0 else 1.0)
+            blocks.append(np.nan_to_num(values, nan=0.0)[:, None])
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=False)
+            one_hot = np.zeros((len(series), len(uniques)))
+            one_hot[np.arange(len(series)), codes] = scale
+            blocks.append(one_hot)
+    if not blocks:
+        return np.zeros((len(features), 1))
+    return np.hstack(blocks)
+
+
+def make_tree(reference, leaf_size=LEAF_SIZE):
+    return cKDTree(reference, leafsize=leaf_size, balanced_tree=False, compact_nodes=False)
+
+
+def _init_worker(block_name, shape, leaf_size):
+    global _worker_tree, _worker_block
+    _worker_block = SharedMemory(name=block_name)
+    reference = np.ndarray(shape, dtype=np.float64, buffer=_worker_block.buf)
+    _worker_tree = make_tree(reference, leaf_size)
+
+
+def _query_batch(points, k, p):
+    return _worker_tree.query(points, k=k, p=p)[1].reshape(len(points), k)
+
+
+def nearest_rows(reference, points, k, p=2, workers=1, batch_size=QUERY_BATCH_SIZE):
+    """Positions in `reference` of the k nearest rows of each point, as an (n_points, k) array."""
+    batches = [points[start:start + batch_size] for start in range(0, len(points), batch_size)]
+    if workers > 1 and len(batches) > 1:
+        block = SharedMemory(create=True, size=max(reference.nbytes, 1))
+        try:
+            np.ndarray(reference.shape, dtype=np.float64, buffer=block.buf)[:] = reference
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(block.name, reference.shape, LEAF_SIZE)) as pool:
+                results = list(pool.map(_query_batch, batches, repeat(k), repeat(p)))
+        finally:
+            block.close()
+            block.unlink()
+    else:
+        tree = make_tree(reference)
+        results = [tree.query(batch, k=k, p=p)[1].reshape(len(batch), k) for batch in batches]
+    return np.vstack(results) if results else np.zeros((0, k), dtype=np.int64)
+
+
+def knn_impute(features, target, k=DEFAULT_K, distance='euclidean', workers=1, batch_size=QUERY_BATCH_SIZE):
+    """Fill the gaps of `target` with its mean over the k nearest rows (by `features`) that have a value.
+
+    Returns the filled float64 Series and details (k used, rows queried,
+    reference rows, seconds). A column without any value is returned as is.
+    """
+    if cKDTree is None:
+        raise ValueError("KNN imputation needs the 'scipy' package (pip install scipy)")
+    started = time.perf_counter()
+    p = DISTANCES[distance]
+    values = target.to_numpy(dtype='float64', na_value=np.nan)
+    missing = np.isnan(values)
+    k = min(k, int((~missing).sum()))
+    details = {'k': k, 'distance': distance, 'queried_rows': int(missing.sum()),
+               'reference_rows': int((~missing).sum())}
+    if k == 0 or not missing.any():
+        details['seconds'] = time.perf_counter() - started
+        return pd.Series(values, index=target.index, name=target.name), details
+
+    encoded = encode_features(features, p)
+    neighbours = nearest_rows(encoded[~missing], encoded[missing], k, p, workers, batch_size)
+    filled = values.copy()
+    filled[missing] = values[~missing][neighbours].mean(axis=1)
+    details['seconds'] = time.perf_counter() - started
+    return pd.Series(filled, index=target.index, name=target.name), details
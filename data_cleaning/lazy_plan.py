@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Lazy Pipeline Plans
+===================
+
+Both pipelines can describe their steps as backend-neutral operations (see
+execution_backends.py). A `LazyPlan` records those operations against an
+input without running anything, optimizes them and only then runs them on
+pandas, Polars or DuckDB:
+- Projection pushdown: input columns that no operation reads and that are
+  dropped before the output (`Name` in the imputation pipeline) are left
+  out of the scan; pandas gets the projection as `usecols`
+- Step fusion: consecutive operations on the same column run as one pass.
+  Validation rules are applied together, value cleaners are composed and
+  run once per distinct value, and a fill with a fixed value makes later
+  fills of that column redundant. Operations on other columns in between
+  do not stop the fusion.
+- Statistics the operations depend on (`Statistic`: a median fill, the
+  quantile bin edges) are computed on the backend just before the
+  operation, as in the eager pipelines
+- `explain()` lists the scan and every operation with an estimated cost in
+  cell passes (rows x columns read and written), with the unoptimized total
+  for comparison
+
+Optimizing does not change the result: the optimized plan gives the same
+output as running the recorded operations one by one.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import os
+import copy
+import functools
+import pandas as pd
+from collections import OrderedDict
+from execution_backends import Operation, operation, csv_header
+from columnar_io import is_columnar_path, columnar_dataset, HELPER_COLUMNS
+
+# Bytes read from the top of a CSV to estimate its row count
+ROW_SAMPLE_BYTES = 1024 * 1024
+# Operations on one column that can be fused into a single pass
+FUSIBLE_KINDS = ['rule', 'rules', 'map_values', 'fill']
+
+
+class Statistic:
+    """Operation parameter computed on the backend just before the operation runs.
+
+    `stat` is 'median', 'mean', 'mode' or 'quantiles' (at `qs`) of `column`
+    (by default the operation's column). `default` stands in for a missing
+    result and `then` turns the statistic into the parameter value.
+    """
+
+    def __init__(self, stat, column=None, qs=None, default=None, then=None):
+        self.stat = stat
+        self.column = column
+        self.qs = qs
+        self.default = default
+        self.then = then
+
+    def resolve(self, backend, relation, column):
+        value = backend.statistic(relation, self.column or column, self.stat, qs=self.qs)
+        if value is None:
+            value = self.default
+        if self.then is not None and value is not None:
+            value = self.then(value)
+        return value
+
+    def __repr__(self):
+        column = f"'{self.column}'" if self.column else ''
+        return f"{self.stat}({column})"
+
+
+def input_columns(path, index_col=None):
+    """Data columns of an input as the backends scan them (no index or helper columns)."""
+    if is_columnar_path(path):
+        columns = columnar_dataset(path).schema.names
+    else:
+        columns = csv_header(path)
+        if index_col is not None:
+            columns = columns[:index_col] + columns[index_col + 1:]
+    return [col for col in columns if col not in HELPER_COLUMNS]
+
+
+def estimate_rows(path):
+    """Row count of a columnar input, or an estimate from the line length at the top of a CSV."""
+    if is_columnar_path(path):
+        return columnar_dataset(path).count_rows()
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        sample = f.read(ROW_SAMPLE_BYTES)
+    lines = sample.count(b'\n')
+    if len(sample) == size:
+        # The whole file was read: count an unterminated last line, not the header
+        return max(lines + (0 if sample.endswith(b'\n') else 1) - 1, 0)
+    return max(int(size * lines / len(sample)) - 1, 0)
+
+
+def operation_columns(op, present):
+    """(columns read, columns written, columns dropped) by an operation.
+
+    `present` are the columns before it; deduplication reads all of them.
+    Columns a `Statistic` parameter is computed on count as read.
+    """
+    kind, column, params = op
+    if kind == 'dedupe':
+        reads, writes, drops = list(present), [], []
+    elif kind == 'drop':
+        reads, writes, drops = [], [], list(params['columns'])
+    elif kind == 'null_if_before':
+        reads, writes, drops = [column, params['other']], [column], []
+    elif kind == 'swap_if_before':
+        reads, writes, drops = [column, params['end']], [column, params['end']], []
+    elif kind == 'days_between':
+        reads, writes, drops = [params['start'], params['end']], [column], []
+    elif kind == 'bins':
+        reads, writes, drops = [params['source']], [column], []
+    else:
+        reads, writes, drops = [column], [column], []
+    for value in params.values():
+        if isinstance(value, Statistic) and (value.column or column) not in reads:
+            reads.append(value.column or column)
+    return reads, writes, drops
+
+
+def operation_cost(op, present, rows):
+    """Estimated cell passes: every column read or written is one pass over the rows,
+    and so is every statistic."""
+    reads, writes, _ = operation_columns(op, present)
+    statistics = sum(isinstance(value, Statistic) for value in op.params.values())
+    return rows * (len(reads) + len(writes) + statistics)
+
+
+def describe_operation(op):
+    """One-line description of an operation for `explain`."""
+    kind, column, params = op
+    target = f" '{column}'" if column else ''
+    if kind in ('rule', 'rules'):
+        rules = params['rules'] if kind == 'rules' else [params['rule']]
+        detail = ', '.join(rule['name'] for rule in rules)
+    elif kind == 'map_values':
+        detail = _function_name(params['func'])
+    elif kind == 'drop':
+        detail = ', '.join(params['columns'])
+    else:
+        detail = ', '.join(f"{name}={_short(value)}" for name, value in params.items())
+    return f"{kind}{target}" + (f" [{detail}]" if detail else '')
+
+
+def _function_name(func):
+    if isinstance(func, functools.partial):
+        func = func.func
+    return getattr(func, '__name__', repr(func))
+
+
+def _short(value):
+    if isinstance(value, (list, tuple)) and len(value) > 4:
+        return f"[{', '.join(map(repr, value[:3]))}, ...]"
+    return repr(value)
+
+
+def prune_columns(columns, operations):
+    """Projection pushdown: the input columns the operations need, and the
+    operations without the drops of columns that are no longer scanned.
+
+    A column is needed when an operation reads its input values or when it
+    reaches the output; columns only dropped are never read.
+    """
+    from_input = set(columns)
+    present = list(columns)
+    needed = set()
+    for op in operations:
+        reads, writes, drops = operation_columns(op, present)
+        needed.update(col for col in reads if col in from_input)
+        from_input.difference_update(writes + drops)
+        present = [col for col in present if col not in drops] + [col for col in writes if col not in present]
+    needed.update(col for col in present if col in columns)
+
+    projection = [col for col in columns if col in needed]
+    pruned = [col for col in columns if col not in needed]
+    # Drops of pruned columns go, unless an operation has created the column again
+    kept, written = [], set()
+    for op in operations:
+        if op.kind == 'drop':
+            remaining = [col for col in op.params['columns'] if col not in pruned or col in written]
+            if not remaining:
+                continue
+            op = operation('drop', columns=remaining)
+        kept.append(op)
+        written.update(operation_columns(op, columns)[1])
+    return projection, kept, pruned
+
+
+def compose_values(funcs):
+    """One vectorized cleaner running (func, vectorized) pairs in order; values
+    a cleaner turns into missing are not passed to the later ones."""
+    def composed(values):
+        values = pd.Series(values, dtype=object).reset_index(drop=True)
+        for func, vectorized in funcs:
+            present = values.notna().to_numpy()
+            if not present.any():
+                break
+            subset = values[present]
+            cleaned = subset.pipe(func) if vectorized else subset.map(func)
+            values = values.copy()
+            values[present] = pd.Series(cleaned).to_numpy(dtype=object)
+        return values
+    composed.__name__ = '+'.join(_function_name(func) for func, _ in funcs)
+    composed.funcs = list(funcs)
+    return composed
+
+
+def _fuse_pair(earlier, later):
+    """The single operation doing `earlier` then `later` on one column, or None."""
+    if earlier.kind in ('rule', 'rules') and later.kind in ('rule', 'rules'):
+        rules = [rule for op in (earlier, later)
+                 for rule in (op.params['rules'] if op.kind == 'rules' else [op.params['rule']])]
+        return operation('rules', earlier.column, rules=rules)
+    if earlier.kind == 'map_values' and later.kind == 'map_values':
+        first = earlier.params['func']
+        funcs = getattr(first, 'funcs', [(first, earlier.params.get('vectorized', False))])
+        funcs = funcs + [(later.params['func'], later.params.get('vectorized', False))]
+        return operation('map_values', earlier.column, func=compose_values(funcs), vectorized=True)
+    if earlier.kind == 'fill' and later.kind == 'fill':
+        value = earlier.params['value']
+        # Once filled with a known value the column has no gaps left to fill
+        if not isinstance(value, Statistic) and value is not None:
+            return earlier
+    return None
+
+
+def fuse_operations(columns, operations):
+    """Step fusion: each fusible operation is merged into the last earlier operation
+    touching its column, when the two can run as one pass; returns the fused
+    operations and a note per fusion."""
+    fused, notes, members = [], [], []
+    for op in operations:
+        target = None
+        if op.kind in FUSIBLE_KINDS:
+            present = list(columns)
+            touched = []
+            for position, earlier in enumerate(fused):
+                reads, writes, drops = operation_columns(earlier, present)
+                present = [col for col in present if col not in drops] + [col for col in writes if col not in present]
+                if op.column in reads + writes + drops:
+                    touched.append(position)
+            if touched:
+                target = touched[-1]
+                merged = _fuse_pair(fused[target], op)
+                if merged is None:
+                    target = None
+        if target is None:
+            fused.append(op)
+            members.append(1)
+        else:
+            fused[target] = merged
+            members[target] += 1
+
+    for op, count in zip(fused, members):
+        if count > 1:
+            notes.append(f"fused {count} operations on '{op.column}' into one {op.kind} pass")
+    return fused, notes
+
+
+class LazyPlan:
+    """Operations recorded against an input; nothing runs until `collect`."""
+
+    def __init__(self, input_file, index_col=None, operations=None):
+        self.input_file = input_file
+        self.index_col = index_col
+        self.columns = input_columns(input_file, index_col)
+        self.operations = list(operations or [])
+        # Set by optimize(): the columns to scan, what changed and the plan it came from
+        self.projection = None
+        self.notes = []
+        self.unoptimized = None
+        # Statistic values resolved by the last collect(), by column
+        self.statistics = OrderedDict()
+
+    def add(self, kind, column=None, **params):
+        self.operations.append(operation(kind, column, **params))
+        return self
+
+    def extend(self, operations):
+        self.operations.extend(operations)
+        return self
+
+    def optimize(self):
+        """Copy of the plan with the projection pushed into the scan and steps fused."""
+        projection, operations, pruned = prune_columns(self.columns, self.operations)
+        operations, notes = fuse_operations(projection, operations)
+        if pruned:
+            notes.insert(0, f"pruned {', '.join(pruned)} from the scan (never read before being dropped)")
+
+        plan = copy.copy(self)
+        plan.operations = operations
+        plan.projection = projection
+        plan.notes = notes
+        plan.unoptimized = self
+        plan.statistics = OrderedDict()
+        return plan
+
+    def scan(self, backend):
+        """The input as a relation on `backend`, reading only the projected columns."""
+        return backend.scan(self.input_file, index_col=self.index_col, columns=self.projection)
+
+    def collect(self, backend, relation=None):
+        """Run the operations on `backend`; scans the input unless `relation` is given."""
+        if relation is None:
+            relation = self.scan(backend)
+        self.statistics = OrderedDict()
+        for op in self.operations:
+            params = {}
+            for name, value in op.params.items():
+                if isinstance(value, Statistic):
+                    value = value.resolve(backend, relation, op.column)
+                    self.statistics[op.column] = value
+                params[name] = value
+            relation = backend.apply(relation, Operation(op.kind, op.column, params))
+        return relation
+
+    def estimated_cost(self, rows):
+        """Estimated cell passes of the scan and every operation: (scan cost, [operation costs])."""
+        present = list(self.projection if self.projection is not None else self.columns)
+        scan_cost = rows * len(present)
+        costs = []
+        for op in self.operations:
+            costs.append(operation_cost(op, present, rows))
+            _, writes, drops = operation_columns(op, present)
+            present = [col for col in present if col not in drops] + [col for col in writes if col not in present]
+        return scan_cost, costs
+
+    def explain(self, rows=None):
+        """The plan as text: the scan, each operation and its estimated cost."""
+        rows = estimate_rows(self.input_file) if rows is None else rows
+        scan_cost, costs = self.estimated_cost(rows)
+        scanned = self.projection if self.projection is not None else self.columns
+
+        steps = [f"scan {os.path.basename(self.input_file)}: {len(scanned)} of {len(self.columns)} columns, "
+                 f"~{rows:,} rows"]
+        steps += [f"{i:>3}. {describe_operation(op)}" for i, op in enumerate(self.operations, 1)]
+        width = max(len(step) for step in steps)
+        lines = [f"{'Step':<{width}} {'Est. cost':>14}"]
+        lines += [f"{step:<{width}} {cost:>14,}" for step, cost in zip(steps, [scan_cost] + costs)]
+
+        total = scan_cost + sum(costs)
+        lines.append(f"Estimated cost: {total:,} cell passes")
+        if self.unoptimized is not None:
+            before_scan, before_costs = self.unoptimized.estimated_cost(rows)
+            before = before_scan + sum(before_costs)
+            saved = (1 - total / before) * 100 if before else 0
+            lines.append(f"Unoptimized: {len(self.unoptimized.operations)} operations, {before:,} cell passes "
+                         f"({saved:.0f}% saved)")
+            lines.append("Optimizations: " + ('; '.join(self.notes) if self.notes else 'none'))
+        return '\n'.join(lines)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Copy-Free, Memory-Bounded Mode
+==============================
+
+The in-memory pipelines keep one frame, but several steps briefly hold a
+second full copy of it next to the first. In memory-bounded mode:
+- pandas Copy-on-Write is switched on for the run, so selections and
+  derived frames share data with the frame until one of them is written to
+- Duplicate rows are found by folding the columns' codes into one group
+  array, one column at a time, instead of holding an int64 code array per
+  column; the filtered frame is built while the old one is emptied
+- Column drops work on the pipeline's own frame instead of a new one
+- String cleaners run over the distinct values in batches, which bounds
+  their temporary arrays
+- Each step's peak resident set size (RSS) is recorded, next to the RSS
+  before loading and the size of the loaded dataset, so the peak can be
+  checked against "one copy of the dataset plus a small margin"
+
+Per-step peaks come from the kernel's high-water mark (VmHWM), which is
+reset at the start of each step where Linux allows it (/proc/self/clear_refs).
+Elsewhere the peak is the process-wide maximum so far (`ru_maxrss`).
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import sys
+import contextlib
+import pandas as pd
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROC_STATUS = '/proc/self/status'
+PROC_CLEAR_REFS = '/proc/self/clear_refs'
+# Distinct values per call of a vectorized string cleaner
+DISTINCT_BATCH_SIZE = 50_000
+
+
+def _status_mb(field):
+    """A memory field of /proc/self/status (e.g. VmRSS) in MB, or None."""
+    try:
+        with open(PROC_STATUS) as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_mb():
+    """Current resident set size in MB (None if it cannot be read)."""
+    return _status_mb('VmRSS')
+
+
+def reset_peak_rss():
+    """Reset the kernel's RSS high-water mark; returns False where that is not possible."""
+    try:
+        with open(PROC_CLEAR_REFS, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():
+    """Highest RSS since the last reset (or since the process started) in MB."""
+    peak = _status_mb('VmHWM')
+    if peak is not None or resource is None:
+        return peak
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+@contextlib.contextmanager
+def copy_on_write(enabled=True):
+    """Run a block with pandas Copy-on-Write switched on."""
+    if not enabled:
+        yield
+        return
+    with pd.option_context('mode.copy_on_write', True):
+        yield
+
+
+def duplicated_rows(df):
+    """`df.duplicated().to_numpy()`, holding one column's codes at a time.
+
+    Each column is factorized with the same equality as `duplicated` (all
+    missing values alike) and folded into the group id of the columns
+    before it, so rows end up in the same group exactly when they are equal.
+    """
+    groups = np.zeros(len(df), dtype=np.int64)
+    for col in df.columns:
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+        # Missing values (-1) become code 0; group ids stay below the row count
+        groups, _ = pd.factorize(groups * (len(uniques) + 1) + (codes + 1), use_na_sentinel=True)
+    return pd.Series(groups).duplicated().to_numpy()
+
+
+def take_rows(df, keep):
+    """`df[keep]`, built one column at a time while the columns are removed from `df`.
+
+    Only one column is ever held twice. `df` is emptied, so it must not be
+    used by anything else afterwards.
+    """
+    index = df.index[keep]
+    columns = {}
+    for col in list(df.columns):
+        columns[col] = df[col].array[keep]
+        del df[col]
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def drop_columns(df, columns):
+    """Drop columns from `df` itself (no new frame)."""
+    for col in columns:
+        del df[col]
+
+
+def peak_summary(baseline_rss, data_mb, peak_rss):
+    """Peak RSS split into the pre-load baseline, the dataset and the rest."""
+    if baseline_rss is None or peak_rss is None:
+        return None
+    above = peak_rss - baseline_rss
+    return {
+        'baseline_rss_mb': round(baseline_rss, 1),
+        'dataset_mb': round(data_mb, 1),
+        'peak_rss_mb': round(peak_rss, 1),
+        'peak_above_baseline_mb': round(above, 1),
+        'copies_of_dataset': round(above / data_mb, 2) if data_mb else None,
+    }
+
+
+def describe_peak(summary):
+    """One-line account of a `peak_summary`."""
+    if summary is None:
+        return "Peak RSS is not available on this platform"
+    return (f"Peak RSS {summary['peak_rss_mb']:.1f} MB: {summary['baseline_rss_mb']:.1f} MB before loading + "
+            f"{summary['peak_above_baseline_mb']:.1f} MB for a {summary['dataset_mb']:.1f} MB dataset "
+            f"({summary['copies_of_dataset']}x the dataset)")
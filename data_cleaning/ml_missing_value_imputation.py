@@ -13,6 +13,7 @@ Strategies Applied:
 4. Domain-specific imputation for medical data
 5. Forward/backward fill for dates
 6. KNN imputation for numerical data if needed
+7. Chained-equation (MICE) imputation of related columns if requested
 
 Author: ML Expert
 Date: October 2025
@@ -20,253 +21,521 @@ Date: October 2025
 
 import pandas as pd
 import numpy as np
+import io
+import os
+import json
+import time
+import logging
+import argparse
+import contextlib
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from columnar_io import (write_columnar, read_columnar, is_columnar_path, infer_format,
+                          path_for_format, PARTITION_SCHEMES)
+from dtype_schema import print_memory_report, with_category
+from quantile_sketch import QuantileSketch, DEFAULT_ERROR, EXACT_LIMIT
+from incremental_state import (state_path_for, load_state, save_state, input_watermark, refit_reason,
+                               read_new_rows, max_admission_date, fitted_value, output_dtype_kinds,
+                               align_to_output, jsonable)
+from execution_backends import (make_backend, choose_backend, available_backends, compare_frames, column_kind,
+                                print_equivalence_table, BACKEND_CHOICES)
+from step_metrics import StepMetrics, instrumented_step, metrics_path_for
+from memory_bounded import copy_on_write, drop_columns, rss_mb, peak_summary, describe_peak
+from null_index import NullIndex, describe_patterns
+from step_cache import StepCache, read_csv_cached, code_version, file_digest, DEFAULT_CACHE_MB
+from checkpoints import CheckpointStore, run_checkpointed
+from knn_imputation import knn_impute, knn_available, DEFAULT_K, DISTANCES
+from chained_imputation import ChainedImputer, DEFAULT_MAX_ITERATIONS
+from lazy_plan import LazyPlan, Statistic
+from diagnostics import get_logger, lazy, configure_logging, VERBOSITY_LEVELS
+
+log = get_logger('imputation')
+
+# analyze_missing_patterns() strategy lists, saved so incremental runs keep them
+STRATEGY_LISTS = ['categorical_low_missing', 'categorical_high_missing', 'numerical_missing',
+                  'date_missing', 'keep_missing']
+# Columns dropped for ML (PII)
+PII_COLUMNS = ['Name']
+# Domain-specific fills for categoricals with many gaps
+DOMAIN_FILLS = {'Insurance Provider': 'Self-Pay', 'Medication': 'No Medication'}
+AGE_GROUP_BINS = [0, 18, 35, 50, 65, 100]
+AGE_GROUP_LABELS = ['Child', 'Young_Adult', 'Adult', 'Middle_Age', 'Senior']
+BILLING_CATEGORY_LABELS = ['Low', 'Medium', 'High', 'Very_High']
+# Columns generate_ml_ready_features() adds
+FEATURE_COLUMNS = ['Length_of_Stay', 'Age_Group', 'Billing_Category']
+# Most frequent sets of columns missing together shown in the full output
+MISSING_PATTERNS_SHOWN = 10
+# Fills impute_numerical_data() can use; 'knn' needs scipy (see knn_imputation.py)
+NUMERIC_IMPUTATIONS = ['statistical', 'knn']
+# Features KNN imputation finds neighbours on (those present in the frame)
+KNN_FEATURES = ['Medical Condition', 'Admission Type', 'Test Results', 'Gender', 'Insurance Provider',
+                'Medication', 'Length_of_Stay', 'Age_Group', 'Age', 'Billing Amount']
+# Features derived from a column are not used to impute that column
+DERIVED_FROM = {'Age_Group': 'Age', 'Billing_Category': 'Billing Amount'}
+# Columns chained-equation imputation fills together, and columns that only help predict them
+MICE_COLUMNS = ['Gender', 'Admission Type', 'Insurance Provider', 'Age', 'Billing Amount']
+MICE_PREDICTORS = ['Medical Condition', 'Test Results', 'Blood Type', 'Medication']
+# Attributes a checkpoint keeps next to the frame
+CHECKPOINT_STATE = ['imputation_report', 'fitted_stats', 'pii_columns'] + STRATEGY_LISTS + ['validation_passed']
+# Modules whose code decides the imputation result (part of its step cache key)
+IMPUTATION_CODE = ['ml_missing_value_imputation', 'columnar_io', 'dtype_schema', 'date_parsing', 'quantile_sketch',
+                   'execution_backends', 'memory_bounded', 'null_index', 'knn_imputation',
+                   'chained_imputation']
+
+def numeric_fill_statistic(col):
+    """Statistic a numerical column is filled with: the median for billing amounts, else the mean."""
+    return 'median' if 'billing' in col.lower() or 'amount' in col.lower() else 'mean'
+
+def billing_category_edges(quartiles):
+    """Billing_Category bin edges from the billing quartiles."""
+    return [0] + list(quartiles) + [float('inf')]
+
 class MLExpertMissingValueHandler:
-    def __init__(self, input_file):
-        """Initialize with the cleaned dataset."""
+    def __init__(self, input_file, quantile_error=DEFAULT_ERROR, exact_quantile_limit=EXACT_LIMIT,
+                 step_metrics=False, memory_bounded=False, cache=None, numeric_imputation='statistical',
+                 knn_k=DEFAULT_K, knn_distance='euclidean', workers=1, mice=False,
+                 mice_iterations=DEFAULT_MAX_ITERATIONS, mice_models=None):
+        """Initialize with the cleaned dataset.
+        
+        The Billing_Category bins come from a quantile sketch with rank error
+        `quantile_error`; up to `exact_quantile_limit` values they are exact.
+        With `step_metrics`, each step's time, memory and row counts are
+        recorded (see step_metrics.py).
+        With `memory_bounded`, the run uses Copy-on-Write, avoids full-frame
+        temporaries and records each step's peak RSS (see memory_bounded.py).
+        `cache` is a StepCache; the CSV parse and the imputation result are
+        reused from it for the same input bytes and code (see step_cache.py).
+        `numeric_imputation` is 'statistical' (median/mean) or 'knn': the mean
+        of the `knn_k` nearest rows by `knn_distance`, queried in `workers`
+        processes (see knn_imputation.py).
+        With `mice`, the MICE_COLUMNS are first imputed together by chained
+        equations, for at most `mice_iterations` rounds, with the models of
+        a round fitted in `workers` processes (see chained_imputation.py).
+        The models are read from `mice_models` if that file exists, else
+        fitted and written to it.
+        """
         self.input_file = input_file
+        self.cache = cache
+        self.quantile_error = quantile_error
+        self.exact_quantile_limit = exact_quantile_limit
+        self.memory_bounded = memory_bounded
+        self.numeric_imputation = numeric_imputation
+        self.knn_k = knn_k
+        self.knn_distance = knn_distance
+        self.workers = workers
+        self.mice = mice
+        self.mice_iterations = mice_iterations
+        self.mice_models = mice_models
+        self.step_metrics = None
+        if step_metrics or memory_bounded:
+            # Hashing cells for the change counts would cost more memory than the steps save
+            self.step_metrics = (StepMetrics(trace_rss=memory_bounded) if step_metrics
+                                 else StepMetrics(trace_memory=False, count_changes=False, trace_rss=True))
         self.df = None
+        # Null bitmaps of self.df, kept current as steps write (see null_index.py)
+        self.null_index = None
         self.imputation_report = {
             'strategies_applied': [],
             'columns_processed': [],
             'rows_affected': {}
         }
+        # Statistics saved by the last full run (incremental mode) and fitted by this one
+        self.saved_stats = None
+        self.fitted_stats = {}
     
+    @instrumented_step
     def load_data(self):
         """Load the dataset."""
-        print("Loading dataset for ML-expert missing value imputation...")
-        self.df = pd.read_csv(self.input_file)
-        print(f"Dataset shape: {self.df.shape}")
-        
-        # Convert dates properly
-        date_cols = ['Date of Admission', 'Discharge Date']
-        for col in date_cols:
-            if col in self.df.columns:
-                self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
+        log.info("Loading dataset for ML-expert missing value imputation...")
+        # Compact dtypes; dates are parsed during the load (or stored typed in Parquet/Feather)
+        if is_columnar_path(self.input_file):
+            self.df, load_info = read_columnar(self.input_file)
+        else:
+            self.df, load_info = read_csv_cached(self.cache, self.input_file)
+        self.imputation_report['memory_mb'] = load_info['memory_mb']
+        self.null_index = NullIndex(self.df)
+        self.imputation_report['date_formats'] = load_info.get('date_formats', {})
+        for col, stats in self.imputation_report['date_formats'].items():
+            log.info(f"{col}: parsed {stats['distinct_values_parsed']} distinct values, rows per format {stats['format_counts']}")
+        log.info(f"Dataset shape: {self.df.shape}")
+        print_memory_report(load_info)
         
         return self.df
     
+    def nulls(self):
+        """Null index of the current frame, rescanning only the columns written since it was last read."""
+        if self.null_index is None:
+            self.null_index = NullIndex(self.df)
+        return self.null_index.refresh(self.df)
+    
+    def _wrote(self, *columns):
+        """Record that a step wrote these columns of self.df."""
+        if self.null_index is not None:
+            self.null_index.mark_written(*columns)
+    
+    @instrumented_step
     def analyze_missing_patterns(self):
         """Analyze missing value patterns for strategic imputation."""
-        print("\n=== MISSING VALUE PATTERN ANALYSIS ===")
+        log.info("\n=== MISSING VALUE PATTERN ANALYSIS ===")
         
-        missing = self.df.isnull().sum()
-        missing_pct = (missing / len(self.df)) * 100
+        missing = self.nulls().counts()
+        kinds = {col: column_kind(self.df[col].dtype) for col in self.df.columns}
+        self.assign_strategies(missing.to_dict(), len(self.df), kinds)
+        log.debug("\nColumns missing together:\n%s",
+                  lazy(lambda: describe_patterns(self.nulls().patterns(MISSING_PATTERNS_SHOWN))))
+    
+    def assign_strategies(self, missing, total_rows, kinds):
+        """Sort the columns with gaps into the imputation strategy lists.
         
+        `missing` maps columns to missing counts and `kinds` to 'datetime',
+        'string', 'numeric' or 'other' (see column_kind).
+        """
         # Categorize columns by missing value strategy
-        self.pii_columns = ['Name']  # Drop for ML
+        self.pii_columns = list(PII_COLUMNS)  # Drop for ML
         self.categorical_low_missing = []  # Mode imputation
         self.categorical_high_missing = []  # Advanced imputation
         self.numerical_missing = []  # Statistical imputation
         self.date_missing = []  # Forward/backward fill
         self.keep_missing = []  # Keep as missing (informative)
         
-        for col in self.df.columns:
+        # Incremental runs keep the strategy the last full run chose for a column
+        saved_strategy = (self.saved_stats or {}).get('strategy', {})
+        
+        for col, kind in kinds.items():
             miss_count = missing[col]
-            miss_pct_val = missing_pct[col]
+            miss_pct_val = (miss_count / total_rows) * 100
             
             if miss_count == 0:
                 continue
-                
-            dtype = self.df[col].dtype
             
-            print(f"{col}: {miss_count} missing ({miss_pct_val:.1f}%)")
+            log.info(f"{col}: {miss_count} missing ({miss_pct_val:.1f}%)")
             
             if col in self.pii_columns:
                 continue
-            elif 'date' in col.lower() or dtype == 'datetime64[ns]':
+            elif col in saved_strategy:
+                getattr(self, saved_strategy[col]).append(col)
+            elif 'date' in col.lower() or kind == 'datetime':
                 self.date_missing.append(col)
-            elif dtype in ['object'] and miss_pct_val < 5:  # Low missing categoricals
+            elif kind == 'string' and miss_pct_val < 5:  # Low missing categoricals
                 self.categorical_low_missing.append(col)
-            elif dtype in ['object'] and miss_pct_val >= 5:  # High missing categoricals
+            elif kind == 'string' and miss_pct_val >= 5:  # High missing categoricals
                 self.categorical_high_missing.append(col)
-            elif dtype in ['float64', 'int64']:
+            elif kind == 'numeric':
                 self.numerical_missing.append(col)
             else:
                 self.keep_missing.append(col)
         
-        print(f"\nImputation Strategy Categories:")
-        print(f"PII to drop: {self.pii_columns}")
-        print(f"Categorical (low missing): {self.categorical_low_missing}")
-        print(f"Categorical (high missing): {self.categorical_high_missing}")
-        print(f"Numerical: {self.numerical_missing}")
-        print(f"Dates: {self.date_missing}")
-        print(f"Keep missing: {self.keep_missing}")
+        log.info(f"\nImputation Strategy Categories:")
+        log.info(f"PII to drop: {self.pii_columns}")
+        log.info(f"Categorical (low missing): {self.categorical_low_missing}")
+        log.info(f"Categorical (high missing): {self.categorical_high_missing}")
+        log.info(f"Numerical: {self.numerical_missing}")
+        log.info(f"Dates: {self.date_missing}")
+        log.info(f"Keep missing: {self.keep_missing}")
+        
+        strategy = self.fitted_stats.setdefault('strategy', {})
+        for name in STRATEGY_LISTS:
+            strategy.update({col: name for col in getattr(self, name)})
     
+    @instrumented_step
     def drop_pii_columns(self):
         """Drop PII columns - standard ML practice."""
-        print("\n=== DROPPING PII COLUMNS ===")
+        log.info("\n=== DROPPING PII COLUMNS ===")
         
         initial_cols = self.df.columns.tolist()
         cols_to_drop = [col for col in self.pii_columns if col in self.df.columns]
         
         if cols_to_drop:
-            print(f"Dropping PII columns: {cols_to_drop}")
-            self.df = self.df.drop(columns=cols_to_drop)
+            log.info(f"Dropping PII columns: {cols_to_drop}")
+            before = self.df
+            if self.memory_bounded:
+                drop_columns(self.df, cols_to_drop)
+            else:
+                self.df = self.df.drop(columns=cols_to_drop)
+            if self.null_index is not None:
+                self.null_index.drop(before, cols_to_drop, self.df)
             self.imputation_report['strategies_applied'].append(f"Dropped PII columns: {cols_to_drop}")
             self.imputation_report['columns_processed'].extend(cols_to_drop)
         else:
-            print("No PII columns to drop")
+            log.info("No PII columns to drop")
+    
+    @instrumented_step
+    def impute_chained_equations(self):
+        """Impute the MICE_COLUMNS together, each predicted from the others by chained equations."""
+        log.info("\n=== CHAINED-EQUATION IMPUTATION (MICE) ===")
+        
+        columns = [col for col in MICE_COLUMNS if col in self.df.columns]
+        predictors = [col for col in MICE_PREDICTORS if col in self.df.columns]
+        missing = {col: self.nulls().count(col) for col in columns}
+        if not any(missing.values()):
+            log.info("No missing values in the chained-equation columns")
+            return
+        
+        # Saved models (incremental state or --mice-models) impute without retraining
+        saved = (self.saved_stats or {}).get('mice_models') or self.load_mice_models()
+        if saved is not None:
+            imputer = ChainedImputer.from_dict(saved)
+            absent = [col for col in imputer.all_columns if col not in self.df.columns]
+            if absent:
+                raise ValueError(f"The saved chained-equation models need the columns {absent}")
+            imputed = imputer.transform(self.df[imputer.all_columns])
+            log.info(f"Using the saved models ({imputer.rounds} rounds, no retraining)")
+        else:
+            imputer = ChainedImputer(columns, predictors, self.mice_iterations, workers=self.workers)
+            imputed = imputer.fit_transform(self.df[columns + predictors])
+            log.info(f"Fitted {imputer.rounds} rounds (at most {self.mice_iterations}); "
+                     f"change per round: {[entry['change'] for entry in imputer.history]}")
+            if self.mice_models:
+                with open(self.mice_models, 'w') as f:
+                    json.dump(jsonable(imputer.to_dict()), f)
+                log.info(f"Chained-equation models saved to {self.mice_models}")
+        self.fitted_stats['mice_models'] = imputer.to_dict()
+        
+        kinds = imputer.model_kinds()
+        for col in imputer.columns:
+            missing_count = missing.get(col, 0)
+            if missing_count == 0 or col not in kinds:
+                continue
+            model = kinds[col].replace('_', ' ')
+            log.info(f"Imputing {col}: {missing_count} missing → {model} predictions")
+            self.df[col] = imputed[col]
+            self._wrote(col)
+            
+            self.imputation_report['strategies_applied'].append(
+                f"Chained-equation imputation for {col} ({model}, {imputer.rounds} rounds)")
+            self.imputation_report['rows_affected'][col] = missing_count
+            self.imputation_report['columns_processed'].append(col)
+    
+    def load_mice_models(self):
+        """Chained-equation models from the mice_models file, or None if there is none."""
+        if not self.mice_models or not os.path.exists(self.mice_models):
+            return None
+        with open(self.mice_models) as f:
+            return json.load(f)
     
+    @instrumented_step
     def impute_categorical_low_missing(self):
         """Impute categorical columns with low missing percentages using mode."""
-        print("\n=== IMPUTING LOW-MISSING CATEGORICALS ===")
+        log.info("\n=== IMPUTING LOW-MISSING CATEGORICALS ===")
         
         for col in self.categorical_low_missing:
             if col not in self.df.columns:
                 continue
                 
-            missing_count = self.df[col].isnull().sum()
+            missing_count = self.nulls().count(col)
             if missing_count == 0:
                 continue
             
             # Use mode for categorical imputation
             mode_value = self.df[col].mode()
             if len(mode_value) > 0:
-                mode_val = mode_value[0]
-                print(f"Imputing {col}: {missing_count} missing → '{mode_val}' (mode)")
-                self.df[col].fillna(mode_val, inplace=True)
+                mode_val = fitted_value(self.saved_stats, self.fitted_stats, 'fill_values', col,
+                                        lambda: mode_value[0])
+                self.df[col] = with_category(self.df[col], mode_val)
+                log.info(f"Imputing {col}: {missing_count} missing → '{mode_val}' (mode)")
+                self.df[col] = self.df[col].fillna(mode_val)
+                self._wrote(col)
                 
                 self.imputation_report['strategies_applied'].append(f"Mode imputation for {col}")
                 self.imputation_report['rows_affected'][col] = missing_count
                 self.imputation_report['columns_processed'].append(col)
     
+    @instrumented_step
     def impute_categorical_high_missing(self):
         """Advanced imputation for categorical columns with higher missing rates."""
-        print("\n=== ADVANCED CATEGORICAL IMPUTATION ===")
+        log.info("\n=== ADVANCED CATEGORICAL IMPUTATION ===")
         
         for col in self.categorical_high_missing:
             if col not in self.df.columns:
                 continue
                 
-            missing_count = self.df[col].isnull().sum()
+            missing_count = self.nulls().count(col)
             if missing_count == 0:
                 continue
             
             # For medical data, create meaningful "Unknown" categories
-            if col == 'Insurance Provider':
-                impute_value = 'Self-Pay'  # Common in medical data
-                print(f"Imputing {col}: {missing_count} missing → '{impute_value}' (domain-specific)")
-            elif col == 'Medication':
-                impute_value = 'No Medication'  # Medically meaningful
-                print(f"Imputing {col}: {missing_count} missing → '{impute_value}' (domain-specific)")
+            if col in DOMAIN_FILLS:
+                # Self-pay is common in medical data; no medication is medically meaningful
+                impute_value = DOMAIN_FILLS[col]
+                log.info(f"Imputing {col}: {missing_count} missing → '{impute_value}' (domain-specific)")
             elif col == 'Admission Type':
                 # Use most common admission type
-                mode_val = self.df[col].mode()[0] if len(self.df[col].mode()) > 0 else 'Emergency'
+                mode_val = fitted_value(self.saved_stats, self.fitted_stats, 'fill_values', col,
+                                        lambda: self.df[col].mode()[0] if len(self.df[col].mode()) > 0 else 'Emergency')
                 impute_value = mode_val
-                print(f"Imputing {col}: {missing_count} missing → '{impute_value}' (mode)")
+                log.info(f"Imputing {col}: {missing_count} missing → '{impute_value}' (mode)")
             else:
                 impute_value = 'Unknown'
-                print(f"Imputing {col}: {missing_count} missing → '{impute_value}' (generic)")
+                log.info(f"Imputing {col}: {missing_count} missing → '{impute_value}' (generic)")
             
-            self.df[col].fillna(impute_value, inplace=True)
+            # Categorical columns need the new value registered as a category first
+            self.df[col] = with_category(self.df[col], impute_value).fillna(impute_value)
+            self._wrote(col)
             
             self.imputation_report['strategies_applied'].append(f"Domain-specific imputation for {col}")
             self.imputation_report['rows_affected'][col] = missing_count
             self.imputation_report['columns_processed'].append(col)
     
+    @instrumented_step
     def impute_numerical_data(self):
         """Impute numerical columns using statistical methods."""
-        print("\n=== NUMERICAL DATA IMPUTATION ===")
+        log.info("\n=== NUMERICAL DATA IMPUTATION ===")
         
         for col in self.numerical_missing:
             if col not in self.df.columns:
                 continue
                 
-            missing_count = self.df[col].isnull().sum()
+            missing_count = self.nulls().count(col)
             if missing_count == 0:
                 continue
             
+            # Compact dtypes (float32, uint16) cannot hold a mean/median fill
+            # exactly, so impute on a float64 copy of the column
+            self.df[col] = self.df[col].astype('float64')
+            strategy = f"Statistical imputation for {col}"
+            
+            if self.numeric_imputation == 'knn':
+                self.df[col], details = knn_impute(self.knn_features(col), self.df[col], self.knn_k,
+                                                   self.knn_distance, self.workers)
+                log.info(f"Imputing {col}: {missing_count} missing → mean of the {details['k']} nearest rows "
+                         f"({self.knn_distance}, {details['seconds']:.2f}s)")
+                strategy = f"KNN imputation for {col} (k={details['k']}, {self.knn_distance})"
             # For billing amounts, use median (robust to outliers)
-            if 'billing' in col.lower() or 'amount' in col.lower():
-                median_val = self.df[col].median()
-                print(f"Imputing {col}: {missing_count} missing → {median_val:.2f} (median)")
-                self.df[col].fillna(median_val, inplace=True)
+            elif numeric_fill_statistic(col) == 'median':
+                median_val = fitted_value(self.saved_stats, self.fitted_stats, 'fill_values', col,
+                                          lambda: self.df[col].median())
+                log.info(f"Imputing {col}: {missing_count} missing → {median_val:.2f} (median)")
+                self.df[col] = self.df[col].fillna(median_val)
             else:
                 # Use mean for other numerical columns
-                mean_val = self.df[col].mean()
-                print(f"Imputing {col}: {missing_count} missing → {mean_val:.2f} (mean)")
-                self.df[col].fillna(mean_val, inplace=True)
+                mean_val = fitted_value(self.saved_stats, self.fitted_stats, 'fill_values', col,
+                                        lambda: self.df[col].mean())
+                log.info(f"Imputing {col}: {missing_count} missing → {mean_val:.2f} (mean)")
+                self.df[col] = self.df[col].fillna(mean_val)
+            self._wrote(col)
             
-            self.imputation_report['strategies_applied'].append(f"Statistical imputation for {col}")
+            self.imputation_report['strategies_applied'].append(strategy)
             self.imputation_report['rows_affected'][col] = missing_count
             self.imputation_report['columns_processed'].append(col)
     
+    def knn_features(self, target):
+        """Features to find the nearest rows on when imputing `target`.
+        
+        Length_of_Stay and Age_Group are derived here as generate_ml_ready_features
+        does, from the current (not yet imputed) dates and ages.
+        """
+        derived = {}
+        if 'Date of Admission' in self.df.columns and 'Discharge Date' in self.df.columns:
+            derived['Length_of_Stay'] = lambda: (self.df['Discharge Date'] - self.df['Date of Admission']).dt.days
+        if 'Age' in self.df.columns:
+            derived['Age_Group'] = lambda: pd.cut(self.df['Age'], bins=AGE_GROUP_BINS, labels=AGE_GROUP_LABELS)
+        
+        features = {}
+        for col in KNN_FEATURES:
+            if col == target or DERIVED_FROM.get(col) == target:
+                continue
+            if col in self.df.columns:
+                features[col] = self.df[col]
+            elif col in derived:
+                features[col] = derived[col]()
+        return pd.DataFrame(features, index=self.df.index)
+    
+    @instrumented_step
     def impute_date_data(self):
         """Impute date columns using forward/backward fill."""
-        print("\n=== DATE DATA IMPUTATION ===")
+        log.info("\n=== DATE DATA IMPUTATION ===")
+        
+        # In incremental runs, leading gaps continue from the last date of the previous rows
+        last_dates = (self.saved_stats or {}).get('last_dates', {})
         
         for col in self.date_missing:
             if col not in self.df.columns:
                 continue
                 
-            missing_count = self.df[col].isnull().sum()
+            missing_count = self.nulls().count(col)
             if missing_count == 0:
                 continue
             
             # Sort by a related column first for better imputation
             if 'admission' in col.lower():
                 # For admission dates, use forward fill then backward fill
-                print(f"Imputing {col}: {missing_count} missing using forward/backward fill")
-                self.df[col] = self.df[col].fillna(method='ffill').fillna(method='bfill')
+                log.info(f"Imputing {col}: {missing_count} missing using forward/backward fill")
+                self.df[col] = self.df[col].fillna(method='ffill')
+                if last_dates.get(col):
+                    self.df[col] = self.df[col].fillna(pd.Timestamp(last_dates[col]))
+                self.df[col] = self.df[col].fillna(method='bfill')
             else:
                 # For other dates, use similar strategy
-                print(f"Imputing {col}: {missing_count} missing using forward/backward fill")
-                self.df[col] = self.df[col].fillna(method='ffill').fillna(method='bfill')
+                log.info(f"Imputing {col}: {missing_count} missing using forward/backward fill")
+                self.df[col] = self.df[col].fillna(method='ffill')
+                if last_dates.get(col):
+                    self.df[col] = self.df[col].fillna(pd.Timestamp(last_dates[col]))
+                self.df[col] = self.df[col].fillna(method='bfill')
+            self._wrote(col)
             
             self.imputation_report['strategies_applied'].append(f"Forward/backward fill for {col}")
             self.imputation_report['rows_affected'][col] = missing_count
             self.imputation_report['columns_processed'].append(col)
+        
+        # The next incremental run forward-fills from here
+        for col in ['Date of Admission', 'Discharge Date']:
+            if col in self.df.columns and self.df[col].notna().any():
+                self.fitted_stats.setdefault('last_dates', {})[col] = self.df[col].dropna().iloc[-1]
     
+    @instrumented_step
     def handle_gender_missing(self):
         """Special handling for Gender missing values using ML approach."""
-        print("\n=== GENDER IMPUTATION (ML APPROACH) ===")
+        log.info("\n=== GENDER IMPUTATION (ML APPROACH) ===")
         
         if 'Gender' not in self.df.columns:
             return
             
-        missing_count = self.df['Gender'].isnull().sum()
+        missing_count = self.nulls().count('Gender')
         if missing_count == 0:
             return
         
-        print(f"Gender missing values: {missing_count}")
+        log.info(f"Gender missing values: {missing_count}")
         
         # In ML, we often predict missing categorical values using other features
         # For simplicity, we'll use the mode, but mention the advanced approach
         gender_mode = self.df['Gender'].mode()
         if len(gender_mode) > 0:
-            mode_val = gender_mode[0]
-            print(f"Using mode imputation: '{mode_val}'")
-            print("Note: In production, consider using classification models to predict missing gender")
+            mode_val = fitted_value(self.saved_stats, self.fitted_stats, 'fill_values', 'Gender',
+                                    lambda: gender_mode[0])
+            self.df['Gender'] = with_category(self.df['Gender'], mode_val)
+            log.info(f"Using mode imputation: '{mode_val}'")
+            log.info("Note: In production, consider using classification models to predict missing gender")
             
-            self.df['Gender'].fillna(mode_val, inplace=True)
+            self.df['Gender'] = self.df['Gender'].fillna(mode_val)
+            self._wrote('Gender')
             
             self.imputation_report['strategies_applied'].append("Mode imputation for Gender (recommend ML prediction in production)")
             self.imputation_report['rows_affected']['Gender'] = missing_count
             self.imputation_report['columns_processed'].append('Gender')
     
+    @instrumented_step
     def validate_imputation(self):
         """Validate that imputation was successful."""
-        print("\n=== IMPUTATION VALIDATION ===")
+        log.info("\n=== IMPUTATION VALIDATION ===")
         
-        remaining_missing = self.df.isnull().sum()
+        remaining_missing = self.nulls().counts()
         remaining_missing = remaining_missing[remaining_missing > 0]
         
         if len(remaining_missing) == 0:
-            print("✅ SUCCESS: No missing values remaining!")
+            log.info("✅ SUCCESS: No missing values remaining!")
         else:
-            print("⚠️  Remaining missing values:")
+            log.warning("⚠️  Remaining missing values:")
             for col, count in remaining_missing.items():
-                print(f"   {col}: {count}")
+                log.warning(f"   {col}: {count}")
         
         return len(remaining_missing) == 0
     
+    @instrumented_step
     def fix_date_logic_errors(self):
         """Fix logical errors in date columns (discharge before admission)."""
-        print("\n=== FIXING DATE LOGIC ERRORS ===")
+        log.info("\n=== FIXING DATE LOGIC ERRORS ===")
         
         if 'Date of Admission' in self.df.columns and 'Discharge Date' in self.df.columns:
             # Calculate initial length of stay
@@ -277,172 +546,664 @@ class MLExpertMissingValueHandler:
             negative_count = negative_los.sum()
             
             if negative_count > 0:
-                print(f"Found {negative_count} records with discharge date before admission date")
-                print("Fixing by swapping admission and discharge dates...")
+                log.info(f"Found {negative_count} records with discharge date before admission date")
+                log.info("Fixing by swapping admission and discharge dates...")
                 
-                # Swap the dates for problematic records
-                admission_temp = self.df.loc[negative_los, 'Date of Admission'].copy()
-                self.df.loc[negative_los, 'Date of Admission'] = self.df.loc[negative_los, 'Discharge Date']
-                self.df.loc[negative_los, 'Discharge Date'] = admission_temp
+                # Swap the dates for problematic records (whole-column writes, no row subsets)
+                admission, discharge = self.df['Date of Admission'], self.df['Discharge Date']
+                self.df['Date of Admission'] = admission.mask(negative_los, discharge)
+                self.df['Discharge Date'] = discharge.mask(negative_los, admission)
+                self._wrote('Date of Admission', 'Discharge Date')
                 
                 self.imputation_report['strategies_applied'].append(f"Fixed {negative_count} date logic errors by swapping admission/discharge dates")
                 self.imputation_report['rows_affected']['Date_Logic_Fix'] = negative_count
                 
-                # Verify the fix
-                los_fixed = (self.df['Discharge Date'] - self.df['Date of Admission']).dt.days
-                remaining_negative = (los_fixed < 0).sum()
-                
-                if remaining_negative == 0:
-                    print(f"✅ Successfully fixed all date logic errors")
-                else:
-                    print(f"⚠️  {remaining_negative} records still have negative length of stay")
+                # Verify the fix (generate_ml_ready_features checks again, so only when reported)
+                if log.isEnabledFor(logging.INFO):
+                    los_fixed = (self.df['Discharge Date'] - self.df['Date of Admission']).dt.days
+                    remaining_negative = (los_fixed < 0).sum()
+                    
+                    if remaining_negative == 0:
+                        log.info(f"✅ Successfully fixed all date logic errors")
+                    else:
+                        log.warning(f"⚠️  {remaining_negative} records still have negative length of stay")
             else:
-                print("No date logic errors found")
+                log.info("No date logic errors found")
     
+    @instrumented_step
     def generate_ml_ready_features(self):
         """Generate additional ML-ready features."""
-        print("\n=== GENERATING ML-READY FEATURES ===")
+        log.info("\n=== GENERATING ML-READY FEATURES ===")
         
         # Feature 1: Length of Stay (after fixing date logic errors)
         if 'Date of Admission' in self.df.columns and 'Discharge Date' in self.df.columns:
             self.df['Length_of_Stay'] = (self.df['Discharge Date'] - self.df['Date of Admission']).dt.days
+            self._wrote('Length_of_Stay')
             
             # Validate length of stay
-            los_stats = self.df['Length_of_Stay'].describe()
-            print(f"Length of Stay statistics:")
-            print(f"  Min: {los_stats['min']} days")
-            print(f"  Max: {los_stats['max']} days") 
-            print(f"  Mean: {los_stats['mean']:.1f} days")
-            print(f"  Median: {los_stats['50%']} days")
+            def los_summary():
+                los_stats = self.df['Length_of_Stay'].describe()
+                return (f"  Min: {los_stats['min']} days\n"
+                        f"  Max: {los_stats['max']} days\n"
+                        f"  Mean: {los_stats['mean']:.1f} days\n"
+                        f"  Median: {los_stats['50%']} days")
+            log.debug("Length of Stay statistics:\n%s", lazy(los_summary))
             
             # Check for any remaining issues
             negative_los = (self.df['Length_of_Stay'] < 0).sum()
             if negative_los > 0:
-                print(f"⚠️  Warning: {negative_los} records still have negative length of stay")
+                log.warning(f"⚠️  Warning: {negative_los} records still have negative length of stay")
             else:
-                print("✅ All length of stay values are non-negative")
+                log.info("✅ All length of stay values are non-negative")
             
-            print("✅ Created 'Length_of_Stay' feature")
+            log.info("✅ Created 'Length_of_Stay' feature")
             self.imputation_report['strategies_applied'].append("Created Length_of_Stay feature with validation")
         
         # Feature 2: Age Groups
         if 'Age' in self.df.columns:
-            self.df['Age_Group'] = pd.cut(self.df['Age'], 
-                                        bins=[0, 18, 35, 50, 65, 100], 
-                                        labels=['Child', 'Young_Adult', 'Adult', 'Middle_Age', 'Senior'])
-            print("✅ Created 'Age_Group' feature")
+            self.df['Age_Group'] = pd.cut(self.df['Age'], bins=AGE_GROUP_BINS, labels=AGE_GROUP_LABELS)
+            self._wrote('Age_Group')
+            log.info("✅ Created 'Age_Group' feature")
             self.imputation_report['strategies_applied'].append("Created Age_Group categorical feature")
         
         # Feature 3: Billing Category
         if 'Billing Amount' in self.df.columns:
-            billing_quantiles = self.df['Billing Amount'].quantile([0.25, 0.5, 0.75])
+            # Incremental runs bin new rows with the quantiles of the last full run
+            def billing_quartiles():
+                sketch = QuantileSketch.from_values(self.df['Billing Amount'], self.quantile_error,
+                                                    self.exact_quantile_limit)
+                return sketch.quantiles([0.25, 0.5, 0.75]).tolist()
+            
+            billing_quantiles = fitted_value(self.saved_stats, self.fitted_stats, 'bins', 'Billing Amount',
+                                             billing_quartiles)
             self.df['Billing_Category'] = pd.cut(self.df['Billing Amount'],
-                                               bins=[0, billing_quantiles[0.25], billing_quantiles[0.5], 
-                                                    billing_quantiles[0.75], float('inf')],
-                                               labels=['Low', 'Medium', 'High', 'Very_High'])
-            print("✅ Created 'Billing_Category' feature")
+                                               bins=billing_category_edges(billing_quantiles),
+                                               labels=BILLING_CATEGORY_LABELS)
+            self._wrote('Billing_Category')
+            log.info("✅ Created 'Billing_Category' feature")
             self.imputation_report['strategies_applied'].append("Created Billing_Category feature")
     
+    @instrumented_step
     def generate_imputation_report(self):
         """Generate comprehensive imputation report."""
-        print("\n" + "="*60)
-        print("ML-EXPERT MISSING VALUE IMPUTATION REPORT")
-        print("="*60)
+        log.info("\n" + "="*60)
+        log.info("ML-EXPERT MISSING VALUE IMPUTATION REPORT")
+        log.info("="*60)
         
-        print(f"Final dataset shape: {self.df.shape}")
-        print(f"Columns processed: {len(self.imputation_report['columns_processed'])}")
+        log.info(f"Final dataset shape: {self.df.shape}")
+        log.info(f"Columns processed: {len(self.imputation_report['columns_processed'])}")
         
-        print("\nStrategies Applied:")
+        log.info("\nStrategies Applied:")
         for i, strategy in enumerate(self.imputation_report['strategies_applied'], 1):
-            print(f"  {i}. {strategy}")
+            log.info(f"  {i}. {strategy}")
         
-        print("\nRows Affected by Column:")
+        log.info("\nRows Affected by Column:")
         for col, count in self.imputation_report['rows_affected'].items():
-            print(f"  {col}: {count} rows imputed")
-        
-        print(f"\nFinal Missing Values Check:")
-        final_missing = self.df.isnull().sum().sum()
-        print(f"Total missing values: {final_missing}")
+            log.info(f"  {col}: {count} rows imputed")
         
-        if final_missing == 0:
-            print("🎉 DATASET IS NOW 100% COMPLETE AND ML-READY!")
+        # validate_imputation has already counted the gaps; the recount is only shown in full
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"\nFinal Missing Values Check:")
+            final_missing = self.nulls().total()
+            log.debug(f"Total missing values: {final_missing}")
+            
+            if final_missing == 0:
+                log.debug("🎉 DATASET IS NOW 100% COMPLETE AND ML-READY!")
         
-        print(f"\nData Types:")
-        print(self.df.dtypes)
+        log.debug("\nData Types:\n%s", lazy(lambda: self.df.dtypes))
     
-    def save_ml_ready_dataset(self, output_file):
-        """Save the ML-ready dataset."""
-        print(f"\nSaving ML-ready dataset to {output_file}...")
-        self.df.to_csv(output_file, index=False)
-        print("✅ ML-ready dataset saved successfully!")
+    @instrumented_step
+    def save_ml_ready_dataset(self, output_file, fmt=None, compression=None, partition_by=None):
+        """Save the ML-ready dataset as CSV, Parquet or Feather."""
+        fmt = fmt or infer_format(output_file)
+        log.info(f"\nSaving ML-ready dataset to {output_file} ({fmt})...")
+        if fmt == 'csv':
+            self.df.to_csv(output_file, index=False)
+        else:
+            write_columnar(self.df, output_file, fmt, compression, partition_by)
+        log.info("✅ ML-ready dataset saved successfully!")
         
         # Also save a summary
-        summary_file = output_file.replace('.csv', '_summary.txt')
+        summary_file = os.path.splitext(output_file)[0] + '_summary.txt'
         with open(summary_file, 'w') as f:
             f.write("ML-READY DATASET SUMMARY\n")
             f.write("="*50 + "\n\n")
             f.write(f"Shape: {self.df.shape}\n")
-            f.write(f"Missing values: {self.df.isnull().sum().sum()}\n")
+            f.write(f"Missing values: {self.nulls().total()}\n")
             f.write(f"Columns: {list(self.df.columns)}\n\n")
             f.write("Imputation Strategies Applied:\n")
             for strategy in self.imputation_report['strategies_applied']:
                 f.write(f"- {strategy}\n")
         
-        print(f"✅ Summary saved to {summary_file}")
+        log.info(f"✅ Summary saved to {summary_file}")
+    
+    def save_step_metrics(self, output_file):
+        """Add the step metrics to the report and write them next to the output."""
+        if self.step_metrics is None:
+            return None
+        self.imputation_report['step_metrics'] = self.step_metrics.as_list()
+        log.info("\n=== STEP METRICS ===")
+        self.step_metrics.print_table()
+        path = metrics_path_for(output_file)
+        self.step_metrics.save(path, pipeline='imputation', input_file=self.input_file, output_file=output_file,
+                               peak_memory=self.imputation_report.get('peak_memory'))
+        log.info(f"✅ Step metrics saved to {path}")
+        return path
     
-    def run_ml_imputation_pipeline(self, output_file):
+    def run_ml_imputation_pipeline(self, output_file, fmt=None, compression=None, partition_by=None):
         """Run the complete ML-expert imputation pipeline."""
-        print("Starting ML-Expert Missing Value Imputation Pipeline")
-        print("="*60)
+        log.info("Starting ML-Expert Missing Value Imputation Pipeline")
+        log.info("="*60)
         
-        # Load and analyze
-        self.load_data()
-        self.analyze_missing_patterns()
+        baseline_rss = rss_mb() if self.memory_bounded else None
+        with copy_on_write(self.memory_bounded):
+            success = self.restore_cached_imputation()
+            if success is None:
+                # Load and analyze
+                self.load_data()
+                self.analyze_missing_patterns()
+                
+                # Apply imputation strategies
+                self.drop_pii_columns()
+                if self.mice:
+                    self.impute_chained_equations()
+                self.impute_categorical_low_missing()
+                self.impute_categorical_high_missing()
+                self.impute_numerical_data()
+                self.impute_date_data()
+                self.handle_gender_missing()
+                
+                # Fix date logic errors BEFORE creating features
+                self.fix_date_logic_errors()
+                
+                # Validate
+                success = self.validate_imputation()
+                
+                # Generate ML features (after date fixes)
+                self.generate_ml_ready_features()
+                self.cache_imputation_result(success)
+            
+            # Report and save
+            self.generate_imputation_report()
+            
+            if output_file:
+                self.save_ml_ready_dataset(output_file, fmt, compression, partition_by)
+            
+        if self.memory_bounded:
+            self.report_peak_memory(baseline_rss)
         
-        # Apply imputation strategies
-        self.drop_pii_columns()
-        self.impute_categorical_low_missing()
-        self.impute_categorical_high_missing()
-        self.impute_numerical_data()
-        self.impute_date_data()
-        self.handle_gender_missing()
+        return self.df, success
+    
+    def imputation_cache_key(self):
+        """Step cache key of the imputation result, or None without a cache."""
+        if self.cache is None:
+            return None
+        return self.cache.key('imputation', self.cache.digest(self.input_file), self.quantile_error,
+                              self.exact_quantile_limit, self.numeric_config(), self.mice_config(),
+                              code_version(IMPUTATION_CODE))
+    
+    def numeric_config(self):
+        """Settings of the numerical fill that change the result."""
+        if self.numeric_imputation == 'knn':
+            return ['knn', self.knn_k, self.knn_distance]
+        return ['statistical']
+    
+    def mice_config(self):
+        """Settings of chained-equation imputation that change the result."""
+        if not self.mice:
+            return None
+        models = file_digest(self.mice_models) if self.mice_models and os.path.exists(self.mice_models) else None
+        return ['mice', self.mice_iterations, models]
+    
+    def restore_cached_imputation(self):
+        """Reuse a cached imputation result of the same input and code; its validation result, or None on a miss."""
+        key = self.imputation_cache_key()
+        cached = self.cache.get(key) if key else None
+        if cached is None:
+            return None
+        self.df, details = cached
+        self.imputation_report.update(details['report'])
+        self.fitted_stats = details['fitted_stats']
+        log.info("Reusing the cached imputation result")
+        return details['success']
+    
+    def cache_imputation_result(self, success):
+        key = self.imputation_cache_key()
+        if key:
+            self.cache.put(key, 'imputation', self.input_file, self.df,
+                           {'report': self.imputation_report, 'fitted_stats': self.fitted_stats,
+                            'success': success})
+    
+    def checkpoint_steps(self, output_file=None, fmt=None, compression=None, partition_by=None):
+        """The pipeline as (step, function, changes the frame) for checkpointed runs."""
+        steps = [
+            ('load_data', self.load_data, True),
+            ('analyze_missing_patterns', self.analyze_missing_patterns, False),
+            ('drop_pii_columns', self.drop_pii_columns, True),
+        ]
+        if self.mice:
+            steps.append(('impute_chained_equations', self.impute_chained_equations, True))
+        steps += [
+            ('impute_categorical_low_missing', self.impute_categorical_low_missing, True),
+            ('impute_categorical_high_missing', self.impute_categorical_high_missing, True),
+            ('impute_numerical_data', self.impute_numerical_data, True),
+            ('impute_date_data', self.impute_date_data, True),
+            ('handle_gender_missing', self.handle_gender_missing, True),
+            ('fix_date_logic_errors', self.fix_date_logic_errors, True),
+            ('validate_imputation', self.run_validation_step, False),
+            ('generate_ml_ready_features', self.generate_ml_ready_features, True),
+            ('generate_imputation_report', self.generate_imputation_report, False),
+        ]
+        if output_file:
+            steps.append(('save_ml_ready_dataset',
+                          lambda: self.save_ml_ready_dataset(output_file, fmt, compression, partition_by), False))
+        return steps
+    
+    def run_validation_step(self):
+        """validate_imputation, keeping its result for the checkpoint."""
+        self.validation_passed = self.validate_imputation()
+    
+    def checkpoint_state(self):
+        # The strategy lists only exist once the missing values have been analyzed
+        return {name: getattr(self, name, None) for name in CHECKPOINT_STATE}
+    
+    def restore_checkpoint(self, df, state):
+        self.df = df
+        self.null_index = None
+        for name, value in state.items():
+            setattr(self, name, value)
+    
+    def run_checkpointed_pipeline(self, checkpoint_dir, output_file=None, fmt=None, compression=None,
+                                  partition_by=None, resume=False, steps=None):
+        """Run the pipeline with a checkpoint after every step (see checkpoints.py).
+        
+        With `resume`, the run continues after the last checkpoint in
+        `checkpoint_dir`; `steps` runs only the named steps on the checkpoint
+        before the first of them. If they give their checkpointed results, the
+        later checkpoints are kept and the output is written from them;
+        otherwise `resume` continues after the last of them. Returns the
+        steps that ran.
+        """
+        log.info("Starting ML-Expert Missing Value Imputation Pipeline (checkpointed)")
+        log.info("="*60)
+        
+        store = CheckpointStore(checkpoint_dir, 'imputation', self.input_file,
+                                [self.quantile_error, self.exact_quantile_limit, self.numeric_config(),
+                                 self.mice_config()],
+                                code_version(IMPUTATION_CODE))
+        baseline_rss = rss_mb() if self.memory_bounded else None
+        with copy_on_write(self.memory_bounded):
+            ran = run_checkpointed(self, self.checkpoint_steps(output_file, fmt, compression, partition_by),
+                                   store, resume, steps, outputs=['save_ml_ready_dataset'])
+        if self.memory_bounded and self.step_metrics.max_rss_mb is not None:
+            self.report_peak_memory(baseline_rss)
+        
+        return ran
+    
+    def report_peak_memory(self, baseline_rss):
+        """Compare the highest per-step RSS with the RSS before loading and the loaded dataset."""
+        summary = peak_summary(baseline_rss, self.imputation_report['memory_mb']['schema'],
+                               self.step_metrics.max_rss_mb)
+        self.imputation_report['peak_memory'] = summary
+        log.info("\n" + describe_peak(summary))
+    
+    def lazy_plan(self, backend):
+        """The imputation pipeline as a lazy plan (see lazy_plan.py) and the scanned input.
+        
+        Which fill a column gets depends on its gaps, so the input is scanned
+        and analyzed before the fills are planned. The PII drop is planned
+        first: Name is never read, so it is pruned from that scan.
+        """
+        plan = LazyPlan(self.input_file)
+        pii_columns = [col for col in PII_COLUMNS if col in plan.columns]
+        if pii_columns:
+            plan.add('drop', columns=pii_columns)
+            self.imputation_report['strategies_applied'].append(f"Dropped PII columns: {pii_columns}")
+        relation = plan.optimize().scan(backend)
+        
+        kinds = backend.column_kinds(relation)
+        missing = backend.null_counts(relation)
+        total_rows = backend.count(relation)
+        self.assign_strategies(missing, total_rows, kinds)
+        
+        def fill(col, value):
+            self.imputation_report['rows_affected'][col] = missing[col]
+            self.imputation_report['columns_processed'].append(col)
+            plan.add('fill', col, value=value)
+        
+        for col in self.categorical_low_missing:
+            # A column without any value has no mode
+            if missing[col] < total_rows:
+                fill(col, Statistic('mode'))
+                self.imputation_report['strategies_applied'].append(f"Mode imputation for {col}")
+        
+        for col in self.categorical_high_missing:
+            if col in DOMAIN_FILLS:
+                impute_value = DOMAIN_FILLS[col]
+            elif col == 'Admission Type':
+                impute_value = Statistic('mode', default='Emergency')
+            else:
+                impute_value = 'Unknown'
+            fill(col, impute_value)
+            self.imputation_report['strategies_applied'].append(f"Domain-specific imputation for {col}")
+        
+        for col in self.numerical_missing:
+            # Median for billing amounts (robust to outliers), mean otherwise
+            stat = numeric_fill_statistic(col)
+            fill(col, Statistic(stat))
+            self.imputation_report['strategies_applied'].append(f"Statistical imputation for {col}")
         
-        # Fix date logic errors BEFORE creating features
-        self.fix_date_logic_errors()
+        for col in self.date_missing:
+            plan.add('fill_forward_backward', col)
+            self.imputation_report['rows_affected'][col] = missing[col]
+            self.imputation_report['strategies_applied'].append(f"Forward/backward fill for {col}")
+        
+        # Gender only has gaps left here if it got no categorical strategy
+        if missing.get('Gender') and 'Gender' not in self.categorical_low_missing + self.categorical_high_missing:
+            fill('Gender', Statistic('mode'))
+            self.imputation_report['strategies_applied'].append("Mode imputation for Gender")
+        
+        if 'Date of Admission' in kinds and 'Discharge Date' in kinds:
+            plan.add('swap_if_before', 'Date of Admission', end='Discharge Date')
+            plan.add('days_between', 'Length_of_Stay', start='Date of Admission', end='Discharge Date')
+        if 'Age' in kinds:
+            plan.add('bins', 'Age_Group', source='Age', edges=AGE_GROUP_BINS, labels=AGE_GROUP_LABELS)
+        if 'Billing Amount' in kinds:
+            plan.add('bins', 'Billing_Category', source='Billing Amount',
+                     edges=Statistic('quantiles', 'Billing Amount', qs=[0.25, 0.5, 0.75],
+                                     then=billing_category_edges),
+                     labels=BILLING_CATEGORY_LABELS)
+        return plan, relation
+    
+    def run_backend_pipeline(self, backend_name, output_file=None, fmt=None, compression=None):
+        """Run the imputation pipeline as an optimized lazy plan on pandas, Polars or DuckDB.
         
-        # Validate
-        success = self.validate_imputation()
+        Each step becomes a backend-neutral operation (see execution_backends.py);
+        the modes, fills and Billing_Category bins are computed on the backend
+        just before the step that uses them. Returns the backend and its
+        (lazy) result and whether every gap was filled.
+        """
+        log.info(f"Starting ML-Expert Missing Value Imputation Pipeline ({backend_name} backend)")
+        log.info("="*60)
+        started = time.perf_counter()
         
-        # Generate ML features (after date fixes)
-        self.generate_ml_ready_features()
+        backend = make_backend(backend_name)
+        plan, relation = self.lazy_plan(backend)
+        plan = plan.optimize()
+        relation = plan.collect(backend, relation)
         
-        # Report and save
-        self.generate_imputation_report()
+        remaining_missing = {col: count for col, count in backend.null_counts(relation).items()
+                             if count > 0 and col not in FEATURE_COLUMNS}
+        if remaining_missing:
+            log.warning(f"⚠️  Remaining missing values: {remaining_missing}")
         
         if output_file:
-            self.save_ml_ready_dataset(output_file)
+            fmt = fmt or infer_format(output_file)
+            log.info(f"\nSaving ML-ready dataset to {output_file} ({fmt})...")
+            backend.write(relation, output_file, fmt, compression)
+            log.info("✅ ML-ready dataset saved successfully!")
+        
+        seconds = time.perf_counter() - started
+        self.imputation_report['backend'] = {'name': backend_name, 'seconds': seconds,
+                                             'optimizations': plan.notes}
+        log.info(f"Ran {len(plan.operations)} operations on {backend_name} in {seconds:.2f}s")
+        return backend, relation, not remaining_missing
+    
+    def check_backend_equivalence(self, backends=None):
+        """Run the pipeline on each installed backend and compare its result with pandas'.
+        
+        The lazy plan on pandas is listed as 'lazy'. Results go into
+        imputation_report['backend_equivalence'].
+        """
+        log.info("\n" + "="*60)
+        log.info("BACKEND EQUIVALENCE CHECK")
+        log.info("="*60)
+        
+        def fresh_handler():
+            return MLExpertMissingValueHandler(self.input_file, self.quantile_error, self.exact_quantile_limit)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            expected, _ = fresh_handler().run_ml_imputation_pipeline(None)
+            results = {'pandas': {'rows': len(expected), 'seconds': time.perf_counter() - started,
+                                  'differences': {}}}
+            for name in backends or available_backends():
+                started = time.perf_counter()
+                backend, relation, _ = fresh_handler().run_backend_pipeline(name)
+                actual = backend.to_pandas(relation)
+                results['lazy' if name == 'pandas' else name] = {'rows': len(actual), 'seconds': time.perf_counter() - started,
+                                 'differences': compare_frames(expected, actual)}
+        
+        print_equivalence_table(results)
+        self.imputation_report['backend_equivalence'] = results
+        return results
+    
+    def run_incremental_pipeline(self, output_file, state_file=None, refit_every=0, full_refit=False):
+        """Impute only the rows added to the input since the last run and append them.
+        
+        New rows are imputed with the modes, fills and Billing_Category bins
+        saved by the last full run; a full refit reruns the whole pipeline and
+        saves new statistics (see incremental_state.py).
+        """
+        state_file = state_file or state_path_for(output_file)
+        state = load_state(state_file)
+        
+        reason = refit_reason(state, self.input_file, output_file, refit_every, full_refit)
+        if reason:
+            log.info(f"Full refit: {reason}")
+            watermark = input_watermark(self.input_file)
+            _, success = self.run_ml_imputation_pipeline(output_file)
+            watermark['rows'] = len(self.df)
+            watermark['max_admission_date'] = max_admission_date(self.df)
+            state = {
+                'watermark': watermark,
+                'statistics': self.fitted_stats,
+                'output_columns': list(self.df.columns),
+                'output_dtype_kinds': output_dtype_kinds(self.df),
+                'runs_since_refit': 0,
+            }
+        else:
+            log.info("Starting ML-Expert Missing Value Imputation Pipeline (incremental)")
+            log.info("="*60)
+            self.saved_stats = state['statistics']
+            self.df, load_info, watermark = read_new_rows(self.input_file, state['watermark'])
+            new_rows = 0 if self.df is None else len(self.df)
+            log.info(f"Rows since the watermark ({state['watermark']['rows']} rows processed): {new_rows}")
+            
+            success = True
+            if new_rows > 0:
+                self.analyze_missing_patterns()
+                self.drop_pii_columns()
+                # New rows reuse the chained-equation models of the last full run
+                if self.mice or 'mice_models' in self.saved_stats:
+                    self.impute_chained_equations()
+                self.impute_categorical_low_missing()
+                self.impute_categorical_high_missing()
+                self.impute_numerical_data()
+                self.impute_date_data()
+                self.handle_gender_missing()
+                self.fix_date_logic_errors()
+                success = self.validate_imputation()
+                self.generate_ml_ready_features()
+                self.generate_imputation_report()
+                
+                appended = align_to_output(self.df, state['output_columns'], state['output_dtype_kinds'])
+                appended.to_csv(output_file, mode='a', index=False, header=False)
+                log.info(f"Appended {len(appended)} rows to {output_file}")
+            
+            # Keep the saved statistics, but carry the last dates forward for the next run
+            statistics = dict(state['statistics'])
+            statistics['last_dates'] = dict(statistics.get('last_dates', {}), **self.fitted_stats.get('last_dates', {}))
+            state = dict(state, watermark=watermark, statistics=statistics,
+                         runs_since_refit=state.get('runs_since_refit', 0) + 1)
+        
+        save_state(state_file, state)
+        log.info(f"Incremental state saved to {state_file}")
         
         return self.df, success
 
 def main():
     """Main function."""
-    input_file = "Hospital_dataset.csv"  # Start from original data
-    output_file = "Hospital_dataset_ML_ready.csv"
+    parser = argparse.ArgumentParser(description="ML-expert missing value imputation.")
+    parser.add_argument('--input', default="Hospital_dataset.csv",
+                        help="Input CSV, Parquet/Feather file or partitioned Parquet directory")
+    parser.add_argument('--output', default="Hospital_dataset_ML_ready.csv", help="ML-ready output")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv',
+                        help="Output format; columnar formats keep dates and categories typed")
+    parser.add_argument('--compression', default=None,
+                        help="Parquet/Feather compression codec (e.g. snappy, zstd, lz4)")
+    parser.add_argument('--partition-by', choices=list(PARTITION_SCHEMES), default=None,
+                        help="Partition Parquet output by admission year/month or Admission Type")
+    parser.add_argument('--quantile-error', type=float, default=DEFAULT_ERROR,
+                        help="Rank error of the quantile sketch used for the Billing_Category bins")
+    parser.add_argument('--exact-quantile-limit', type=int, default=EXACT_LIMIT,
+                        help="Columns with at most this many values get exact quantiles")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only impute rows added since the last run and append them to the output")
+    parser.add_argument('--state', default=None,
+                        help="Incremental state file (default: <output>_state.json)")
+    parser.add_argument('--refit-every', type=int, default=0,
+                        help="In incremental mode, refit on the whole input every N runs (0: never)")
+    parser.add_argument('--full-refit', action='store_true',
+                        help="In incremental mode, reprocess the whole input and refit the statistics")
+    parser.add_argument('--backend', choices=BACKEND_CHOICES, default='pandas',
+                        help="Execution backend; 'auto' picks pandas, Polars or DuckDB from the input size")
+    parser.add_argument('--check-backends', action='store_true',
+                        help="Also run every installed backend and compare its result with pandas'")
+    parser.add_argument('--lazy', action='store_true',
+                        help="Run pandas as an optimized lazy plan (Name is never read, steps are fused)")
+    parser.add_argument('--explain', action='store_true',
+                        help="Print the optimized lazy plan with estimated costs and exit")
+    parser.add_argument('--step-metrics', action='store_true',
+                        help="Record time, memory and rows changed per step in <output>_metrics.json")
+    parser.add_argument('--memory-bounded', action='store_true',
+                        help="Copy-on-Write run without full-frame copies; records peak RSS per step")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Step cache directory: reuse the parsed input and the imputation result across runs")
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MB,
+                        help="Size limit of the step cache; least recently used entries are evicted")
+    parser.add_argument('--numeric-imputation', choices=NUMERIC_IMPUTATIONS, default='statistical',
+                        help="Fill numerical gaps with the median/mean or with the mean of the nearest rows (KNN)")
+    parser.add_argument('--knn-k', type=int, default=DEFAULT_K, help="Neighbours averaged by KNN imputation")
+    parser.add_argument('--knn-distance', choices=list(DISTANCES), default='euclidean',
+                        help="Distance KNN imputation finds the nearest rows by")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes the KNN neighbour queries and the chained-equation models are spread over")
+    parser.add_argument('--mice', action='store_true',
+                        help="Impute " + ", ".join(MICE_COLUMNS) + " together by chained equations")
+    parser.add_argument('--mice-iterations', type=int, default=DEFAULT_MAX_ITERATIONS,
+                        help="Most rounds of chained-equation imputation")
+    parser.add_argument('--mice-models', default=None,
+                        help="Chained-equation models JSON: used without retraining if it exists, "
+                             "else written after fitting")
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help="Write a checkpoint after every step to this directory")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue after the last checkpoint in --checkpoint-dir")
+    parser.add_argument('--steps', default=None,
+                        help="Comma-separated steps to run on the checkpoint before the first of them, "
+                             "e.g. impute_numerical_data,impute_date_data")
+    parser.add_argument('--verbosity', choices=list(VERBOSITY_LEVELS), default='full',
+                        help="production: warnings only; summary: steps and counts; full: every diagnostic")
+    args = parser.parse_args()
+    configure_logging(args.verbosity)
+    
+    input_file = args.input  # Start from original data by default
+    output_file = path_for_format(args.output, args.format)
+    if args.incremental and (args.format != 'csv' or is_columnar_path(input_file)):
+        parser.error("--incremental reads and appends CSV; use a CSV input and --format csv")
+    
+    # Incremental runs and partitioned output only exist on pandas
+    pandas_only = args.incremental or args.partition_by
+    if pandas_only and args.backend not in ('pandas', 'auto'):
+        parser.error(f"--backend {args.backend} cannot be combined with --incremental or --partition-by")
+    if pandas_only and (args.lazy or args.explain):
+        parser.error("--lazy and --explain cannot be combined with --incremental or --partition-by")
+    try:
+        backend = 'pandas' if pandas_only else choose_backend(args.backend, input_file)
+    except ValueError as error:
+        parser.error(str(error))
+    if backend == 'duckdb' and args.format == 'feather':
+        parser.error("The DuckDB backend writes CSV or Parquet; use --format csv or parquet")
+    if args.step_metrics and (backend != 'pandas' or args.lazy):
+        parser.error("--step-metrics measures the eager pandas steps; use --backend pandas without --lazy")
+    if args.memory_bounded and (backend != 'pandas' or args.lazy or args.incremental):
+        parser.error("--memory-bounded runs the in-memory pandas pipeline; it cannot be combined with "
+                     "other backends, --lazy or --incremental")
+    if args.cache_dir and (backend != 'pandas' or args.lazy or args.incremental):
+        parser.error("--cache-dir caches the in-memory pandas pipeline; it cannot be combined with "
+                     "other backends, --lazy or --incremental")
+    if args.knn_k < 1:
+        parser.error("--knn-k must be at least 1")
+    if args.numeric_imputation == 'knn' and not knn_available():
+        parser.error("--numeric-imputation knn needs the 'scipy' package (pip install scipy)")
+    # Incremental runs fill new rows with the statistics of the last full run
+    if args.numeric_imputation == 'knn' and (backend != 'pandas' or args.lazy or args.incremental):
+        parser.error("--numeric-imputation knn runs on the in-memory pandas pipeline; it cannot be combined "
+                     "with other backends, --lazy or --incremental")
+    if args.mice_iterations < 1:
+        parser.error("--mice-iterations must be at least 1")
+    if args.mice_models and not args.mice:
+        parser.error("--mice-models needs --mice")
+    if args.mice and (backend != 'pandas' or args.lazy):
+        parser.error("--mice runs on the in-memory pandas pipeline; it cannot be combined "
+                     "with other backends or --lazy")
+    if (args.resume or args.steps) and not args.checkpoint_dir:
+        parser.error("--resume and --steps need --checkpoint-dir")
+    if args.checkpoint_dir and (backend != 'pandas' or args.lazy or args.incremental or args.cache_dir):
+        parser.error("--checkpoint-dir runs the in-memory pandas pipeline step by step; it cannot be combined "
+                     "with other backends, --lazy, --incremental or --cache-dir")
     
     # Initialize handler
-    handler = MLExpertMissingValueHandler(input_file)
+    handler = MLExpertMissingValueHandler(input_file, args.quantile_error, args.exact_quantile_limit,
+                                          step_metrics=args.step_metrics, memory_bounded=args.memory_bounded,
+                                          cache=StepCache(args.cache_dir, args.cache_max_mb) if args.cache_dir else None,
+                                          numeric_imputation=args.numeric_imputation, knn_k=args.knn_k,
+                                          knn_distance=args.knn_distance, workers=args.workers, mice=args.mice,
+                                          mice_iterations=args.mice_iterations, mice_models=args.mice_models)
+    
+    if args.explain:
+        with contextlib.redirect_stdout(io.StringIO()):
+            plan, _ = handler.lazy_plan(make_backend(backend))
+        log.info(plan.optimize().explain())
+        return
     
     # Run pipeline
-    ml_ready_data, success = handler.run_ml_imputation_pipeline(output_file)
+    if backend != 'pandas' or args.lazy:
+        _, _, success = handler.run_backend_pipeline(backend, output_file, args.format, args.compression)
+    elif args.checkpoint_dir:
+        try:
+            ran = handler.run_checkpointed_pipeline(args.checkpoint_dir, output_file, args.format, args.compression,
+                                                    args.partition_by, args.resume,
+                                                    args.steps.split(',') if args.steps else None)
+        except ValueError as error:
+            parser.error(str(error))
+        if 'save_ml_ready_dataset' not in ran:
+            log.info(f"\nRan {', '.join(ran) or 'no steps'}; {output_file} was not written")
+            handler.save_step_metrics(output_file)
+            return
+        success = handler.validation_passed
+    elif args.incremental:
+        ml_ready_data, success = handler.run_incremental_pipeline(output_file, args.state, args.refit_every,
+                                                                  args.full_refit)
+    else:
+        ml_ready_data, success = handler.run_ml_imputation_pipeline(output_file, args.format, args.compression,
+                                                                    args.partition_by)
+    handler.save_step_metrics(output_file)
+    if handler.cache is not None:
+        log.info(f"Step cache: {handler.cache.stats()}")
+    
+    if args.check_backends:
+        handler.check_backend_equivalence()
     
     if success:
-        print("\n🚀 DATASET IS NOW ML-READY!")
-        print(f"✅ No missing values")
-        print(f"✅ PII removed") 
-        print(f"✅ Additional ML features created")
-        print(f"✅ Saved as: {output_file}")
+        log.info("\n🚀 DATASET IS NOW ML-READY!")
+        log.info(f"✅ No missing values")
+        log.info(f"✅ PII removed") 
+        log.info(f"✅ Additional ML features created")
+        log.info(f"✅ Saved as: {output_file}")
     else:
-        print("\n⚠️  Some issues remain - please review")
+        log.warning("\n⚠️  Some issues remain - please review")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Vectorized Name Normalization
+=============================
+
+Column-at-a-time replacement for the per-row `fix_name_formatting` closure
+that `HospitalDataCleaner.clean_names` used to apply to every row:
+- Whitespace collapsing
+- Mr./Mrs./Dr./Ms. title normalization
+- Capitalization of every space- and hyphen-separated part
+
+`normalize_names` gives exactly the same output as `fix_name_formatting`.
+When pyarrow is installed the string work runs in Arrow compute kernels;
+otherwise it falls back to pandas object-dtype string methods. Run this
+file directly to benchmark the engine against the per-row closure.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import pandas as pd
+import numpy as np
+import re
+import time
+import argparse
+
+TITLE_PATTERN = r'^(mr\.|mrs\.|dr\.|ms\.)\s*'
+TITLES = {'mr.': 'Mr. ', 'mrs.': 'Mrs. ', 'dr.': 'Dr. ', 'ms.': 'Ms. '}
+
+# Professional suffixes that keep their usual casing in the Doctor column
+DOCTOR_SUFFIXES = ['MD', 'DDS', 'DVM', 'PhD', 'II', 'III', 'IV']
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+
+def fix_name_formatting(name):
+    """Reference per-value implementation (the original clean_names closure)."""
+    if pd.isna(name):
+        return name
+
+    # Remove extra spaces and normalize
+    name = re.sub(r'\s+', ' ', str(name).strip())
+
+    # Handle titles (Mr., Mrs., Dr., Ms.)
+    title_match = re.match(TITLE_PATTERN, name.lower())
+    title = ""
+    if title_match:
+        title = title_match.group(1).title() + " "
+        name = re.sub(TITLE_PATTERN, '', name, flags=re.IGNORECASE)
+
+    # Split name into parts and capitalize properly
+    name_parts = name.split()
+    cleaned_parts = []
+
+    for part in name_parts:
+        # Handle hyphenated names
+        if '-' in part:
+            hyphen_parts = [p.capitalize() for p in part.split('-')]
+            cleaned_parts.append('-'.join(hyphen_parts))
+        else:
+            cleaned_parts.append(part.capitalize())
+
+    return title + ' '.join(cleaned_parts)
+
+
+def _capitalize_parts_arrow(values):
+    """Capitalize every space/hyphen-separated part using Arrow compute kernels."""
+    words = pc.split_pattern(values, ' ')
+    pieces = pc.split_pattern(pc.list_flatten(words), '-')
+    capitalized = pc.utf8_capitalize(pc.list_flatten(pieces))
+    joined_words = pc.binary_join(pa.ListArray.from_arrays(pieces.offsets, capitalized), '-')
+    return pc.binary_join(pa.ListArray.from_arrays(words.offsets, joined_words), ' ')
+
+
+def _normalize_ascii_names_arrow(names):
+    """Normalize printable-ASCII names entirely inside Arrow compute kernels."""
+    values = pa.array(names.to_numpy(dtype=object), type=pa.string())
+
+    # The only whitespace in printable ASCII is the space itself
+    values = pc.replace_substring_regex(pc.utf8_trim_whitespace(values), r' {2,}', ' ')
+
+    # Split off the title, matched case-insensitively at the start only
+    lower = pc.utf8_lower(values)
+    title = pa.array([''] * len(values), type=pa.string())
+    for prefix, formatted in TITLES.items():
+        has_title = pc.starts_with(lower, prefix)
+        title = pc.if_else(has_title, formatted, title)
+        stripped = pc.utf8_ltrim_whitespace(pc.utf8_slice_codeunits(values, len(prefix)))
+        values = pc.if_else(has_title, stripped, values)
+
+    normalized = pc.binary_join_element_wise(title, _capitalize_parts_arrow(values), '')
+    return normalized.to_numpy(zero_copy_only=False)
+
+
+def _capitalize_parts_object(names):
+    """Capitalize every space/hyphen-separated part with object-dtype string methods."""
+    # For letters, spaces and hyphens only, str.title() capitalizes exactly the
+    # same parts; anything else (digits, apostrophes, periods) is done by hand
+    simple = names.str.fullmatch(r'[A-Za-z \-]*').to_numpy(dtype=bool)
+    result = names.str.title().to_numpy(dtype=object)
+    result[~simple] = [
+        ' '.join('-'.join(p.capitalize() for p in word.split('-')) for word in name.split(' '))
+        for name in names[~simple]
+    ]
+    return result
+
+
+def _normalize_ascii_names(names):
+    """Normalize names that contain only printable ASCII characters."""
+    if pa is not None:
+        return _normalize_ascii_names_arrow(names)
+
+    names = names.str.strip().str.replace(r' {2,}', ' ', regex=True)
+
+    lower = names.str.lower()
+    title = np.full(len(names), '', dtype=object)
+    for prefix, formatted in TITLES.items():
+        has_title = lower.str.startswith(prefix).to_numpy(dtype=bool)
+        if has_title.any():
+            title[has_title] = formatted
+            names[has_title] = names[has_title].str.slice(len(prefix)).str.lstrip()
+
+    return title + _capitalize_parts_object(names)
+
+
+def normalize_names(series, keep_case=None):
+    """Normalize a whole column of person names at once.
+
+    Missing values are preserved. `keep_case` lists whole words (such as
+    'MD' or 'PhD') whose casing is restored after capitalization.
+    """
+    present = series.notna()
+    values = series[present]
+    if len(values) == 0:
+        return series.copy()
+
+    names = values.astype(str)
+
+    # Tabs and non-ASCII letters have subtly different whitespace and case
+    # rules in vectorized kernels, so those rare names use the reference path
+    ascii_mask = names.str.fullmatch(r'[ -~]*').to_numpy(dtype=bool)
+    normalized = np.empty(len(names), dtype=object)
+    normalized[ascii_mask] = _normalize_ascii_names(names[ascii_mask])
+    normalized[~ascii_mask] = [fix_name_formatting(name) for name in values[~ascii_mask]]
+    normalized = pd.Series(normalized, index=values.index)
+
+    if keep_case:
+        for word in keep_case:
+            normalized = normalized.str.replace(rf'\b{re.escape(word.capitalize())}\b', word, regex=True)
+
+    result = series.astype(object).copy()
+    result[present] = normalized
+    return result
+
+
+def make_benchmark_names(n_rows, seed=42):
+    """Build a column of messy names for benchmarking."""
+    rng = np.random.default_rng(seed)
+    first = np.array(['john', 'MARY', 'aLiCe', 'bob-smith', 'eve', "o'neil", 'José'])
+    last = np.array(['doe', 'SMITH', 'davis-o-neil', 'brown', 'jOnes', 'King Jr.', 'Bell MD'])
+    titles = np.array(['', '', '', 'mr. ', 'MRS. ', 'Dr.', 'ms.  '])
+    names = pd.Series(
+        np.char.add(np.char.add(np.char.add(rng.choice(titles, n_rows), rng.choice(first, n_rows)), '  '),
+                    rng.choice(last, n_rows)),
+        dtype=object,
+    )
+    names[rng.random(n_rows) < 0.01] = np.nan
+    return names
+
+
+def benchmark(n_rows=1_000_000, seed=42):
+    """Time the per-row closure against the vectorized engine and check they agree."""
+    names = make_benchmark_names(n_rows, seed)
+
+    start = time.perf_counter()
+    expected = names.apply(fix_name_formatting)
+    closure_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = normalize_names(names)
+    vectorized_time = time.perf_counter() - start
+
+    mismatches = int((expected.fillna('<NA>') != actual.fillna('<NA>')).sum())
+
+    print(f"Rows: {n_rows}")
+    print(f"Per-row closure:   {closure_time:.2f}s ({n_rows / closure_time:,.0f} rows/s)")
+    print(f"Vectorized engine: {vectorized_time:.2f}s ({n_rows / vectorized_time:,.0f} rows/s)")
+    print(f"Speedup: {closure_time / vectorized_time:.1f}x")
+    print(f"Mismatches: {mismatches}")
+
+    return {'closure_seconds': closure_time, 'vectorized_seconds': vectorized_time,
+            'mismatches': mismatches}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vectorized name normalization.")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Number of names to generate")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    benchmark(args.rows, args.seed)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Incrementally Maintained Null Index
+===================================
+
+The missing-value reports of both pipelines used to rescan the whole frame
+with `isnull().sum()` each time. A `NullIndex` scans the frame once, one
+column at a time, and keeps:
+- A null bitmap per column (one bit per row, packed; none for complete columns)
+- The null count per column
+- Combined missingness patterns: which columns are missing together, and
+  in how many rows
+
+Steps mark the columns they write, and only those are rescanned, the next
+time the index is read. Row filters and column drops are applied to the
+bitmaps directly. Columns added to the frame are scanned when first seen.
+A different frame (or one with a different number of rows) is rescanned
+in full.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import weakref
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+
+
+def _pack(mask):
+    """Packed bitmap of a boolean mask, or None when nothing is set."""
+    return np.packbits(mask, bitorder='little') if mask.any() else None
+
+
+class NullIndex:
+    """Null bitmaps and counts of one frame's columns."""
+
+    def __init__(self, df):
+        self._bitmaps = OrderedDict()
+        self._counts = OrderedDict()
+        self._stale = set()
+        self.scans = 0
+        self._rebuild(df)
+
+    def _rebuild(self, df):
+        self._bitmaps.clear()
+        self._counts.clear()
+        self._stale.clear()
+        self.rows = len(df)
+        self._frame = weakref.ref(df)
+        for col in df.columns:
+            self._scan(df, col)
+
+    def _scan(self, df, col):
+        mask = df[col].isna().to_numpy()
+        self._bitmaps[col] = _pack(mask)
+        self._counts[col] = int(np.count_nonzero(mask))
+        self.scans += 1
+
+    def mask(self, col):
+        """Boolean null mask of a column."""
+        bitmap = self._bitmaps[col]
+        if bitmap is None:
+            return np.zeros(self.rows, dtype=bool)
+        return np.unpackbits(bitmap, count=self.rows, bitorder='little').astype(bool)
+
+    def mark_written(self, *columns):
+        """Columns a step has written; they are rescanned on the next refresh."""
+        self._stale.update(columns)
+
+    def refresh(self, df):
+        """Bring the index up to date with `df`; returns the index."""
+        if self._frame() is not df or len(df) != self.rows:
+            self._rebuild(df)
+            return self
+        for col in [col for col in self._bitmaps if col not in df.columns]:
+            del self._bitmaps[col], self._counts[col]
+        for col in df.columns:
+            if col not in self._bitmaps or col in self._stale:
+                self._scan(df, col)
+        self._stale.clear()
+        # Keep the frame's column order
+        if list(self._bitmaps) != list(df.columns):
+            self._bitmaps = OrderedDict((col, self._bitmaps[col]) for col in df.columns)
+            self._counts = OrderedDict((col, self._counts[col]) for col in df.columns)
+        return self
+
+    def take(self, df, keep, filtered):
+        """Apply the row filter that turned `df` into `filtered` without rescanning."""
+        if self._frame() is not df:
+            return
+        for col, bitmap in self._bitmaps.items():
+            if bitmap is not None:
+                mask = self.mask(col)[keep]
+                self._bitmaps[col] = _pack(mask)
+                self._counts[col] = int(np.count_nonzero(mask))
+        self.rows = int(np.count_nonzero(keep))
+        self._frame = weakref.ref(filtered)
+
+    def drop(self, df, columns, remaining):
+        """Forget the columns dropped from `df` (`remaining` is the frame without them)."""
+        if self._frame() is not df:
+            return
+        for col in columns:
+            self._bitmaps.pop(col, None)
+            self._counts.pop(col, None)
+        self._frame = weakref.ref(remaining)
+
+    def count(self, col):
+        return self._counts[col]
+
+    def counts(self):
+        """Null count per column, like `df.isnull().sum()`."""
+        return pd.Series(self._counts, dtype='int64')
+
+    def total(self):
+        return sum(self._counts.values())
+
+    def patterns(self, top=None):
+        """Sets of columns missing together, most frequent first: [{'columns', 'rows'}].
+
+        Rows without missing values are left out.
+        """
+        columns = [col for col, count in self._counts.items() if count > 0]
+        if not columns:
+            return []
+        missing_together = np.column_stack([self.mask(col) for col in columns])
+        keys, counts = np.unique(np.packbits(missing_together, axis=1, bitorder='little'), axis=0,
+                                 return_counts=True)
+        patterns = []
+        for key, rows in zip(keys, counts):
+            missing = np.unpackbits(key, count=len(columns), bitorder='little').astype(bool)
+            if missing.any():
+                patterns.append({'columns': [col for col, flag in zip(columns, missing) if flag],
+                                 'rows': int(rows)})
+        patterns.sort(key=lambda pattern: -pattern['rows'])
+        return patterns[:top] if top else patterns
+
+
+def describe_patterns(patterns):
+    """Text lines for missingness patterns."""
+    if not patterns:
+        return "  (no missing values)"
+    return "\n".join(f"  {pattern['rows']:>8} rows missing {' + '.join(pattern['columns'])}"
+                     for pattern in patterns)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Mergeable Quantile Sketch
+=========================
+
+`detect_outliers` and the `Billing_Category` bins need quantiles of a whole
+column. Exact quantiles need every value in memory plus a sort. This module
+provides a KLL sketch (Karnin, Lang & Liberty) that:
+- Is updated chunk by chunk and merged across workers/partitions
+- Keeps ~k items per level, with a rank error of about 1.65 / k
+- Is saved to and loaded from `.npz` files
+
+Inputs with at most `exact_limit` values are kept as they are, and their
+quantiles are exact (numpy's linear interpolation, like `Series.quantile`).
+A sketch switches to KLL compaction only after it grows past that limit.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import math
+import pandas as pd
+import numpy as np
+
+DEFAULT_ERROR = 0.01
+EXACT_LIMIT = 1_000_000
+# Each level may hold 2/3 of the items of the level above it
+CAPACITY_DECAY = 2 / 3
+MIN_CAPACITY = 2
+
+
+def k_for_error(error):
+    """Items per top level needed for a normalized rank error of `error`."""
+    return max(8, int(math.ceil(1.65 / error)))
+
+
+class QuantileSketch:
+    """KLL quantile sketch with an exact mode for small inputs.
+
+    Level h holds sorted-then-halved items that each stand for 2**h values.
+    """
+
+    def __init__(self, error=DEFAULT_ERROR, exact_limit=EXACT_LIMIT, seed=0):
+        self.error = float(error)
+        self.exact_limit = exact_limit
+        self.k = k_for_error(self.error)
+        self.count = 0
+        self.exact = True
+        # Exact mode: the values as added (dtype kept); sketch mode: one array per level
+        self._buffer = []
+        self.levels = []
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_values(cls, values, error=DEFAULT_ERROR, exact_limit=EXACT_LIMIT):
+        sketch = cls(error, exact_limit)
+        sketch.update(values)
+        return sketch
+
+    def update(self, values):
+        """Add a chunk of values; missing values are ignored."""
+        values = pd.Series(values).dropna().to_numpy()
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        if self.exact:
+            self._buffer.append(values)
+            if self.exact_limit is not None and self.count > self.exact_limit:
+                self._to_sketch()
+        else:
+            self._add_to_level(0, values.astype('float64'))
+            self._compress()
+
+    def merge(self, other):
+        """Merge another sketch (e.g. from another partition) into this one."""
+        if self.exact and other.exact and (self.exact_limit is None or
+                                           self.count + other.count <= self.exact_limit):
+            self._buffer.extend(other._buffer)
+            self.count += other.count
+            return self
+
+        if self.exact:
+            self._to_sketch()
+        other_levels = other.levels if not other.exact else [_concat(other._buffer).astype('float64')]
+        for level, items in enumerate(other_levels):
+            self._add_to_level(level, items)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _to_sketch(self):
+        self.exact = False
+        self.levels = [_concat(self._buffer).astype('float64')]
+        self._buffer = []
+        self._compress()
+
+    def _add_to_level(self, level, items):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0, dtype='float64'))
+        self.levels[level] = np.concatenate([self.levels[level], items])
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(MIN_CAPACITY, int(math.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+    def _compress(self):
+        """While the sketch is over its total capacity, compact the lowest full level:
+        sort it and promote every other item (from a random offset) one level up."""
+        while sum(map(len, self.levels)) > sum(self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h, items in enumerate(self.levels) if len(items) > self._capacity(h))
+            items = np.sort(self.levels[level])
+            # An odd item out stays on this level so the total weight is unchanged
+            keep = items[:1] if len(items) % 2 else items[:0]
+            pairs = items[len(keep):]
+            offset = int(self._rng.integers(2))
+            self.levels[level] = keep
+            self._add_to_level(level + 1, pairs[offset::2])
+
+    def quantiles(self, qs):
+        """Quantiles for the probabilities in `qs` (NaN when empty)."""
+        qs = np.asarray(qs, dtype='float64')
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        if self.exact:
+            return np.quantile(_concat(self._buffer), qs)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_), 2 ** level, dtype='float64')
+                                  for level, items_ in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def weighted_items(self):
+        """The retained items and how many input values each one stands for."""
+        if self.exact:
+            items = _concat(self._buffer).astype('float64')
+            return items, np.ones(len(items))
+        weights = [np.full(len(items), 2 ** level, dtype='float64') for level, items in enumerate(self.levels)]
+        return _concat(self.levels), _concat(weights)
+
+    def save(self, path):
+        """Write the sketch to an `.npz` file."""
+        arrays = {f'level_{i}': items for i, items in enumerate(self.levels if not self.exact
+                                                                 else [_concat(self._buffer)])}
+        limit = -1 if self.exact_limit is None else self.exact_limit
+        np.savez(path, meta=np.array([self.count, int(self.exact), limit], dtype=np.int64),
+                 error=np.array([self.error]), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            count, exact, limit = (int(v) for v in data['meta'])
+            sketch = cls(float(data['error'][0]), None if limit < 0 else limit)
+            levels = [data[f'level_{i}'] for i in range(len(data.files) - 2)]
+        sketch.count, sketch.exact = count, bool(exact)
+        if sketch.exact:
+            sketch._buffer = levels
+        else:
+            sketch.levels = levels
+        return sketch
+
+
+def _concat(arrays):
+    return np.concatenate(arrays) if arrays else np.empty(0, dtype='float64')
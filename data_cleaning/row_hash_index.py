@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Persistent Row-Hash Index for Cross-Run Duplicate Removal
+=========================================================
+
+`DataFrame.duplicated()` only sees one file, but overlapping daily extracts
+deliver the same admission several times across files. This module keeps
+64-bit row hashes (`pd.util.hash_pandas_object`) between runs:
+- `RowHashIndex`: exact, sorted uint64 hashes (8 bytes per distinct row)
+- `BloomFilterIndex`: fixed-size bit array for very long histories; memory
+  stays bounded, at the cost of a configurable false-positive rate (a new
+  row wrongly treated as already seen)
+
+Both are saved as `.npz` files and updated only after a run succeeds.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import os
+import math
+import pandas as pd
+import numpy as np
+
+# Pending sorted batches are merged into the main array once there are this many
+MAX_PENDING_BATCHES = 8
+
+
+def row_hashes(df):
+    """64-bit hash per row, independent of the index.
+
+    Integer columns are hashed as float64 so a row still matches when one
+    file (or chunk) inferred int and another float for the same column.
+    """
+    int_columns = df.select_dtypes(include='integer').columns
+    normalized = df.astype({col: 'float64' for col in int_columns})
+    return pd.util.hash_pandas_object(normalized, index=False)
+
+
+class RowHashIndex:
+    """Exact set of row hashes kept as sorted uint64 arrays."""
+
+    kind = 'exact'
+
+    def __init__(self, path=None):
+        self.path = path
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._pending = []
+
+    def __len__(self):
+        return len(self._hashes) + sum(len(batch) for batch in self._pending)
+
+    def contains(self, hashes):
+        """Boolean array: which hashes are already in the index."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        for batch in [self._hashes] + self._pending:
+            if len(batch) == 0:
+                continue
+            positions = np.searchsorted(batch, hashes)
+            positions[positions == len(batch)] = len(batch) - 1
+            found |= batch[positions] == hashes
+        return found
+
+    def add(self, hashes):
+        """Add hashes; batches are merged lazily to keep inserts cheap."""
+        batch = np.unique(np.asarray(hashes, dtype=np.uint64))
+        if len(batch) == 0:
+            return
+        self._pending.append(batch)
+        if len(self._pending) >= MAX_PENDING_BATCHES:
+            self._compact()
+
+    def _compact(self):
+        if self._pending:
+            self._hashes = np.unique(np.concatenate([self._hashes] + self._pending))
+            self._pending = []
+
+    def cleared(self):
+        """Empty index saved to the same path (used by a full refit)."""
+        return RowHashIndex(self.path)
+
+    def save(self, path=None):
+        """Write the index atomically."""
+        path = path or self.path
+        self._compact()
+        _atomic_savez(path, kind=self.kind, hashes=self._hashes)
+
+    @classmethod
+    def _from_arrays(cls, path, arrays):
+        index = cls(path)
+        index._hashes = arrays['hashes']
+        return index
+
+
+class BloomFilterIndex:
+    """Bloom filter over row hashes with bounded memory."""
+
+    kind = 'bloom'
+
+    def __init__(self, path=None, capacity=10_000_000, error_rate=0.001):
+        self.path = path
+        self.capacity = int(capacity)
+        self.error_rate = float(error_rate)
+        self.n_bits = max(8, int(math.ceil(-self.capacity * math.log(self.error_rate) / math.log(2) ** 2)))
+        self.n_hashes = max(1, int(round(self.n_bits / self.capacity * math.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _positions(self, hashes):
+        """Bit positions for each hash function (double hashing)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        n_bits = np.uint64(self.n_bits)
+        for i in range(self.n_hashes):
+            yield (h1 + np.uint64(i) * h2) % n_bits
+
+    def contains(self, hashes):
+        found = np.ones(len(hashes), dtype=bool)
+        for positions in self._positions(hashes):
+            byte_values = self.bits[positions >> np.uint64(3)]
+            found &= ((byte_values >> (positions & np.uint64(7)).astype(np.uint8)) & 1).astype(bool)
+        return found
+
+    def add(self, hashes):
+        for positions in self._positions(hashes):
+            np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                             np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8))
+        self.count += len(hashes)
+
+    @property
+    def estimated_error_rate(self):
+        """False-positive rate for the number of hashes added so far."""
+        fill = 1 - math.exp(-self.n_hashes * self.count / self.n_bits)
+        return fill ** self.n_hashes
+
+    def cleared(self):
+        return BloomFilterIndex(self.path, self.capacity, self.error_rate)
+
+    def save(self, path=None):
+        path = path or self.path
+        _atomic_savez(path, kind=self.kind, bits=self.bits,
+                      meta=np.array([self.capacity, self.n_bits, self.n_hashes, self.count], dtype=np.int64),
+                      error_rate=np.array([self.error_rate]))
+
+    @classmethod
+    def _from_arrays(cls, path, arrays):
+        capacity, n_bits, n_hashes, count = (int(v) for v in arrays['meta'])
+        index = cls(path, capacity, float(arrays['error_rate'][0]))
+        index.n_bits, index.n_hashes, index.count = n_bits, n_hashes, count
+        index.bits = arrays['bits']
+        return index
+
+
+def _atomic_savez(path, **arrays):
+    """Save to a temporary file first so a crash never leaves a half-written index."""
+    temp_path = path + '.tmp.npz'
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, path)
+
+
+def open_hash_index(path, bloom_capacity=None, error_rate=0.001):
+    """Load the index at `path`, or create a new exact/Bloom index there."""
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        kind = str(arrays.pop('kind'))
+        index_class = BloomFilterIndex if kind == BloomFilterIndex.kind else RowHashIndex
+        return index_class._from_arrays(path, arrays)
+
+    if bloom_capacity:
+        return BloomFilterIndex(path, bloom_capacity, error_rate)
+    return RowHashIndex(path)
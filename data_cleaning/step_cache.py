@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Step Cache
+============================
+
+Both pipelines can keep the frames their steps produce in a cache
+directory and reuse them on the next run:
+- Keys hash the input file's content (not its name), the step's
+  configuration (rules, quantile settings) and the source code of the
+  modules the step runs
+- The CSV parse is shared: the cleaner and the imputation pipeline reading
+  the same bytes use one cached, typed frame (the cleaner's index column is
+  set on the cached frame)
+- Frames are stored as Feather (Arrow IPC), which keeps the datetime,
+  categorical and compact numeric dtypes; reports go into the entry's
+  JSON record
+- The cache is bounded in size and evicts the least recently used entries
+- An entry is replaced when the same step runs on a changed input (or with
+  other rules), so stale entries do not wait for eviction
+
+Content digests are remembered per file size and modification time, so an
+unchanged input is not hashed again.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import os
+import json
+import time
+import hashlib
+import importlib.util
+import pandas as pd
+import numpy as np
+from incremental_state import jsonable
+from dtype_schema import read_csv_with_schema
+from diagnostics import get_logger
+
+log = get_logger('step_cache')
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_MB = 2048
+INDEX_FILE = 'index.json'
+# Column holding the frame's index in the stored Feather file
+INDEX_COLUMN = '__index__'
+CACHE_COMPRESSION = 'lz4'
+HASH_BLOCK_BYTES = 1 << 20
+# Modules whose code decides the cached CSV parse
+LOAD_CODE = ['dtype_schema', 'date_parsing']
+
+
+def file_digest(path):
+    """SHA-256 of a file's content; for a directory, of every file's relative path and content."""
+    digest = hashlib.sha256()
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    for file_path in paths:
+        if file_path != path:
+            digest.update(os.path.relpath(file_path, path).encode())
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version(modules):
+    """Hash of the source files of the named modules."""
+    digest = hashlib.sha256()
+    for name in modules:
+        spec = importlib.util.find_spec(name)
+        with open(spec.origin, 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()[:16]
+
+
+def file_stamp(path):
+    """Size and modification time of a file, or of a directory's newest file."""
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+    stats = [os.stat(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names]
+    return [sum(stat.st_size for stat in stats), max((stat.st_mtime_ns for stat in stats), default=0)]
+
+
+def write_frame(path, df):
+    """Write a frame as lz4 Feather; returns the index record `read_frame` needs."""
+    # A default RangeIndex is rebuilt on read; any other index is stored as a column
+    default_index = isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+    stored = df.reset_index(drop=True) if default_index else df.reset_index(names=INDEX_COLUMN)
+    stored.to_feather(path, compression=CACHE_COMPRESSION)
+    return None if default_index else {'name': df.index.name}
+
+
+def read_frame(path, index=None):
+    """Read a frame written by `write_frame` back with its index and missing values."""
+    df = pd.read_feather(path)
+    if index is not None:
+        df = df.set_index(INDEX_COLUMN)
+        df.index.name = index['name']
+    # Arrow gives None for missing strings; a fresh parse has NaN
+    for col in df.select_dtypes(include='object').columns:
+        if df[col].isna().any():
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+class StepCache:
+    """Frames produced by pipeline steps, keyed by input content, configuration and code."""
+
+    def __init__(self, directory, max_mb=DEFAULT_CACHE_MB):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        try:
+            with open(path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {'version': CACHE_VERSION, 'entries': {}, 'digests': {}}
+        if index.get('version') != CACHE_VERSION:
+            return {'version': CACHE_VERSION, 'entries': {}, 'digests': {}}
+        return index
+
+    def _save_index(self):
+        path = os.path.join(self.directory, INDEX_FILE)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(temp_path, path)
+
+    def _frame_path(self, key):
+        return os.path.join(self.directory, key + '.feather')
+
+    def digest(self, path):
+        """Content digest of an input, hashed again only when its size or mtime changed."""
+        path = os.path.abspath(path)
+        stamp = file_stamp(path)
+        known = self._index['digests'].get(path)
+        if known and known['stamp'] == stamp:
+            return known['digest']
+        digest = file_digest(path)
+        self._index['digests'][path] = {'stamp': stamp, 'digest': digest}
+        self._save_index()
+        return digest
+
+    @staticmethod
+    def key(step, *parts):
+        """Cache key of a step from its input digest, configuration and code version."""
+        text = json.dumps(jsonable([CACHE_VERSION, step, list(parts)]), sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, key):
+        """The cached (frame, details) for a key, or None."""
+        entry = self._index['entries'].get(key)
+        try:
+            df = read_frame(self._frame_path(key), entry['index']) if entry is not None else None
+        except (OSError, ValueError):
+            # Removed or damaged file: treat it as a miss and forget the entry
+            self._remove(key)
+            df = None
+        if df is None:
+            self.misses += 1
+            return None
+        entry['last_used'] = time.time()
+        self._save_index()
+        self.hits += 1
+        log.info(f"Step cache hit: {entry['step']} for {entry['input']} ({entry['bytes'] / 1024 / 1024:.1f} MB)")
+        return df, entry['details']
+
+    def put(self, key, step, input_path, df, details=None):
+        """Store a step's frame; entries of the same step on the same input are replaced."""
+        path = self._frame_path(key)
+        try:
+            index = write_frame(path, df)
+        except (TypeError, ValueError) as error:
+            # e.g. an object column mixing strings and numbers; the step just is not cached
+            log.warning(f"Step cache: could not store {step} ({error})")
+            return False
+
+        input_path = os.path.abspath(input_path)
+        for old_key, entry in list(self._index['entries'].items()):
+            if old_key != key and entry['step'] == step and entry['input'] == input_path:
+                self._remove(old_key)
+        now = time.time()
+        self._index['entries'][key] = {
+            'step': step,
+            'input': input_path,
+            'bytes': os.path.getsize(path),
+            'index': index,
+            'created': now,
+            'last_used': now,
+            'details': jsonable(details or {}),
+        }
+        self._evict(keep=key)
+        self._save_index()
+        return key in self._index['entries']
+
+    def _remove(self, key):
+        self._index['entries'].pop(key, None)
+        try:
+            os.remove(self._frame_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self, keep=None):
+        """Drop least recently used entries until the cache fits its size limit."""
+        entries = self._index['entries']
+        by_age = sorted(entries, key=lambda key: (key == keep, entries[key]['last_used']))
+        while by_age and self.size_bytes() > self.max_bytes:
+            key = by_age.pop(0)
+            log.info(f"Step cache: evicting {entries[key]['step']} for {entries[key]['input']}")
+            self._remove(key)
+
+    def size_bytes(self):
+        return sum(entry['bytes'] for entry in self._index['entries'].values())
+
+    def clear(self):
+        for key in list(self._index['entries']):
+            self._remove(key)
+        self._save_index()
+
+    def stats(self):
+        """Summary of this run's cache use for reports."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._index['entries']),
+            'size_mb': round(self.size_bytes() / (1024 * 1024), 2),
+            'max_mb': round(self.max_bytes / (1024 * 1024), 2),
+        }
+
+
+def read_csv_cached(cache, path, index_col=None, digest=None):
+    """`read_csv_with_schema(path, index_col)`, reusing a cached parse of the same bytes.
+
+    The parse is cached without an index column, so pipelines that read the
+    first column as the index and pipelines that keep it share one entry.
+    """
+    if cache is None:
+        return read_csv_with_schema(path, index_col=index_col)
+    key = cache.key('load', digest or cache.digest(path), code_version(LOAD_CODE))
+    cached = cache.get(key)
+    if cached is None:
+        df, info = read_csv_with_schema(path)
+        cache.put(key, 'load', path, df, info)
+    else:
+        df, info = cached
+    if index_col is not None:
+        name = df.columns[index_col]
+        df = df.set_index(name)
+        # read_csv names the index after the header, which is empty for a written index
+        if str(name).startswith('Unnamed: '):
+            df.index.name = None
+    return df, info
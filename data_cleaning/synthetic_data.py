@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dirty Hospital Data
+=============================
+
+`Hospital_dataset.csv` has only ~25k rows, too few to show how the
+pipelines scale. This module writes inputs of any size with the same
+schema and the same kinds of dirt that `HospitalDataCleaner` handles:
+- Irregular capitalization, extra spaces and titles in Name
+- Literal "Nan" strings and missing values in Gender
+- Invalid blood types
+- Hospital names with trailing commas
+- Negative billing amounts and amounts above $1M
+- Discharge dates before the admission date
+- Exact duplicate rows
+- Missing Age, Insurance Provider, Billing Amount, Admission Type and
+  Medication, and unrealistic ages
+
+The default rates are the ones measured on `Hospital_dataset.csv`, and the
+Doctor and Hospital pools are sized so that a 25,724-row sample has about
+21k distinct doctors and 20k distinct hospitals, with 5 insurers and 1,827
+admission dates.
+
+Rows are generated in fixed blocks, each from its own seeded generator, and
+appended to the CSV block by block. The output depends only on the seed and
+the rates, and a smaller file is a prefix of a larger one with the same seed.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import os
+import time
+import argparse
+import pandas as pd
+import numpy as np
+
+BLOCK_ROWS = 100_000
+# Rows of Hospital_dataset.csv, the size the pool cardinalities are matched at
+REFERENCE_ROWS = 25_724
+
+DEFAULT_RATES = {
+    'name_irregular_case': 0.6,
+    'name_extra_spaces': 0.5,
+    'name_title': 0.4,
+    'gender_nan_string': 0.0092,
+    'gender_missing': 0.0043,
+    'invalid_blood_type': 0.011,
+    'hospital_trailing_comma': 0.27,
+    'negative_billing': 0.0096,
+    'billing_over_limit': 0.0025,
+    'billing_missing': 0.0098,
+    'discharge_before_admission': 0.0098,
+    'duplicate_rows': 0.0117,
+    'age_missing': 0.0095,
+    'age_outlier': 0.0018,
+    'insurance_missing': 0.051,
+    'admission_type_missing': 0.029,
+    'medication_missing': 0.099,
+}
+
+COLUMNS = ['Name', 'Age', 'Gender', 'Blood Type', 'Medical Condition', 'Date of Admission', 'Doctor',
+           'Hospital', 'Insurance Provider', 'Billing Amount', 'Room Number', 'Admission Type',
+           'Discharge Date', 'Medication', 'Test Results']
+
+SYLLABLES = ['ba', 'be', 'bi', 'bo', 'ca', 'co', 'da', 'de', 'di', 'do', 'fa', 'fe', 'ga', 'go', 'ha',
+             'he', 'ja', 'jo', 'ka', 'ke', 'la', 'le', 'li', 'lo', 'ma', 'me', 'mi', 'mo', 'na', 'ne',
+             'ni', 'no', 'pa', 'pe', 'ra', 're', 'ri', 'ro', 'sa', 'se', 'si', 'so', 'ta', 'te', 'ti',
+             'to', 'va', 've', 'wa', 'we', 'ya', 'za']
+ENDINGS = ['', 'n', 'r', 's', 'th', 'ck', 'll', 'rd', 'tt', 'ns', 'rs', 'y']
+FIRST_NAMES = 500
+LAST_NAMES = 2_000
+HYPHENATED_SHARE = 0.1
+DOCTOR_POOL = 65_000
+HOSPITAL_POOL = 60_000
+HOSPITAL_SUFFIXES = ['Inc', 'Ltd', 'LLC', 'PLC', 'Group', 'and Sons']
+TITLES = ['Mr. ', 'Mrs. ', 'Ms. ', 'Dr. ', 'mr. ', 'MRS. ', 'ms.  ', 'Dr.', 'DR. ']
+
+GENDERS = ['Male', 'Female']
+BLOOD_TYPES = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
+BLOOD_TYPE_WEIGHTS = [0.12, 0.155, 0.155, 0.205, 0.025, 0.185, 0.055, 0.1]
+INVALID_BLOOD_TYPES = ['Z+', 'C-', 'AB0', 'O']
+MEDICAL_CONDITIONS = ['Arthritis', 'Asthma', 'Cancer', 'Diabetes', 'Hypertension', 'Obesity']
+INSURANCE_PROVIDERS = ['Aetna', 'Blue Cross', 'Cigna', 'Medicare', 'UnitedHealthcare']
+ADMISSION_TYPES = ['Elective', 'Emergency', 'Urgent']
+MEDICATIONS = ['aspirin', 'ibuprofen', 'lipitor', 'paracetamol', 'penicillin']
+TEST_RESULTS = ['Abnormal', 'Inconclusive', 'Normal']
+
+FIRST_ADMISSION = np.datetime64('2019-05-08')
+ADMISSION_DAYS = 1_827
+MAX_STAY_DAYS = 30
+AGE_RANGE = (18, 85)
+MINOR_AGE_SHARE = 0.002
+OUTLIER_AGE = 150.0
+MAX_BILLING = 50_000.0
+OVER_LIMIT_BILLING = 2_000_000.0
+
+
+def build_rates(overrides=None):
+    """Default rates updated with `overrides` ({name: rate})."""
+    rates = dict(DEFAULT_RATES)
+    for name, rate in (overrides or {}).items():
+        if name not in rates:
+            raise ValueError(f"Unknown dirt rate '{name}' (known: {', '.join(sorted(rates))})")
+        if not 0 <= rate <= 1:
+            raise ValueError(f"Rate '{name}' must be between 0 and 1, got {rate}")
+        rates[name] = float(rate)
+    return rates
+
+
+def _words(rng, size):
+    """`size` distinct capitalized pseudo-words built from syllables."""
+    combos = len(SYLLABLES) ** 2 * len(ENDINGS)
+    codes = rng.choice(combos, size, replace=False)
+    first, rest = np.divmod(codes, len(SYLLABLES) * len(ENDINGS))
+    second, ending = np.divmod(rest, len(ENDINGS))
+    syllables, endings = np.array(SYLLABLES, dtype=object), np.array(ENDINGS, dtype=object)
+    return pd.Series(syllables[first] + syllables[second] + endings[ending]).str.capitalize().to_numpy(dtype=object)
+
+
+class VocabularyPools:
+    """First/last names, doctors and hospitals shared by every block of one seed."""
+
+    def __init__(self, seed):
+        rng = np.random.default_rng([seed, 0])
+        self.first_names = _words(rng, FIRST_NAMES)
+        last_names = _words(rng, LAST_NAMES)
+        # Some surnames are hyphenated, e.g. "Dobe-Rasi"
+        hyphenated = rng.random(LAST_NAMES) < HYPHENATED_SHARE
+        partners = rng.choice(last_names, int(hyphenated.sum()))
+        last_names[hyphenated] = last_names[hyphenated] + '-' + partners
+        self.last_names = last_names
+        self.first_name_cases = _case_variants(self.first_names)
+        self.last_name_cases = _case_variants(self.last_names)
+
+        doctors = rng.choice(FIRST_NAMES * LAST_NAMES, DOCTOR_POOL, replace=False)
+        first, last = np.divmod(doctors, LAST_NAMES)
+        self.doctors = self.first_names[first] + ' ' + self.last_names[last]
+        self.hospitals = self._hospitals(rng)
+
+    def _hospitals(self, rng):
+        """Company-style names: "A-B", "A Inc", "A, B and C" or "A and B"."""
+        names = lambda: rng.choice(self.last_names, HOSPITAL_POOL)
+        suffixes = rng.choice(np.array(HOSPITAL_SUFFIXES, dtype=object), HOSPITAL_POOL)
+        patterns = [names() + '-' + names(),
+                    names() + ' ' + suffixes,
+                    names() + ', ' + names() + ' and ' + names(),
+                    names() + ' and ' + names()]
+        choice = rng.integers(len(patterns), size=HOSPITAL_POOL)
+        hospitals = np.choose(choice, patterns)
+        return pd.unique(hospitals)
+
+
+def _case_variants(words):
+    """Rows: the words as they are, lower-, upper- and alternating-case ("aLiCe")."""
+    words = pd.Series(words)
+    alternating = words.map(lambda word: ''.join(ch.upper() if i % 2 else ch.lower()
+                                                 for i, ch in enumerate(word)))
+    return np.vstack([words.to_numpy(dtype=object), words.str.lower().to_numpy(dtype=object),
+                      words.str.upper().to_numpy(dtype=object), alternating.to_numpy(dtype=object)])
+
+
+def _sample_words(variants, rng, n, rate):
+    """`n` random words, a share `rate` of them in an irregular case."""
+    words = rng.integers(variants.shape[1], size=n)
+    style = np.where(rng.random(n) < rate, rng.integers(1, len(variants), size=n), 0)
+    return variants[style, words]
+
+
+def _with_missing(values, rng, rate):
+    values = values.astype(object)
+    values[rng.random(len(values)) < rate] = None
+    return values
+
+
+def generate_block(pools, seed, block_number, rates):
+    """Rows of block `block_number` (BLOCK_ROWS rows) as a DataFrame."""
+    rng = np.random.default_rng([seed, block_number + 1])
+    n = BLOCK_ROWS
+
+    first = _sample_words(pools.first_name_cases, rng, n, rates['name_irregular_case'])
+    last = _sample_words(pools.last_name_cases, rng, n, rates['name_irregular_case'])
+    spaces = np.where(rng.random(n) < rates['name_extra_spaces'], '  ', ' ').astype(object)
+    titles = np.where(rng.random(n) < rates['name_title'],
+                      rng.choice(np.array(TITLES, dtype=object), n), '').astype(object)
+    names = titles + first + spaces + last
+
+    ages = rng.integers(AGE_RANGE[0], AGE_RANGE[1] + 1, n).astype('float64')
+    minors = rng.random(n) < MINOR_AGE_SHARE
+    ages[minors] = rng.integers(13, 18, int(minors.sum()))
+    ages[rng.random(n) < rates['age_outlier']] = OUTLIER_AGE
+    ages[rng.random(n) < rates['age_missing']] = np.nan
+
+    genders = rng.choice(np.array(GENDERS, dtype=object), n)
+    draw = rng.random(n)
+    genders[draw < rates['gender_nan_string']] = 'Nan'
+    genders[(draw >= rates['gender_nan_string']) &
+            (draw < rates['gender_nan_string'] + rates['gender_missing'])] = None
+
+    blood_types = rng.choice(np.array(BLOOD_TYPES, dtype=object), n, p=BLOOD_TYPE_WEIGHTS)
+    invalid = rng.random(n) < rates['invalid_blood_type']
+    blood_types[invalid] = rng.choice(np.array(INVALID_BLOOD_TYPES, dtype=object), int(invalid.sum()))
+
+    admissions = FIRST_ADMISSION + rng.integers(ADMISSION_DAYS, size=n).astype('timedelta64[D]')
+    stays = rng.integers(1, MAX_STAY_DAYS + 1, n)
+    stays[rng.random(n) < rates['discharge_before_admission']] *= -1
+    discharges = admissions + stays.astype('timedelta64[D]')
+
+    hospitals = rng.choice(pools.hospitals, n)
+    trailing = rng.random(n) < rates['hospital_trailing_comma']
+    hospitals[trailing] = hospitals[trailing] + ','
+
+    billing = rng.random(n) * MAX_BILLING
+    negative = rng.random(n) < rates['negative_billing']
+    billing[negative] *= -1
+    billing[rng.random(n) < rates['billing_over_limit']] = OVER_LIMIT_BILLING
+    billing[rng.random(n) < rates['billing_missing']] = np.nan
+
+    df = pd.DataFrame({
+        'Name': names,
+        'Age': ages,
+        'Gender': genders,
+        'Blood Type': blood_types,
+        'Medical Condition': rng.choice(MEDICAL_CONDITIONS, n),
+        'Date of Admission': np.datetime_as_string(admissions, unit='D'),
+        'Doctor': rng.choice(pools.doctors, n),
+        'Hospital': hospitals,
+        'Insurance Provider': _with_missing(rng.choice(INSURANCE_PROVIDERS, n), rng, rates['insurance_missing']),
+        'Billing Amount': billing,
+        'Room Number': rng.integers(101, 501, n),
+        'Admission Type': _with_missing(rng.choice(ADMISSION_TYPES, n), rng, rates['admission_type_missing']),
+        'Discharge Date': np.datetime_as_string(discharges, unit='D'),
+        'Medication': _with_missing(rng.choice(MEDICATIONS, n), rng, rates['medication_missing']),
+        'Test Results': rng.choice(TEST_RESULTS, n),
+    }, columns=COLUMNS)
+
+    # Exact duplicates copy an earlier, non-duplicate row of the same block
+    duplicates = rng.random(n) < rates['duplicate_rows']
+    duplicates[0] = False
+    originals = np.flatnonzero(~duplicates)
+    positions = np.flatnonzero(duplicates)
+    earlier = np.searchsorted(originals, positions)
+    sources = originals[(rng.random(len(positions)) * earlier).astype(int)]
+    df.iloc[positions] = df.iloc[sources].to_numpy()
+    return df
+
+
+def generate_chunks(n_rows, seed=0, rates=None):
+    """Yield the rows of an `n_rows` dataset block by block (index continues across blocks)."""
+    rates = build_rates(rates)
+    pools = VocabularyPools(seed)
+    for block_number in range(-(-n_rows // BLOCK_ROWS)):
+        df = generate_block(pools, seed, block_number, rates)
+        start = block_number * BLOCK_ROWS
+        df = df.iloc[:n_rows - start]
+        df.index = pd.RangeIndex(start, start + len(df))
+        yield df
+
+
+def write_synthetic_dataset(output_file, n_rows, seed=0, rates=None, verbose=True):
+    """Stream an `n_rows` synthetic dataset to a CSV laid out like Hospital_dataset.csv."""
+    started = time.perf_counter()
+    for number, df in enumerate(generate_chunks(n_rows, seed, rates)):
+        df.to_csv(output_file, mode='w' if number == 0 else 'a', header=number == 0)
+        if verbose and (number + 1) % 10 == 0:
+            print(f"  {df.index[-1] + 1:,} rows written")
+    seconds = time.perf_counter() - started
+    if verbose:
+        size_mb = os.path.getsize(output_file) / (1024 * 1024)
+        print(f"Wrote {n_rows:,} rows ({size_mb:.1f} MB) to {output_file} in {seconds:.1f}s")
+    return seconds
+
+
+def _parse_rate(text):
+    name, _, value = text.partition('=')
+    try:
+        return name, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected NAME=RATE, got '{text}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dirty hospital dataset.")
+    parser.add_argument('--rows', type=int, default=REFERENCE_ROWS, help="Number of rows (10k to 100M)")
+    parser.add_argument('--output', default="Hospital_dataset_synthetic.csv", help="Output CSV")
+    parser.add_argument('--seed', type=int, default=0, help="Same seed and rates give the same file")
+    parser.add_argument('--rate', type=_parse_rate, action='append', default=[], metavar='NAME=RATE',
+                        help=f"Override a dirt rate; known rates: {', '.join(DEFAULT_RATES)}")
+    args = parser.parse_args()
+
+    if args.rows < 1:
+        parser.error("--rows must be positive")
+    try:
+        rates = build_rates(dict(args.rate))
+    except ValueError as error:
+        parser.error(str(error))
+    write_synthetic_dataset(args.output, args.rows, args.seed, rates)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Backend Equivalence Tests
+=========================
+
+Runs the cleaning and imputation operation lists on a small synthetic
+dataset with every backend and checks the result matches the eager pandas
+run cell for cell. Backends whose package is not installed are skipped.
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from clean_hospital_data import HospitalDataCleaner
+from execution_backends import BACKENDS, compare_frames
+from ml_missing_value_imputation import MLExpertMissingValueHandler
+from synthetic_data import generate_chunks
+
+ROWS = 3_000
+
+
+def require_backend(name):
+    if name != 'pandas':
+        pytest.importorskip(name)
+
+
+@pytest.fixture(scope='module')
+def raw_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp('data') / 'hospital_synthetic.csv'
+    pd.concat(generate_chunks(ROWS, seed=7)).to_csv(path)
+    return str(path)
+
+
+@pytest.fixture(scope='module')
+def cleaned(raw_csv, tmp_path_factory):
+    """Eager pandas cleaning result, also written as the imputation input."""
+    path = tmp_path_factory.mktemp('data') / 'hospital_cleaned.csv'
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = HospitalDataCleaner(raw_csv).run_full_cleaning(str(path))
+    return df, str(path)
+
+
+@pytest.mark.parametrize('backend_name', BACKENDS)
+def test_cleaning_matches_pandas(backend_name, raw_csv, cleaned):
+    require_backend(backend_name)
+    expected, _ = cleaned
+    with contextlib.redirect_stdout(io.StringIO()):
+        backend, relation = HospitalDataCleaner(raw_csv).run_backend_cleaning(backend_name)
+        actual = backend.to_pandas(relation)
+    assert compare_frames(expected, actual) == {}
+
+
+@pytest.mark.parametrize('backend_name', BACKENDS)
+def test_imputation_matches_pandas(backend_name, cleaned):
+    require_backend(backend_name)
+    _, cleaned_csv = cleaned
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected, _ = MLExpertMissingValueHandler(cleaned_csv).run_ml_imputation_pipeline(None)
+        backend, relation, _ = MLExpertMissingValueHandler(cleaned_csv).run_backend_pipeline(backend_name)
+        actual = backend.to_pandas(relation)
+    assert compare_frames(expected, actual) == {}
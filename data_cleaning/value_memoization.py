@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Distinct-Value Memoization for String Cleaners
+==============================================
+
+The string columns of the hospital dataset have far fewer distinct values
+than rows (5 insurers, 5 medications, ~20k hospitals in 25k rows). These
+helpers clean each distinct value once and map the results back by code:
+- `map_distinct` factorizes a column (or reuses categorical codes); a
+  vectorized cleaner can be given the distinct values in batches to bound
+  its temporary arrays
+- `LRUValueCache` keeps a bounded cache across chunks for streaming runs
+
+Author: ML Data Cleaning Expert
+Date: October 2025
+"""
+
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+
+
+def _factorize(series):
+    """Return integer codes (-1 for missing) and the distinct values."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories.to_numpy(dtype=object)
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def _apply(func, values, vectorized, batch_size=None):
+    """Run the cleaner over distinct values, either per value or as Series of up to `batch_size` values."""
+    if vectorized and batch_size and len(values) > batch_size:
+        return np.concatenate([_apply(func, values[start:start + batch_size], True)
+                               for start in range(0, len(values), batch_size)])
+    if vectorized:
+        return pd.Series(values, dtype=object).pipe(func).to_numpy(dtype=object)
+    return np.array([func(value) for value in values], dtype=object)
+
+
+def _take(cleaned, codes, index, categorical=False):
+    """Map cleaned distinct values back to rows; code -1 becomes NaN.
+
+    Categorical input stays categorical: values that clean to the same string
+    are merged into one category and only the integer codes are remapped.
+    """
+    if categorical:
+        new_codes, categories = pd.factorize(cleaned, use_na_sentinel=True)
+        row_codes = np.append(new_codes, -1)[codes]
+        return pd.Series(pd.Categorical.from_codes(row_codes, categories=categories), index=index)
+
+    lookup = np.append(cleaned, np.array([np.nan], dtype=object))
+    return pd.Series(lookup[codes], index=index, dtype=object)
+
+
+def map_distinct(series, func, vectorized=False, batch_size=None):
+    """Apply `func` once per distinct value of `series` and map it back to every row.
+
+    With `vectorized=True`, `func` receives a Series of the distinct values
+    (at most `batch_size` at a time) and must return a Series of the same length.
+    """
+    codes, uniques = _factorize(series)
+    cleaned = _apply(func, uniques, vectorized, batch_size)
+    return _take(cleaned, codes, series.index, isinstance(series.dtype, pd.CategoricalDtype))
+
+
+class LRUValueCache:
+    """Bounded least-recently-used cache of cleaned values, shared across chunks."""
+
+    def __init__(self, func, maxsize=100_000, vectorized=False):
+        self.func = func
+        self.maxsize = maxsize
+        self.vectorized = vectorized
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def map(self, series):
+        """Clean a chunk, computing only the distinct values not already cached."""
+        codes, uniques = _factorize(series)
+        cleaned = np.empty(len(uniques), dtype=object)
+
+        uncached = []
+        for position, value in enumerate(uniques):
+            if value in self._cache:
+                self._cache.move_to_end(value)
+                cleaned[position] = self._cache[value]
+            else:
+                uncached.append(position)
+
+        self.hits += len(uniques) - len(uncached)
+        self.misses += len(uncached)
+
+        if uncached:
+            computed = _apply(self.func, uniques[uncached], self.vectorized)
+            for position, value in zip(uncached, computed):
+                cleaned[position] = value
+                self._cache[uniques[position]] = value
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+        return _take(cleaned, codes, series.index, isinstance(series.dtype, pd.CategoricalDtype))
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """Summary of cache activity for reports."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hit_rate, 4),
+            'size': len(self._cache),
+            'maxsize': self.maxsize,
+        }